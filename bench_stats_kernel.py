@@ -0,0 +1,93 @@
+# bench_stats_kernel.py
+# ---------------------------------------------------------------------
+# 통계 커널(stats_kernel) 성능 비교
+#   1) 단일 그룹: compute_stats + compute_additional_stats (전체 데이터 한 번)
+#      - pandas: 결과별로 Series를 잘라 min/max/mean/std/median/quantile을 따로 호출하던 이전 방식
+#      - kernel: data_processor의 현재 구현 (정렬 한 번)
+#   2) 그룹 전체: 대학×모집단위×세부유형×결과 구간별 기술통계
+#      - pandas: groupby.agg + groupby.quantile
+#      - kernel: segment_ids + describe_groups
+#
+# 사용법: python bench_stats_kernel.py [행 수 ...]   (기본 10000 100000 1000000)
+# ---------------------------------------------------------------------
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processor import compute_additional_stats, compute_stats, encode_dataset, grade_series, value_mask
+from stats_kernel import describe_groups, segment_ids
+
+
+def make_dataset(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "region": rng.choice(["강원", "서울", "경기"], n_rows),
+        "univ": rng.choice([f"대학{i:02d}" for i in range(60)], n_rows),
+        "apptype": rng.choice(["교과", "종합"], n_rows),
+        "subtype": rng.choice([f"전형{i}" for i in range(6)], n_rows),
+        "dept": rng.choice([f"학과{i:02d}" for i in range(80)], n_rows),
+        "result": rng.choice(["합격", "충원합격", "불합격"], n_rows),
+        "all_subj_grade": np.round(rng.uniform(1, 9, n_rows), 2),
+        "conv_grade": np.where(rng.random(n_rows) < 0.1, np.nan, np.round(rng.uniform(1, 9, n_rows), 2)),
+    })
+    return encode_dataset(df)
+
+
+def pandas_single(df: pd.DataFrame, grade_column: str) -> None:
+    """이전 방식: 결과별로 잘라 통계 함수를 하나씩 호출"""
+    grades = grade_series(df[grade_column])
+    for results in (["합격", "충원합격"], ["합격"], ["충원합격"]):
+        g = grades[value_mask(df, "result", results)].dropna()
+        g.min(), g.max(), g.mean()
+    for result in ("합격", "불합격", "충원합격"):
+        g = grades[value_mask(df, "result", [result])].dropna()
+        g.mean(), g.std(), g.min(), g.max(), g.median(), g.quantile(0.25), g.quantile(0.75)
+
+
+def kernel_single(df: pd.DataFrame, grade_column: str) -> None:
+    compute_stats(df, grade_column)
+    compute_additional_stats(df, grade_column)
+
+
+def pandas_grouped(df: pd.DataFrame, grade_column: str) -> None:
+    grouped = df.assign(g=grade_series(df[grade_column])).groupby(
+        ["univ", "dept", "subtype", "result"], observed=True, sort=False
+    )["g"]
+    grouped.agg(["count", "mean", "std", "min", "max"])
+    grouped.quantile([0.25, 0.5, 0.75])
+
+
+def kernel_grouped(df: pd.DataFrame, grade_column: str) -> None:
+    columns = ["univ", "dept", "subtype", "result"]
+    segment, keys = segment_ids(
+        [df[c].cat.codes.to_numpy() for c in columns],
+        [len(df[c].cat.categories) for c in columns],
+    )
+    describe_groups(segment, grade_series(df[grade_column]).to_numpy(np.float64), keys.shape[1])
+
+
+def best_of(func, *args, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main(sizes) -> None:
+    print(f"{'행 수':>10} | {'단일 pandas':>11} {'단일 kernel':>11} {'배율':>6} | {'그룹 pandas':>11} {'그룹 kernel':>11} {'배율':>6}")
+    for n_rows in sizes:
+        df = make_dataset(n_rows)
+        single = [best_of(f, df, "conv_grade") for f in (pandas_single, kernel_single)]
+        grouped = [best_of(f, df, "conv_grade") for f in (pandas_grouped, kernel_grouped)]
+        print(
+            f"{n_rows:>10,} | {single[0]*1000:>9.1f}ms {single[1]*1000:>9.1f}ms {single[0]/single[1]:>5.1f}x"
+            f" | {grouped[0]*1000:>9.1f}ms {grouped[1]*1000:>9.1f}ms {grouped[0]/grouped[1]:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,156 @@
+# data_cache.py
+# ---------------------------------------------------------------------
+# read_input 결과(정제된 DataFrame)를 디스크에 보관하는 내용 기반 캐시
+#   - 키: 파일 내용 해시 + 수정시각(mtime) + usecols 명세 + 캐시 버전
+#   - 형식: Feather(pyarrow 설치 시) / pickle(미설치 시)
+#   - 총 용량 상한을 넘으면 가장 오래 사용되지 않은 항목부터 삭제(LRU)
+# ---------------------------------------------------------------------
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from utils import evict_lru
+
+try:
+    import pyarrow  # noqa: F401  (Feather 저장에 필요)
+    _HAS_ARROW = True
+except ImportError:  # pyarrow가 없으면 pickle로 대체
+    _HAS_ARROW = False
+
+# 정제 로직이 바뀌면 이 값을 올려 기존 캐시를 무효화한다
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("SUSI_CACHE_DIR", ".susi_cache"))
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1GB
+
+
+def _file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256 해시"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_tag(path: Path) -> str:
+    """원본 파일 경로를 나타내는 짧은 태그 (같은 파일의 이전 캐시를 찾는 데 사용)"""
+    return hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:12]
+
+
+class DataCache:
+    """
+    정제된 입력 DataFrame의 디스크 캐시
+
+    Parameters
+    ----------
+    cache_dir : Path        # 캐시 파일을 둘 디렉터리
+    max_bytes : int         # 캐시 전체 용량 상한 (초과 시 LRU 삭제)
+    enabled : bool          # False면 load는 항상 None, store는 아무것도 하지 않음
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.suffix = ".feather" if _HAS_ARROW else ".pkl"
+
+    # ───────────────────────── 키 / 경로 ──────────────────────────
+    def key_for(self, path: Path, usecols: str) -> str:
+        """파일 내용 해시, mtime, usecols 명세로 캐시 키 생성"""
+        path = Path(path)
+        stat = path.stat()
+        raw = f"{_file_digest(path)}|{stat.st_mtime_ns}|{usecols}|v{CACHE_VERSION}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def dataset_key(self, paths, usecols: str = "") -> str:
+        """여러 입력 파일 묶음의 키 (파일별 키를 경로 순으로 합쳐 해시)"""
+        parts = sorted(f"{Path(p).resolve()}={self.key_for(p, usecols)}" for p in paths)
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+
+    def _entry_path(self, path: Path, key: str) -> Path:
+        return self.cache_dir / f"{_source_tag(path)}_{key}{self.suffix}"
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def load(self, path: Path, usecols: str) -> Optional[pd.DataFrame]:
+        """캐시에 있으면 DataFrame, 없으면 None"""
+        if not self.enabled:
+            return None
+        entry = self._entry_path(path, self.key_for(path, usecols))
+        if not entry.exists():
+            return None
+        try:
+            df = pd.read_feather(entry) if self.suffix == ".feather" else pd.read_pickle(entry)
+        except Exception as e:
+            print(f"경고: 캐시 파일을 읽지 못해 삭제합니다 ({entry.name}): {e}")
+            entry.unlink(missing_ok=True)
+            return None
+        os.utime(entry)  # LRU 순서 갱신
+        return df
+
+    def store(self, path: Path, usecols: str, df: pd.DataFrame) -> Optional[Path]:
+        """DataFrame을 캐시에 저장하고 같은 원본 파일의 이전 항목은 지운다"""
+        if not self.enabled:
+            return None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_path(path, self.key_for(path, usecols))
+        self.invalidate(path, keep=entry)
+
+        tmp = entry.with_name(entry.name + ".tmp")
+        if self.suffix == ".feather":
+            df.reset_index(drop=True).to_feather(tmp)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, entry)
+
+        self.evict()
+        return entry
+
+    def evict(self) -> int:
+        """용량 상한을 넘는 오래된 항목(데이터, 파생 산출물 모두) 삭제"""
+        return evict_lru(self.cache_dir, self.max_bytes)
+
+    def invalidate(self, path: Path, keep: Optional[Path] = None) -> int:
+        """원본 파일 하나에 대한 캐시 항목을 모두 삭제. 삭제한 개수 반환"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry in self.cache_dir.glob(f"{_source_tag(path)}_*"):
+            if keep is not None and entry == keep:
+                continue
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """캐시 디렉터리의 모든 항목 삭제"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry in self.cache_dir.iterdir():
+            if entry.is_file():
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+_default_cache: Optional[DataCache] = None
+
+
+def get_default_cache() -> DataCache:
+    """환경변수 설정을 반영한 기본 캐시 (SUSI_CACHE=0 이면 비활성)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DataCache(
+            enabled=os.environ.get("SUSI_CACHE", "1") != "0",
+            max_bytes=int(os.environ.get("SUSI_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+    return _default_cache
@@ -1,7 +1,36 @@
 import pandas as pd
 import numpy as np
 import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
 from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from data_cache import get_default_cache
+from quantile_sketch import DEFAULT_EXACT_THRESHOLD, DEFAULT_RESOLUTION, QUARTILES, encode_runs, runs_quantiles
+from stats_kernel import describe_groups
+
+# 입력 엑셀에서 사용하는 열(엑셀 열 문자)과 그에 대응하는 컬럼명
+USECOLS = "F,G,I,K,M,R,AG,AH"
+COLUMNS = [
+    "region",
+    "univ",
+    "apptype",
+    "subtype",
+    "dept",
+    "result",
+    "all_subj_grade",
+    "conv_grade",
+]
+# USECOLS의 0-기반 열 인덱스 (F=5, G=6, I=8, K=10, M=12, R=17, AG=32, AH=33)
+USECOL_INDEXES = (5, 6, 8, 10, 12, 17, 32, 33)
+HEADER_ROWS = 2
+REQUIRED_COLUMNS = ["result", "univ", "dept", "subtype", "apptype"]
+GRADE_COLUMNS = ["all_subj_grade", "conv_grade"]
+# 범주형(Categorical)으로 저장하는 열 - 코드(int)와 공유 사전(categories)으로 표현된다
+CATEGORY_COLUMNS = ["region", "univ", "apptype", "subtype", "dept", "result"]
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -14,58 +43,101 @@ class NumpyEncoder(json.JSONEncoder):
         return super(NumpyEncoder, self).default(obj)
 
 # 추가 통계 정보 계산 함수 (기존 코드 유지)
-def compute_additional_stats(data, grade_column):
+def compute_additional_stats(
+    data,
+    grade_column,
+    quantiles: str = "exact",
+    resolution: Optional[float] = DEFAULT_RESOLUTION,
+    exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+):
     """
     추가 통계 정보(표준편차, 변동계수, 최솟값, 최댓값 등) 계산
+    결과별 통계는 stats_kernel로 한 번의 정렬에서 모두 구한다.
+    quantiles="sketch"면 중앙값/사분위수를 합치기 가능한 요약(quantile_sketch)에서 읽는다.
+    (표본이 exact_threshold개 이하이면 요약도 정확하며, 그보다 크면 오차는 resolution/2 이하)
     """
     stats = {}
+    result_keys = ["합격", "불합격", "충원합격"]
+    codes = result_codes(data, result_keys)
+    grades = grade_series(data[grade_column]).to_numpy(np.float64)
+    desc = describe_groups(codes, grades, len(result_keys), QUARTILES)
+    quartiles = desc["quantiles"]
+    if quantiles == "sketch":
+        valid = codes >= 0
+        runs = encode_runs(codes[valid], grades[valid], resolution, exact_threshold)
+        quartiles = runs_quantiles(*runs, len(result_keys), QUARTILES)
 
     # 결과별 통계 계산
-    for result_key in ["합격", "불합격", "충원합격"]:
-        result_data = data[data['result'] == result_key][grade_column].dropna()
-        if len(result_data) > 0: # 데이터가 있을 때만 통계 계산
+    for i, result_key in enumerate(result_keys):
+        if desc["count"][i] > 0: # 데이터가 있을 때만 통계 계산
+            mean, std = desc["mean"][i], desc["std"][i]
+            q1, median, q3 = quartiles[i]
             stats[result_key] = {
-                'count': len(result_data),
-                'mean': result_data.mean(),
-                'std': result_data.std(),
-                'cv': (result_data.std() / result_data.mean()) * 100 if result_data.mean() != 0 else 0,  # 변동계수 (%)
-                'min': result_data.min(),
-                'max': result_data.max(),
-                'median': result_data.median(),
-                'q1': result_data.quantile(0.25),
-                'q3': result_data.quantile(0.75)
+                'count': int(desc["count"][i]),
+                'mean': mean,
+                'std': std,
+                'cv': (std / mean) * 100 if mean != 0 else 0,  # 변동계수 (%)
+                'min': desc["min"][i],
+                'max': desc["max"][i],
+                'median': median,
+                'q1': q1,
+                'q3': q3
             }
         else: # 데이터가 없는 경우 count만 0으로 설정하고 나머지는 N/A 처리 준비 (또는 빈 dict)
              stats[result_key] = {'count': 0}
 
     return stats
 
-def read_input(path: Path) -> pd.DataFrame:
+def read_input(
+    path: Path,
+    use_cache: bool = True,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> pd.DataFrame:
     """
     엑셀 파일을 읽어서 필요한 열만 추출하고 전처리합니다.
     성능 최적화: 필요한 열만 로드하여 메모리 사용 최소화
+    use_cache가 True면 정제된 결과를 디스크 캐시에서 먼저 찾고, 없으면 읽은 뒤 저장합니다.
+    progress(rows_read, total_rows)는 .xlsx 스트리밍 중 청크마다 호출됩니다 (total은 모를 때 None).
     """
+    cache = get_default_cache() if use_cache else None
+    if cache is not None and cache.enabled:
+        try:
+            cached = cache.load(path, USECOLS)
+        except Exception as e:
+            print(f"경고: 캐시 조회 실패 ({e})")
+            cached = None
+        if cached is not None:
+            return cached
+
+    if str(path).lower().endswith(".xlsx"):
+        df = read_xlsx_streaming(path, progress=progress)
+    else:
+        df = _read_excel(path)
+
+    df = encode_dataset(df)
+
+    if cache is not None and cache.enabled:
+        try:
+            cache.store(path, USECOLS, df)
+        except Exception as e:
+            print(f"경고: 캐시 저장 실패 ({e})")
+    return df
+
+def _read_excel(path: Path) -> pd.DataFrame:
+    """엑셀 파일을 직접 파싱하고 정제 (캐시를 거치지 않음)"""
     try:
         engine = "openpyxl" if str(path).lower().endswith(".xlsx") else "xlrd"
         df = pd.read_excel(
             path,
             header=None,
             skiprows=2,
-            usecols="F,G,I,K,M,R,AG,AH",
+            usecols=USECOLS,
             engine=engine,
         )
 
-        df.columns = [
-            "region",
-            "univ",
-            "apptype",
-            "subtype",
-            "dept",
-            "result",
-            "all_subj_grade",
-            "conv_grade",
-        ]
-        df["result"] = df["result"].astype(str).str.strip()
+        df.columns = COLUMNS
+        # 숫자가 섞인 결과 열도 문자열로 바꾼 뒤 dtype을 다시 추론한다 (스트리밍 파서와 같은 문자열 열)
+        df["result"] = df["result"].where(df["result"].isna(), df["result"].astype(str).str.strip()).infer_objects()
         df["conv_grade"] = pd.to_numeric(df["conv_grade"], errors="coerce")
         df["all_subj_grade"] = pd.to_numeric(df["all_subj_grade"], errors="coerce")
         rows_before = len(df)
@@ -84,6 +156,225 @@ def read_input(path: Path) -> pd.DataFrame:
         print(f"파일 읽기 오류: {e}")
         raise
 
+def encode_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    문자열 열을 범주형으로, 등급 열을 float32로 변환합니다.
+    범주는 정렬되어 있으므로 코드 순서가 곧 사전순이며, isin / == / groupby가 정수 코드 위에서 동작합니다.
+    """
+    out = {}
+    for c in df.columns:
+        col = df[c]
+        if c in CATEGORY_COLUMNS:
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.where(col.isna(), col.astype(str))
+                col = col.astype(pd.CategoricalDtype(sorted(col.dropna().unique())))
+        elif c in GRADE_COLUMNS:
+            col = col.astype(np.float32)
+        out[c] = col
+    return pd.DataFrame(out, index=df.index)
+
+def value_mask(df: pd.DataFrame, column: str, values) -> np.ndarray:
+    """df[column]이 values 중 하나인 행의 불리언 마스크 (범주형이면 정수 코드로 비교)"""
+    col = df[column]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        wanted = col.cat.categories.get_indexer(list(values))
+        return np.isin(col.cat.codes.to_numpy(), wanted[wanted >= 0])
+    return col.isin(list(values)).to_numpy()
+
+def result_codes(df: pd.DataFrame, results) -> np.ndarray:
+    """result 열을 results 안의 위치(int8)로 변환. results에 없는 값과 결측은 -1"""
+    col = df["result"]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        lookup = np.full(len(col.cat.categories) + 1, -1, dtype=np.int8)
+        wanted = col.cat.categories.get_indexer(list(results))
+        for i, code in enumerate(wanted):
+            if code >= 0:
+                lookup[code + 1] = i
+        return lookup[col.cat.codes.to_numpy().astype(np.int64) + 1]
+    codes = np.full(len(col), -1, dtype=np.int8)
+    for i, result in enumerate(results):
+        codes[(col == result).to_numpy()] = i
+    return codes
+
+def grade_list(values) -> list:
+    """등급 값을 JSON 출력용 float 리스트로 변환 (float32 잡음 제거를 위해 소수 6자리 반올림)"""
+    return np.round(np.asarray(values, dtype=np.float64), 6).tolist()
+
+def grade_series(series: pd.Series) -> pd.Series:
+    """float32 등급 열을 원래의 float64 값으로 복원 (통계가 float64 입력과 같은 결과를 내도록)"""
+    if series.dtype == np.float32:
+        return pd.Series(np.round(series.to_numpy(np.float64), 6), index=series.index, name=series.name)
+    return series
+
+def expand_input_paths(spec: Union[str, Path, Iterable[Union[str, Path]]]) -> list[Path]:
+    """
+    파일 경로, 디렉터리, 또는 그 목록을 엑셀 파일 경로 목록으로 펼칩니다.
+    디렉터리는 바로 아래의 .xlsx/.xls 파일(엑셀 임시파일 ~$ 제외)을 이름순으로 포함합니다.
+    """
+    items = [spec] if isinstance(spec, (str, Path)) else list(spec)
+    paths = []
+    for item in items:
+        item = Path(item)
+        if item.is_dir():
+            paths.extend(
+                p for p in sorted(item.iterdir())
+                if p.suffix.lower() in (".xlsx", ".xls") and not p.name.startswith("~$")
+            )
+        else:
+            paths.append(item)
+    return paths
+
+def infer_year(path: Path) -> Optional[int]:
+    """파일명에서 연도(2000~2099)를 찾아 반환. 없으면 None"""
+    m = re.search(r"(?<!\d)(20\d{2})(?!\d)", Path(path).stem)
+    return int(m.group(1)) if m else None
+
+def concat_datasets(frames: list[pd.DataFrame], sources: Optional[list[Path]] = None) -> pd.DataFrame:
+    """
+    encode_dataset을 거친 DataFrame들을 하나로 합칩니다.
+    범주형 열은 범주를 합집합으로 통일한 뒤 코드만 재매핑해 이어 붙이므로 문자열 복사가 없습니다.
+    sources가 주어지면 각 행에 source_file(범주형)과 year(Int16) 열을 붙입니다.
+    """
+    lengths = [len(f) for f in frames]
+    columns = {}
+    for c in frames[0].columns:
+        cols = [f[c] for f in frames]
+        if isinstance(cols[0].dtype, pd.CategoricalDtype):
+            categories = pd.Index(sorted(set().union(*(col.cat.categories for col in cols))))
+            codes = []
+            for col in cols:
+                raw = col.cat.codes.to_numpy()
+                mapping = categories.get_indexer(col.cat.categories)
+                codes.append(np.where(raw >= 0, mapping[raw], -1) if len(mapping) else raw)
+            columns[c] = pd.Categorical.from_codes(np.concatenate(codes), categories=categories)
+        else:
+            columns[c] = np.concatenate([col.to_numpy() for col in cols])
+    if sources is not None:
+        file_idx = np.repeat(np.arange(len(frames)), lengths)
+        names = pd.Index([Path(p).name for p in sources])
+        file_names = pd.Index(sorted(names.unique()))  # 다른 범주형 열처럼 범주는 정렬 순서
+        columns["source_file"] = pd.Categorical.from_codes(file_names.get_indexer(names)[file_idx], categories=file_names)
+        columns["year"] = pd.array([infer_year(p) for p in sources], dtype="Int16").take(file_idx)
+    return pd.DataFrame(columns)
+
+def read_inputs(
+    spec: Union[str, Path, Iterable[Union[str, Path]]],
+    use_cache: bool = True,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> pd.DataFrame:
+    """
+    여러 엑셀 파일(또는 디렉터리)을 프로세스 풀에서 병렬로 읽어 하나의 데이터셋으로 합칩니다.
+    각 행에는 source_file과 year 열이 붙습니다.
+    progress는 파일이 하나면 read_input의 행 단위 진행률, 여러 개면 (완료 파일 수, 전체 파일 수)로 호출됩니다.
+    """
+    paths = expand_input_paths(spec)
+    if not paths:
+        raise FileNotFoundError(f"읽을 엑셀 파일이 없습니다: {spec}")
+
+    if len(paths) == 1:
+        frames = [read_input(paths[0], use_cache=use_cache, progress=progress)]
+    else:
+        workers = max_workers or min(len(paths), os.cpu_count() or 1)
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(read_input, p, use_cache): i for i, p in enumerate(paths)}
+            for done, fut in enumerate(as_completed(futures), 1):
+                results[futures[fut]] = fut.result()
+                if progress is not None:
+                    progress(done, len(paths))
+        frames = [results[i] for i in range(len(paths))]
+    return concat_datasets(frames, sources=paths)
+
+def read_xlsx_streaming(
+    path: Path,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    chunk_size: int = 5000,
+) -> pd.DataFrame:
+    """
+    openpyxl read_only 모드로 .xlsx를 한 행씩 읽어 필요한 8개 열만 추출하고 청크 단위로 정제합니다.
+    정제된 행은 미리 할당한 배열에 바로 채워 넣으므로 최대 메모리가 최종 DataFrame 크기에 가깝습니다.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        print(f"파일 읽기 오류: {e}")
+        raise
+    try:
+        ws = wb.worksheets[0]
+        total_rows = ws.max_row - HEADER_ROWS if ws.max_row else None
+        capacity = max(total_rows or 0, chunk_size)
+
+        # 결과 배열 미리 할당 (행 수를 모르면 두 배씩 늘린다)
+        text_cols = {c: np.empty(capacity, dtype=object) for c in COLUMNS if c not in GRADE_COLUMNS}
+        grade_cols = {c: np.empty(capacity, dtype=np.float64) for c in GRADE_COLUMNS}
+        filled = 0
+        rows_read = 0
+        dropped_required = 0
+        dropped_grade = 0
+
+        pick = itemgetter(*USECOL_INDEXES)
+        width = USECOL_INDEXES[-1] + 1
+        chunk = []
+
+        def flush():
+            nonlocal filled, capacity, dropped_required, dropped_grade
+            cols = list(zip(*chunk))
+            raw = dict(zip(COLUMNS, (np.array(c, dtype=object) for c in cols)))
+            raw["result"] = np.array(
+                [None if v is None else str(v).strip() for v in raw["result"]], dtype=object
+            )
+            for c in GRADE_COLUMNS:
+                raw[c] = pd.to_numeric(pd.Series(raw[c], dtype=object), errors="coerce").to_numpy(np.float64)
+
+            keep = np.ones(len(chunk), dtype=bool)
+            for c in REQUIRED_COLUMNS:
+                keep &= pd.notna(raw[c])
+            dropped_required += int((~keep).sum())
+            has_grade = ~np.isnan(raw["conv_grade"]) | ~np.isnan(raw["all_subj_grade"])
+            dropped_grade += int((keep & ~has_grade).sum())
+            keep &= has_grade
+
+            n = int(keep.sum())
+            if filled + n > capacity:
+                capacity = max(capacity * 2, filled + n)
+                for arrs in (text_cols, grade_cols):
+                    for c, arr in arrs.items():
+                        grown = np.empty(capacity, dtype=arr.dtype)
+                        grown[:filled] = arr[:filled]
+                        arrs[c] = grown
+            for arrs in (text_cols, grade_cols):
+                for c, arr in arrs.items():
+                    arr[filled:filled + n] = raw[c][keep]
+            filled += n
+            chunk.clear()
+
+        for row in ws.iter_rows(min_row=HEADER_ROWS + 1, max_col=width, values_only=True):
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            chunk.append(pick(row))
+            rows_read += 1
+            if len(chunk) >= chunk_size:
+                flush()
+                if progress is not None:
+                    progress(rows_read, total_rows)
+        if chunk:
+            flush()
+        if progress is not None:
+            progress(rows_read, rows_read)
+    finally:
+        wb.close()
+
+    if dropped_required:
+        print(f"경고: {dropped_required}개 행이 필수 정보 누락으로 제외됨")
+    if dropped_grade:
+        print(f"경고: {dropped_grade}개 행이 등급 정보 누락으로 제외됨")
+
+    df = pd.DataFrame({c: (text_cols[c] if c in text_cols else grade_cols[c])[:filled] for c in COLUMNS})
+    return df
+
 # 그룹별 통계 계산 함수 (기존 코드 유지)
 def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") -> dict:
     """
@@ -96,38 +387,24 @@ def compute_stats(group_data: pd.DataFrame, grade_column: str = "conv_grade") ->
     if total_count == 0:
         return stats
 
-    result_counts = group_data['result'].value_counts()
-    pass_data = group_data[group_data['result'].isin(['합격', '충원합격'])]
-    if not pass_data.empty:
-        all_pass_count = len(pass_data)
-        stats['all_pass_count'] = all_pass_count
-        stats['all_pass_rate'] = f"{all_pass_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        valid_grades = pass_data[grade_column].dropna()
-        if not valid_grades.empty:
-            stats['all_pass_min'] = valid_grades.min()
-            stats['all_pass_max'] = valid_grades.max()
-            stats['all_pass_mean'] = valid_grades.mean()
-
-    if '합격' in result_counts:
-        pass_count = result_counts['합격']
-        stats['pass_count'] = pass_count
-        stats['pass_rate'] = f"{pass_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        pass_grades = group_data[group_data['result'] == '합격'][grade_column].dropna()
-        if not pass_grades.empty:
-            stats['pass_min'] = pass_grades.min()
-            stats['pass_max'] = pass_grades.max()
-            stats['pass_mean'] = pass_grades.mean()
-
-    if '충원합격' in result_counts:
-        waitlist_count = result_counts['충원합격']
-        stats['waitlist_count'] = waitlist_count
-        stats['waitlist_rate'] = f"{waitlist_count/total_count*100:.1f}%" if total_count > 0 else "0.0%"
-        waitlist_grades = group_data[group_data['result'] == '충원합격'][grade_column].dropna()
-        if not waitlist_grades.empty:
-            stats['waitlist_min'] = waitlist_grades.min()
-            stats['waitlist_max'] = waitlist_grades.max()
-            stats['waitlist_mean'] = waitlist_grades.mean()
-
-    if '불합격' in result_counts:
-        stats['fail_count'] = result_counts['불합격']
+    # 합격(0) / 충원합격(1) / 불합격(2)와 합격 전체(3) 구간을 한 번의 정렬로 요약한다
+    codes = result_codes(group_data, ['합격', '충원합격', '불합격'])
+    grades = grade_series(group_data[grade_column]).to_numpy(np.float64)
+    passed = (codes == 0) | (codes == 1)
+    segment = np.concatenate((codes, np.full(int(passed.sum()), 3)))
+    desc = describe_groups(segment, np.concatenate((grades, grades[passed])), 4, qs=())
+    rows = np.bincount(segment[segment >= 0], minlength=4)
+
+    for seg, prefix in ((3, 'all_pass'), (0, 'pass'), (1, 'waitlist')):
+        if rows[seg] == 0:
+            continue
+        stats[f'{prefix}_count'] = int(rows[seg])
+        stats[f'{prefix}_rate'] = f"{rows[seg]/total_count*100:.1f}%"
+        if desc['count'][seg] > 0:
+            stats[f'{prefix}_min'] = desc['min'][seg]
+            stats[f'{prefix}_max'] = desc['max'][seg]
+            stats[f'{prefix}_mean'] = desc['mean'][seg]
+
+    if rows[2] > 0:
+        stats['fail_count'] = int(rows[2])
     return stats
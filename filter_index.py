@@ -0,0 +1,148 @@
+# filter_index.py
+# ---------------------------------------------------------------------
+# 연쇄 필터(MultiSelectFilter 5종)용 역색인
+#   - 데이터 로드 시 한 번 생성: 열마다 "값 코드 → 정렬된 행 번호 배열"
+#   - 클릭마다 DataFrame 복사 없이 행 비트맵(bool 배열)의 교집합으로 후보 계산
+# ---------------------------------------------------------------------
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ("region", "univ", "apptype", "subtype", "dept")
+
+
+class FilterIndex:
+    """
+    필터 열별 역색인
+
+    Parameters
+    ----------
+    df : pandas.DataFrame           # 전체 데이터 (범주형 열이면 코드를 그대로 사용)
+    columns : tuple[str], optional  # 색인할 열
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Iterable[str] = FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.columns = tuple(columns)
+        self._codes = {}
+        self._categories = {}
+        self._order = {}
+        self._offsets = {}
+        self._mask_cache = {}
+        self._values_cache = {}
+        self._counts = {}
+
+        for col in self.columns:
+            series = df[col]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype("category")
+            codes = series.cat.codes.to_numpy().astype(np.int32)
+            n_values = len(series.cat.categories)
+
+            # 코드 순으로 안정 정렬한 행 번호를 값별 구간으로 나누면 각 구간이 정렬된 posting list가 된다
+            # (결측값 코드 -1은 맨 앞 구간에 모이고 어떤 값의 posting에도 속하지 않는다)
+            counts = np.bincount(codes + 1, minlength=n_values + 1)
+            self._order[col] = np.argsort(codes, kind="stable").astype(np.int32)
+            self._offsets[col] = np.cumsum(np.concatenate(([0], counts)))[1:]
+            self._codes[col] = codes
+            self._counts[col] = counts
+            self._categories[col] = series.cat.categories
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def postings(self, column: str, value) -> np.ndarray:
+        """column == value인 행 번호 (오름차순)"""
+        code = self._categories[column].get_indexer([value])[0]
+        if code < 0:
+            return np.empty(0, dtype=np.int32)
+        offsets = self._offsets[column]
+        return self._order[column][offsets[code]:offsets[code + 1]]
+
+    def selection_mask(self, column: str, values: Iterable) -> np.ndarray:
+        """column이 values 중 하나인 행의 비트맵 (같은 선택이면 이전 결과를 재사용)"""
+        key = frozenset(values)
+        cached = self._mask_cache.get(column)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        codes = self._categories[column].get_indexer(list(key))
+        codes = codes[codes >= 0]
+        offsets = self._offsets[column]
+        selected_rows = int(sum(offsets[c + 1] - offsets[c] for c in codes))
+        if selected_rows * 4 < self.n_rows:
+            # 선택된 행이 적으면 posting list만 찍는다
+            mask = np.zeros(self.n_rows, dtype=bool)
+            for c in codes:
+                mask[self._order[column][offsets[c]:offsets[c + 1]]] = True
+        else:
+            # 많으면 코드 조회표 한 번으로 전체를 계산하는 편이 빠르다
+            lookup = np.zeros(len(self._categories[column]) + 1, dtype=bool)
+            lookup[codes + 1] = True
+            mask = lookup[self._codes[column] + 1]
+        self._mask_cache[column] = (key, mask)
+        return mask
+
+    def combined_mask(self, selections: dict, exclude: Optional[str] = None) -> Optional[np.ndarray]:
+        """exclude를 뺀 나머지 선택을 모두 만족하는 행 비트맵. 적용할 선택이 없으면 None"""
+        mask = None
+        for col in self.columns:
+            if col == exclude or not selections.get(col):
+                continue
+            m = self.selection_mask(col, selections[col])
+            mask = m.copy() if mask is None else np.logical_and(mask, m, out=mask)
+        return mask
+
+    def values(self, column: str, mask: Optional[np.ndarray] = None) -> list:
+        """mask가 참인 행에 나타나는 column 값 목록 (사전순)"""
+        rows = None if mask is None else self._rows_from_mask(mask)
+        return self._values_from_rows(column, rows)
+
+    def candidates(self, selections: dict) -> dict:
+        """
+        필터별 후보 목록 계산
+        각 열의 후보는 "자기 자신을 제외한 나머지 필터"를 적용한 행에서 구하며,
+        이미 선택된 값은 후보에서 사라지지 않도록 항상 포함한다.
+        """
+        rows_by_key = {}
+        out = {}
+        for col in self.columns:
+            key = self._selection_key(selections, exclude=col)
+            cached = self._values_cache.get(col)
+            if cached is not None and cached[0] == key:
+                values = cached[1]
+            else:
+                # 제외 후 남는 선택이 같은 열끼리는 행 계산을 공유한다
+                if key not in rows_by_key:
+                    mask = self.combined_mask(selections, exclude=col)
+                    rows_by_key[key] = None if mask is None else self._rows_from_mask(mask)
+                values = self._values_from_rows(col, rows_by_key[key])
+                self._values_cache[col] = (key, values)
+            out[col] = set(values).union(selections.get(col) or [])
+        return out
+
+    def row_ids(self, selections: dict) -> Optional[np.ndarray]:
+        """모든 선택을 만족하는 행 번호. 선택이 없으면 None(전체)"""
+        mask = self.combined_mask(selections)
+        return None if mask is None else np.flatnonzero(mask)
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _selection_key(self, selections: dict, exclude: Optional[str] = None) -> tuple:
+        return tuple(
+            (col, frozenset(selections[col]))
+            for col in self.columns
+            if col != exclude and selections.get(col)
+        )
+
+    def _rows_from_mask(self, mask: np.ndarray) -> tuple:
+        """(행 번호, 여집합 여부) - 선택된 행이 절반을 넘으면 제외된 행을 저장한다"""
+        if np.count_nonzero(mask) * 2 <= self.n_rows:
+            return np.flatnonzero(mask), False
+        return np.flatnonzero(~mask), True
+
+    def _values_from_rows(self, column: str, rows: Optional[tuple]) -> list:
+        counts = self._counts[column]
+        if rows is not None:
+            ids, inverted = rows
+            sub = np.bincount(self._codes[column][ids] + 1, minlength=len(counts))
+            counts = counts - sub if inverted else sub
+        return self._categories[column][counts[1:] > 0].tolist()
@@ -0,0 +1,131 @@
+# fragment_cache.py
+# ---------------------------------------------------------------------
+# 보고서의 대학별 섹션 HTML 조각을 디스크에 보관하는 캐시
+#   - 키: 호출 측(html_generator)이 섹션 행 해시 + 관련 필터 + 보고서 버전으로 만든 문자열
+#   - 형식: 조각 하나당 UTF-8 텍스트 파일 하나 ({키}.html)
+#   - 총 용량 상한을 넘으면 가장 오래 사용되지 않은 조각부터 삭제(LRU)
+#   - hits / misses 카운터로 재사용 정도를 확인할 수 있다
+# ---------------------------------------------------------------------
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from data_cache import DEFAULT_CACHE_DIR
+from utils import evict_lru
+
+DEFAULT_FRAGMENT_DIR = DEFAULT_CACHE_DIR / "fragments"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+
+
+def digest(*parts) -> str:
+    """문자열/바이트 조각들을 이어 만든 SHA-256 키"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\x1f")  # 조각 경계 (["ab", "c"]와 ["a", "bc"]를 구분)
+    return h.hexdigest()[:32]
+
+
+class FragmentCache:
+    """
+    렌더링된 섹션 조각의 디스크 캐시
+
+    Parameters
+    ----------
+    cache_dir : Path        # 조각 파일을 둘 디렉터리
+    max_bytes : int         # 조각 전체 용량 상한 (초과 시 LRU 삭제)
+    enabled : bool          # False면 load는 항상 None, store는 아무것도 하지 않음
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_FRAGMENT_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.html"
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def load(self, key: str) -> Optional[str]:
+        """캐시에 있으면 조각 문자열, 없으면 None (hits/misses 갱신)"""
+        if not self.enabled:
+            return None
+        entry = self._entry_path(key)
+        try:
+            text = entry.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, UnicodeError) as e:
+            print(f"경고: 조각 캐시 파일을 읽지 못해 삭제합니다 ({entry.name}): {e}")
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry)  # LRU 순서 갱신
+        except FileNotFoundError:  # 다른 프로세스가 방금 지웠으면 그대로 사용
+            pass
+        self.hits += 1
+        return text
+
+    def store(self, key: str, text: str) -> Optional[Path]:
+        """조각을 저장하고 용량 상한을 넘으면 오래된 조각을 지운다"""
+        if not self.enabled:
+            return None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_path(key)
+        # 여러 프로세스가 같은 조각을 동시에 써도 깨지지 않도록 프로세스별 임시 파일 → rename
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, entry)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            print(f"경고: 조각 캐시에 저장하지 못했습니다 ({entry.name}): {e}")
+            return None
+        self.evict()
+        return entry
+
+    def evict(self) -> int:
+        """용량 상한을 넘는 오래된 조각 삭제"""
+        return evict_lru(self.cache_dir, self.max_bytes, pattern="*.html")
+
+    def clear(self) -> int:
+        """모든 조각 삭제"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry in self.cache_dir.glob("*.html"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self) -> str:
+        """'조각 캐시: 적중 N / 미스 M' 형태의 요약"""
+        return f"조각 캐시: 적중 {self.hits} / 미스 {self.misses}"
+
+
+_default_cache: Optional[FragmentCache] = None
+
+
+def get_default_fragment_cache() -> FragmentCache:
+    """환경변수 설정을 반영한 기본 조각 캐시 (SUSI_CACHE=0 이면 비활성)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FragmentCache(
+            enabled=os.environ.get("SUSI_CACHE", "1") != "0",
+            max_bytes=int(os.environ.get("SUSI_FRAGMENT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+    return _default_cache
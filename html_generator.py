@@ -1,10 +1,23 @@
-from data_processor import compute_additional_stats, compute_stats, NumpyEncoder # data_processor 모듈이 있다고 가정합니다.
+from data_processor import compute_additional_stats as _compute_additional_stats, NumpyEncoder, grade_series, value_mask # data_processor 모듈이 있다고 가정합니다.
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
+import base64
 import json
+import os
+import numpy as np
+from fragment_cache import digest
+from report_assets import write_assets, PLOTLY_CDN_URL
+from stats_engine import DEFAULT_LEVELS, GroupStats, additional_from_entry, basic_from_entry
+from utils import write_atomic
 # Assuming data_processor.py contains these (as per original imports)
 # from data_processor import compute_additional_stats, compute_stats, NumpyEncoder
 import pandas as pd
 
+# 보고서 형식 버전 (생성 결과가 달라지는 변경 때 올린다; 일괄 생성 매니페스트 지문에 쓰임)
+REPORT_VERSION = 11
+
 # Dummy NumpyEncoder for standalone execution if needed
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -17,25 +30,25 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.tolist()
         return super(NumpyEncoder, self).default(obj)
 
-# Dummy compute_additional_stats for standalone execution if needed
+# 보고서용 compute_additional_stats: 데이터가 없으면 {}, 표본이 1개면 std 'N/A'
+# (계산은 data_processor의 정렬 한 번 커널 버전을 그대로 쓰고 형식만 맞춘다)
 def compute_additional_stats(data, grade_type):
-    # Replace with actual implementation
-    # This is a placeholder
     if data.empty:
         return {}
+    computed = _compute_additional_stats(data, grade_type)
     stats = {}
     for result_key in ["합격", "충원합격", "불합격"]:
-        result_data = data[data["result"] == result_key][grade_type].dropna()
-        if not result_data.empty:
+        s = computed[result_key]
+        if s['count'] > 0:
             stats[result_key] = {
-                'count': len(result_data),
-                'mean': result_data.mean() if len(result_data) > 0 else 'N/A',
-                'std': result_data.std() if len(result_data) > 1 else 'N/A',
-                'median': result_data.median() if len(result_data) > 0 else 'N/A',
-                'max': result_data.max() if len(result_data) > 0 else 'N/A',
-                'min': result_data.min() if len(result_data) > 0 else 'N/A',
-                'q1': result_data.quantile(0.25) if len(result_data) > 0 else 'N/A',
-                'q3': result_data.quantile(0.75) if len(result_data) > 0 else 'N/A',
+                'count': s['count'],
+                'mean': s['mean'],
+                'std': s['std'] if s['count'] > 1 else 'N/A',
+                'median': s['median'],
+                'max': s['max'],
+                'min': s['min'],
+                'q1': s['q1'],
+                'q3': s['q3'],
             }
         else:
             stats[result_key] = {'count': 0}
@@ -111,11 +124,123 @@ def create_additional_stats_html(stats, grade_type, result_order=["합격", "충
     """
     return html_output
 
+# 등급 히스토그램 구간: 1~9등급을 0.5 간격 16개 구간으로 (마지막 구간은 9등급 포함)
+HIST_BIN_EDGES = np.arange(1.0, 9.0 + 0.25, 0.5)
+HIST_BIN_CENTERS = ((HIST_BIN_EDGES[:-1] + HIST_BIN_EDGES[1:]) / 2).tolist()
+HIST_BIN_LABELS = [f"{lo:.1f}~{hi:.1f}" for lo, hi in zip(HIST_BIN_EDGES[:-1], HIST_BIN_EDGES[1:])]
+
+
+def _histogram_trace(values, name, color):
+    """등급 값 → 구간별 인원 수 막대 trace (데이터 크기와 무관하게 구간 16개만 싣는다)"""
+    counts, _ = np.histogram(np.asarray(values, dtype=np.float64), bins=HIST_BIN_EDGES)
+    return f"""{{
+            x: {json.dumps(HIST_BIN_CENTERS)},
+            y: {json.dumps(counts.tolist())},
+            customdata: {json.dumps(HIST_BIN_LABELS)},
+            type: 'bar',
+            name: '{name}',
+            opacity: 0.7,
+            marker: {{ color: '{color}' }},
+            hovertemplate: '%{{customdata}}등급: %{{y}}명<extra>{name}</extra>',
+            hoverlabel: {{ bgcolor: '{color}' }}
+        }}"""
+
+
 # 새로운 함수: 히스토그램 및 추가 시각화 생성 (수정됨)
-def create_advanced_visualizations(plot_id, data):
+# 추가 시각화를 그리는 페이지 함수 (보고서마다 같으므로 assets 레이아웃에서는 report.js에 들어간다)
+_ADVANCED_VIS_FUNCTIONS = """    function initAdvancedVisualizations(plotId) {
+        if (!window.Plotly || !window.advancedVisualizationData || !window.advancedVisualizationData[plotId]) {
+            console.warn('Plotly or advancedVisualizationData not ready for plotId:', plotId);
+            return;
+        }
+
+        var data = window.advancedVisualizationData[plotId];
+
+        // 결과별 도넛 차트 (전형유형별)
+        if (data.donutGroups) {
+            data.donutGroups.forEach(function(g, idx) {
+                var el = document.getElementById('donut-chart-' + plotId + '-' + idx);
+                if (el && g.traces && g.traces.length > 0) { // Added g.traces check
+                    try {
+                        Plotly.newPlot(el, g.traces, {
+                            title: '',
+                            legend: { orientation: 'h', y: -0.1, x: 0.5, xanchor: 'center' },
+                            margin: { t: 30, b: 50, l: 50, r: 50 },
+                            autosize: true,
+                            height: 350,
+                            plot_bgcolor: '#FAFAFA',
+                            paper_bgcolor: '#FAFAFA'
+                        }, { displayModeBar: false, responsive: true });
+                    } catch (e) { console.error('도넛 차트 생성 오류 for ' + g.apptype + ':', e, g.traces); }
+                } else if (el) {
+                    // console.log('No donut traces for apptype:', g.apptype);
+                    // el.innerHTML = '<p style="text-align:center;color:#999;">데이터 없음</p>';
+                }
+            });
+        }
+
+        // 대학별 지원 현황 (전형유형별)
+        if (data.univRateGroups) {
+            data.univRateGroups.forEach(function(g, idx) {
+                var el = document.getElementById('univ-pass-rates-' + plotId + '-' + idx);
+                if (el && g.traces && g.traces.length > 0) {
+                    try {
+                        var barHeight = 35;
+                        var margin = 50;
+                        var minHeight = 80;
+                        var count = g.barCount || g.traces[0].y.length || 0;
+                        var dynamicHeight = Math.max(minHeight, barHeight * count + margin);
+                        el.style.height = dynamicHeight + 'px';
+                        Plotly.newPlot(el, g.traces, {
+                            title: '',
+                            showlegend: true,
+                            barmode: 'stack',
+                            margin: { t: 30, b: 50, l: 150, r: 50 },
+                            xaxis: { title: '지원자 수 (명)' },
+                            yaxis: { automargin: true },
+                            autosize: true,
+                            height: dynamicHeight,
+                            plot_bgcolor: '#FAFAFA',
+                            paper_bgcolor: '#FAFAFA'
+                        }, { displayModeBar: false, responsive: true });
+                    } catch (e) { console.error('대학별 합격률 차트 생성 오류 for ' + g.apptype + ':', e, g.traces); }
+                }
+            });
+        }
+
+
+        // 전교과등급 히스토그램
+        var allSubjHistEl = document.getElementById('all-subj-grade-histogram-' + plotId);
+        if (allSubjHistEl && data.allSubjGradeHistograms && data.allSubjGradeHistograms.length > 0) {
+            try {
+                Plotly.newPlot(allSubjHistEl, data.allSubjGradeHistograms, {
+                    title: '',
+                    barmode: 'group',
+                    bargap: 0.1,
+                    xaxis: { title: '전교과등급', range: [1, 9], dtick: 0.5 },
+                    yaxis: { title: '인원 (명)' },
+                    legend: { orientation: 'h', y: 1.1, x: 0.5, xanchor: 'center' },
+                    margin: { t: 30, b: 60, l: 60, r: 50 },
+                    autosize: true,
+                    height: 350,
+                    plot_bgcolor: '#FAFAFA',
+                    paper_bgcolor: '#FAFAFA'
+                }, { displayModeBar: false, responsive: true });
+            } catch (e) { console.error("전교과등급 히스토그램 생성 오류:", e, data.allSubjGradeHistograms); }
+        } else if (allSubjHistEl) {
+            // console.log('No all subj grade histogram data.');
+            // allSubjHistEl.innerHTML = '<p style="text-align:center;color:#999;">데이터 없음</p>';
+        }
+    }
+"""
+
+
+def create_advanced_visualizations(plot_id, data, include_functions=True):
     """전체 데이터 요약에 대한 추가 시각화 생성
 
     결과별 분포와 대학별 합격률을 전형유형별로 구분하여 표시한다.
+    등급 히스토그램은 구간별 인원 수를 미리 세어 막대 trace로 싣는다 (_histogram_trace).
+    include_functions=False면 그리기 함수(initAdvancedVisualizations)는 싣지 않는다 (assets/report.js에 있음).
     """
     # 파스텔톤 색상 맵
     color_map = {
@@ -130,10 +255,11 @@ def create_advanced_visualizations(plot_id, data):
     univ_rate_groups = []
 
     for apptype in apptypes:
-        df_app = data[data['apptype'] == apptype]
+        df_app = data[value_mask(data, 'apptype', [apptype])]
 
         # 결과별 도넛 차트
-        rc = df_app['result'].value_counts().to_dict()
+        rc = df_app['result'].value_counts()
+        rc = rc[rc > 0].to_dict()
         v = []
         l = []
         c = []
@@ -165,9 +291,9 @@ def create_advanced_visualizations(plot_id, data):
         top_univs = []
         if len(df_app) > 0 and 'univ' in df_app.columns:
             stats = {}
-            for univ, grp in df_app.groupby('univ'):
-                pass_cnt = len(grp[grp['result'].isin(['합격', '충원합격'])])
-                fail_cnt = len(grp[grp['result'] == '불합격'])
+            for univ, grp in df_app.groupby('univ', observed=True):
+                pass_cnt = int(value_mask(grp, 'result', ['합격', '충원합격']).sum())
+                fail_cnt = int(value_mask(grp, 'result', ['불합격']).sum())
                 total = pass_cnt + fail_cnt
                 # Include all universities regardless of pass count
                 if total > 0:
@@ -211,65 +337,20 @@ def create_advanced_visualizations(plot_id, data):
             f"{{apptype: '{apptype}', traces: [{', '.join(univ_traces_for_apptype)}], barCount: {len(top_univs)} }}"
         )
 
-    # 환산등급 히스토그램 데이터
+    # 등급 히스토그램: 고정 구간(1~9, 0.5 간격)의 인원 수를 미리 세어 막대 trace로 싣는다
+    pass_mask = value_mask(data, "result", ["합격", "충원합격"])
+    fail_mask = value_mask(data, "result", ["불합격"])
     conv_grade_histograms = []
-    pass_data_conv = data[data["result"].isin(["합격", "충원합격"])]["conv_grade"].dropna()
-    if not pass_data_conv.empty: # MODIFICATION: Check if data is not empty
-        values_json = json.dumps(pass_data_conv.tolist(), cls=NumpyEncoder)
-        conv_grade_histograms.append(f"""{{
-            x: {values_json},
-            type: 'histogram',
-            name: '합격(충원포함)',
-            opacity: 0.7,
-            marker: {{ color: '{color_map.get("합격", "#A8D8EA")}' }},
-            xbins: {{ start: 1, end: 9, size: 0.5 }},
-            hoverinfo: 'y+x+name',
-            hoverlabel: {{ bgcolor: '{color_map.get("합격", "#A8D8EA")}' }}
-        }}""")
-
-    fail_data_conv = data[data["result"] == "불합격"]["conv_grade"].dropna()
-    if not fail_data_conv.empty: # MODIFICATION: Check if data is not empty
-        values_json = json.dumps(fail_data_conv.tolist(), cls=NumpyEncoder)
-        conv_grade_histograms.append(f"""{{
-            x: {values_json},
-            type: 'histogram',
-            name: '불합격',
-            opacity: 0.7,
-            marker: {{ color: '{color_map.get("불합격", "#FFAAA7")}' }},
-            xbins: {{ start: 1, end: 9, size: 0.5 }},
-            hoverinfo: 'y+x+name',
-            hoverlabel: {{ bgcolor: '{color_map.get("불합격", "#FFAAA7")}' }}
-        }}""")
-
-    # 전교과등급 히스토그램 데이터
     all_subj_grade_histograms = []
-    pass_data_all_subj = data[data["result"].isin(["합격", "충원합격"])]["all_subj_grade"].dropna()
-    if not pass_data_all_subj.empty: # MODIFICATION: Check if data is not empty
-        values_json = json.dumps(pass_data_all_subj.tolist(), cls=NumpyEncoder)
-        all_subj_grade_histograms.append(f"""{{
-            x: {values_json},
-            type: 'histogram',
-            name: '합격(충원포함)',
-            opacity: 0.7,
-            marker: {{ color: '{color_map.get("합격", "#A8D8EA")}' }},
-            xbins: {{ start: 1, end: 9, size: 0.5}},
-            hoverinfo: 'y+x+name',
-            hoverlabel: {{ bgcolor: '{color_map.get("합격", "#A8D8EA")}' }}
-        }}""")
-
-    fail_data_all_subj = data[data["result"] == "불합격"]["all_subj_grade"].dropna()
-    if not fail_data_all_subj.empty: # MODIFICATION: Check if data is not empty
-        values_json = json.dumps(fail_data_all_subj.tolist(), cls=NumpyEncoder)
-        all_subj_grade_histograms.append(f"""{{
-            x: {values_json},
-            type: 'histogram',
-            name: '불합격',
-            opacity: 0.7,
-            marker: {{ color: '{color_map.get("불합격", "#FFAAA7")}' }},
-            xbins: {{ start: 1, end: 9, size: 0.5 }},
-            hoverinfo: 'y+x+name',
-            hoverlabel: {{ bgcolor: '{color_map.get("불합격", "#FFAAA7")}' }}
-        }}""")
+    for column, histograms in (("conv_grade", conv_grade_histograms), ("all_subj_grade", all_subj_grade_histograms)):
+        grades = grade_series(data[column])
+        for name, result_mask, color in (
+            ("합격(충원포함)", pass_mask, color_map.get("합격", "#A8D8EA")),
+            ("불합격", fail_mask, color_map.get("불합격", "#FFAAA7")),
+        ):
+            values = grades[result_mask].dropna()
+            if not values.empty: # MODIFICATION: Check if data is not empty
+                histograms.append(_histogram_trace(values, name, color))
 
     donut_groups_js = "[ " + ", ".join(donut_groups) + " ]"
     univ_rate_groups_js = "[ " + ", ".join(univ_rate_groups) + " ]"
@@ -334,92 +415,7 @@ def create_advanced_visualizations(plot_id, data):
     document.addEventListener('DOMContentLoaded', function() {{
         initAdvancedVisualizations("{plot_id}");
     }});
-
-    function initAdvancedVisualizations(plotId) {{
-        if (!window.Plotly || !window.advancedVisualizationData || !window.advancedVisualizationData[plotId]) {{
-            console.warn('Plotly or advancedVisualizationData not ready for plotId:', plotId);
-            return;
-        }}
-
-        var data = window.advancedVisualizationData[plotId];
-
-        // 결과별 도넛 차트 (전형유형별)
-        if (data.donutGroups) {{
-            data.donutGroups.forEach(function(g, idx) {{
-                var el = document.getElementById('donut-chart-' + plotId + '-' + idx);
-                if (el && g.traces && g.traces.length > 0) {{ // Added g.traces check
-                    try {{
-                        Plotly.newPlot(el, g.traces, {{
-                            title: '',
-                            legend: {{ orientation: 'h', y: -0.1, x: 0.5, xanchor: 'center' }},
-                            margin: {{ t: 30, b: 50, l: 50, r: 50 }},
-                            autosize: true,
-                            height: 350,
-                            plot_bgcolor: '#FAFAFA',
-                            paper_bgcolor: '#FAFAFA'
-                        }}, {{ displayModeBar: false, responsive: true }});
-                    }} catch (e) {{ console.error('도넛 차트 생성 오류 for ' + g.apptype + ':', e, g.traces); }}
-                }} else if (el) {{
-                    // console.log('No donut traces for apptype:', g.apptype);
-                    // el.innerHTML = '<p style="text-align:center;color:#999;">데이터 없음</p>';
-                }}
-            }});
-        }}
-
-        // 대학별 지원 현황 (전형유형별)
-        if (data.univRateGroups) {{
-            data.univRateGroups.forEach(function(g, idx) {{
-                var el = document.getElementById('univ-pass-rates-' + plotId + '-' + idx);
-                if (el && g.traces && g.traces.length > 0) {{
-                    try {{
-                        var barHeight = 35;
-                        var margin = 50;
-                        var minHeight = 80;
-                        var count = g.barCount || g.traces[0].y.length || 0;
-                        var dynamicHeight = Math.max(minHeight, barHeight * count + margin);
-                        el.style.height = dynamicHeight + 'px';
-                        Plotly.newPlot(el, g.traces, {{
-                            title: '',
-                            showlegend: true,
-                            barmode: 'stack',
-                            margin: {{ t: 30, b: 50, l: 150, r: 50 }},
-                            xaxis: {{ title: '지원자 수 (명)' }},
-                            yaxis: {{ automargin: true }},
-                            autosize: true,
-                            height: dynamicHeight,
-                            plot_bgcolor: '#FAFAFA',
-                            paper_bgcolor: '#FAFAFA'
-                        }}, {{ displayModeBar: false, responsive: true }});
-                    }} catch (e) {{ console.error('대학별 합격률 차트 생성 오류 for ' + g.apptype + ':', e, g.traces); }}
-                }}
-            }});
-        }}
-
-
-        // 전교과등급 히스토그램
-        var allSubjHistEl = document.getElementById('all-subj-grade-histogram-' + plotId);
-        if (allSubjHistEl && data.allSubjGradeHistograms && data.allSubjGradeHistograms.length > 0) {{
-            try {{
-                Plotly.newPlot(allSubjHistEl, data.allSubjGradeHistograms, {{
-                    title: '',
-                    barmode: 'group',
-                    bargap: 0.1,
-                    xaxis: {{ title: '전교과등급', range: [1, 9], dtick: 0.5 }},
-                    yaxis: {{ title: '인원 (명)' }},
-                    legend: {{ orientation: 'h', y: 1.1, x: 0.5, xanchor: 'center' }},
-                    margin: {{ t: 30, b: 60, l: 60, r: 50 }},
-                    autosize: true,
-                    height: 350,
-                    plot_bgcolor: '#FAFAFA',
-                    paper_bgcolor: '#FAFAFA'
-                }}, {{ displayModeBar: false, responsive: true }});
-            }} catch (e) {{ console.error("전교과등급 히스토그램 생성 오류:", e, data.allSubjGradeHistograms); }}
-        }} else if (allSubjHistEl) {{
-            // console.log('No all subj grade histogram data.');
-            // allSubjHistEl.innerHTML = '<p style="text-align:center;color:#999;">데이터 없음</p>';
-        }}
-    }}
-    </script>
+""" + ("\n" + _ADVANCED_VIS_FUNCTIONS if include_functions else "") + """    </script>
     """
 
     return script + visualizations_html + init_script
@@ -454,172 +450,248 @@ def create_stats_html(stats: dict) -> str:
         sc += f'<div class="stats-item stats-fail">불합격: {fc}명 <span class="highlight-fail-rate">({fc/tc*100:.1f}%)</span></div>'
     return sc
 
-    # 플롯 데이터 스크립트 생성 함수 (수정됨: 평균 숫자 표시 제거)
-def create_plot_data_script(plot_id, data, y_positions, marker_styles, symbol_map=None):
+# 산점도 trace의 결과별 모양 (순서 = 페이지 JS가 만드는 trace 순서)
+RESULT_ORDER = ["합격", "충원합격", "불합격"]
+TRACE_COLORS = {
+    "합격": {"border": "#3366CC", "fill": "rgba(51, 102, 204, 0.3)"},
+    "불합격": {"border": "#DC3912", "fill": "rgba(220, 57, 18, 0.3)"},
+    "충원합격": {"border": "#109618", "fill": "rgba(16, 150, 24, 0.3)"}
+}
+TRACE_SYMBOLS = {
+    "합격": "circle",
+    "충원합격": "triangle-up",
+    "불합격": "x",
+}
+TRACE_Y_POSITIONS = {"합격": 0.01, "충원합격": 0.0, "불합격": -0.03}
+# 공유 데이터셋에 사전 부호화해 넣는 열 (hover의 customdata 순서와 같음)
+DATASET_LABEL_COLUMNS = ["dept", "subtype", "univ"]
+DATASET_GRADE_COLUMNS = {"conv": "conv_grade", "all_subj": "all_subj_grade"}
+
+
+# 보고서에 싣는 숫자 배열 형식: binary(base64 typed array, 기본) / json(일반 JSON 리스트, 호환용)
+ARRAY_ENCODINGS = ("binary", "json")
+
+# 큰 산점도 표시 방식: 점 수가 WebGL 기준을 넘으면 scattergl, 밀도 기준을 넘으면 0.1등급 구간 밀도 표시
+DEFAULT_WEBGL_THRESHOLD = 5000
+DEFAULT_DENSITY_THRESHOLD = 50000
+DENSITY_TOP_DEPTS = 3  # 밀도 구간 hover에 보여 줄 모집단위 수
+
+
+def _grade_column_json(values) -> list:
+    """등급 열 → JSON 리스트 (결측은 null)"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), 6)
+    out = rounded.tolist()
+    for i in np.flatnonzero(np.isnan(rounded)):
+        out[i] = None
+    return out
+
+
+def _index_dtype(upper: int) -> str:
+    """-1..upper 정수를 담는 가장 작은 부호 있는 정수형 (페이지 JS의 Int8/16/32Array)"""
+    for dtype in ("i1", "i2"):
+        if upper <= np.iinfo(dtype).max:
+            return dtype
+    return "i4"
+
+
+def encode_array(values, dtype: str, encoding: str = "binary"):
     """
-    환산등급과 전교과 등급에 대한 산점도 데이터를 생성하는 JavaScript 코드 반환
-    추가 통계 정보를 함께 표시, 결과 순서 변경
-    모든 결과 카테고리(합격, 충원합격, 불합격)에 대해 항상 trace 생성
+    숫자 배열 → 보고서에 싣는 JSON 값
+    binary: NumPy 버퍼를 그대로 base64로 인코딩한 {"dtype": "f4", "bdata": ...} (little-endian, 원소별 변환 없음)
+            보고서 계산 작업자의 decodeArray가 typed array로 풀고, f4 등급은 소수 6자리로 맞춘다.
+    json  : 일반 JSON 리스트 (실수는 소수 6자리 반올림, 결측은 null)
     """
-    color_map = {
-        "합격": {"border": "#3366CC", "fill": "rgba(51, 102, 204, 0.3)"},
-        "불합격": {"border": "#DC3912", "fill": "rgba(220, 57, 18, 0.3)"},
-        "충원합격": {"border": "#109618", "fill": "rgba(16, 150, 24, 0.3)"}
-    }
+    if encoding == "binary":
+        buffer = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+        return {"dtype": dtype, "bdata": base64.b64encode(buffer.tobytes()).decode("ascii")}
+    if encoding == "json":
+        if dtype.startswith("f"):
+            return _grade_column_json(values)
+        return np.asarray(values).tolist()
+    raise ValueError(f"array encoding은 {ARRAY_ENCODINGS} 중 하나여야 합니다: {encoding!r}")
 
-    if symbol_map is None:
-        symbol_map = {
-            "합격": "circle",
-            "충원합격": "triangle-up",
-            "불합격": "x",
-        }
-    conv_add_stats = compute_additional_stats(data, "conv_grade")
-    all_subj_add_stats = compute_additional_stats(data, "all_subj_grade")
-    conv_traces = []
-    # conv_means_traces = [] # 평균 숫자 표시 제거
-
-    for result in ["합격", "충원합격", "불합격"]:
-        result_data = data[data["result"] == result]
-        x_values_conv = result_data["conv_grade"].dropna().tolist()
-
-        if len(x_values_conv) == 0:
-            conv_traces.append(f"""{{
-                x: [], y: [], type: 'scatter', mode: 'markers', name: '{result}',
-                marker: {{ color: '{color_map[result]["fill"]}', line: {{color: '{color_map[result]["border"]}', width: 1.5}}, symbol: '{symbol_map.get(result, "circle")}', size: 12 }},
-                showlegend: false, hoverinfo: 'skip'
-            }}""")
-        else:
-            conv_rows = result_data.dropna(subset=["conv_grade"])
-            x_values_json = json.dumps(conv_rows["conv_grade"].tolist(), cls=NumpyEncoder)
-            y_values_json = json.dumps([y_positions.get(result, 0)] * len(conv_rows))
-            customdata_json = json.dumps(list(zip(conv_rows["dept"], conv_rows["subtype"], conv_rows["univ"])), cls=NumpyEncoder)
-            conv_traces.append(f"""{{
-                x: {x_values_json}, y: {y_values_json}, type: 'scatter', mode: 'markers', name: '{result}',
-                marker: {{ color: '{color_map[result]["fill"]}', line: {{color: '{color_map[result]["border"]}', width: 1.5}}, symbol: '{symbol_map.get(result, "circle")}', size: 12 }},
-                customdata: {customdata_json},
-                hovertemplate: '환산등급: %{{x}}<br>대학: %{{customdata[2]}}<br>모집단위: %{{customdata[0]}}<br>세부유형: %{{customdata[1]}}<extra></extra>'
-            }}""")
-# 평균값을 표시하는 텍스트 트레이스 추가 (제거됨)
-            # conv_means_traces.append(f"""{{
-            #     type: 'scatter',
-            #     x: ['{result}'],
-            #     y: [{mean_value}],
-            #     mode: 'text',
-            #     text: ['평균: {mean_value:.2f}'],
-            #     textposition: 'top center',
-            #     textfont: {{ size: 11, color: '{color_map[result]["border"]}', weight: 'bold' }},
-            #     showlegend: false,
-            #     hoverinfo: 'none'
-            # }}""")
-
-    all_subj_traces = []
-    # all_subj_means_traces = [] # 평균 숫자 표시 제거
-
-    for result in ["합격", "충원합격", "불합격"]:
-        result_data = data[data["result"] == result]
-        x_values_all_subj = result_data["all_subj_grade"].dropna().tolist()
-        if len(x_values_all_subj) == 0:
-            all_subj_traces.append(f"""{{
-                x: [], y: [], type: 'scatter', mode: 'markers', name: '{result}',
-                marker: {{ color: '{color_map[result]["fill"]}', line: {{color: '{color_map[result]["border"]}', width: 1.5}}, symbol: '{symbol_map.get(result, "circle")}', size: 12 }},
-                showlegend: false, hoverinfo: 'skip'
-            }}""")
-        else:
-            subj_rows = result_data.dropna(subset=["all_subj_grade"])
-            x_values_json = json.dumps(subj_rows["all_subj_grade"].tolist(), cls=NumpyEncoder)
-            y_values_json = json.dumps([y_positions.get(result, 0)] * len(subj_rows))
-            customdata_json = json.dumps(list(zip(subj_rows["dept"], subj_rows["subtype"], subj_rows["univ"])), cls=NumpyEncoder)
-            all_subj_traces.append(f"""{{
-                x: {x_values_json}, y: {y_values_json}, type: 'scatter', mode: 'markers', name: '{result}',
-                marker: {{ color: '{color_map[result]["fill"]}', line: {{color: '{color_map[result]["border"]}', width: 1.5}}, symbol: '{symbol_map.get(result, "circle")}', size: 12 }},
-                customdata: {customdata_json},
-                hovertemplate: '전교과등급: %{{x}}<br>대학: %{{customdata[2]}}<br>모집단위: %{{customdata[0]}}<br>세부유형: %{{customdata[1]}}<extra></extra>'
-            }}""")
-# 평균값을 표시하는 텍스트 트레이스 추가 (제거됨)
-            # all_subj_means_traces.append(f"""{{
-            #     type: 'scatter',
-            #     x: ['{result}'],
-            #     y: [{mean_value}],
-            #     mode: 'text',
-            #     text: ['평균: {mean_value:.2f}'],
-            #     textposition: 'top center',
-            #     textfont: {{ size: 11, color: '{color_map[result]["border"]}', weight: 'bold' }},
-            #     showlegend: false,
-            #     hoverinfo: 'none'
-            # }}""")
-
-    conv_stats_html_table = create_additional_stats_html(conv_add_stats, "환산등급", ["합격", "충원합격", "불합격"])
-    all_subj_stats_html_table = create_additional_stats_html(all_subj_add_stats, "전교과등급", ["합격", "충원합격", "불합격"])
-    script = f"""
+
+def _posting_lists(codes, n_labels: int, encoding: str = "binary") -> dict:
+    """
+    값 코드 배열 → 값별 행 번호 목록 (CSR 형식)
+    rows: 값 코드 순으로 모은 행 번호, offsets: 값 k의 행은 rows[offsets[k]:offsets[k + 1]] (결측 -1은 제외)
+    """
+    codes = np.asarray(codes)
+    valid = np.flatnonzero(codes >= 0)
+    rows = valid[np.argsort(codes[valid], kind="stable")]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes[valid], minlength=n_labels))))
+    dtype = _index_dtype(len(codes))
+    return {"rows": encode_array(rows, dtype, encoding), "offsets": encode_array(offsets, dtype, encoding)}
+
+
+def create_dataset_script(
+    data, y_positions, symbol_map=None, encoding="binary", row_bases=None, label_columns=None, posting_lists=False,
+):
+    """
+    보고서 전체가 함께 쓰는 열 기반 데이터셋 스크립트 (window.reportData) 반환
+    - 문자열 열은 사전 부호화: labels(고유 값) + codes(행별 위치, 결측 -1)
+    - 등급 열은 행 순서대로 한 번만 싣고, 각 플롯은 행 번호 배열로만 참조한다
+    - codes/등급 배열은 encoding 형식으로 싣는다 (encode_array 참고)
+    - traces: 결과별 trace 모양 (이름, y 위치, 색, 기호)
+    - rowBase: 플롯 id 접두어("u3") → 시작 행. 대학 섹션 플롯은 대학 안의 상대 행 번호를 싣고
+               페이지 JS가 이 값을 더한다 (대학 조각을 위치와 무관하게 캐시하기 위함)
+    - label_columns: 사전 부호화할 열 (기본 DATASET_LABEL_COLUMNS)
+    - posting_lists=True면 열마다 값별 행 번호 목록(postings, _posting_lists)도 싣는다 (인터랙티브 필터용)
+    data의 행 순서(0..n-1)가 곧 플롯이 참조하는 행 번호이다.
+    """
+    payload = _dataset_payload(data, y_positions, symbol_map, encoding, row_bases, label_columns, posting_lists)
+    return f"""
     <script>
-    if (!window.plotsData) window.plotsData = {{}};
-    window.plotsData["{plot_id}"] = {{
-        convTraces: [ {", ".join(conv_traces)} ],
-        allSubjTraces: [ {", ".join(all_subj_traces)} ]
-    }};
+    window.reportData = {json.dumps(payload, ensure_ascii=False, cls=NumpyEncoder)};
     </script>
     """
-    # 위 script 문자열에서 conv_means_traces와 all_subj_means_traces 부분을 제거했습니다.
-    # 원래 코드: convTraces: [ {", ".join(conv_traces)}, {", ".join(conv_means_traces)} ],
-    # 원래 코드: allSubjTraces: [ {", ".join(all_subj_traces)}, {", ".join(all_subj_means_traces)} ]
 
-    return script, conv_stats_html_table, all_subj_stats_html_table
 
-# 새로운 함수: 히스토그램 및 추가 시각화 생성
-# 선택된 모집단위에 대한 대학별 시각화 함수 (전형 필터 추가)
-def plot_selected_depts(
-    df: pd.DataFrame,
-    out_dir: Path,
-    selected_depts: list = None,
-    selected_univs: list = None,
-    selected_subtypes: list = None,
-    selected_apptypes: list = None,
-    selected_regions: list = None,
-    output_file: str = "선택된_모집단위들.html",
-) -> str:
-    """선택된 모집단위에 대한 입시 결과를 대학별로 시각화"""
-    # 선택된 모집단위와 대학에 해당하는 데이터만 필터링
-    df_filtered = df.copy()
+def _dataset_payload(
+    data, y_positions, symbol_map=None, encoding="binary", row_bases=None, label_columns=None, posting_lists=False,
+) -> dict:
+    """create_dataset_script가 싣는 데이터셋 dict (대학별 분할 보고서의 대학 조각도 같은 형식)"""
+    if symbol_map is None:
+        symbol_map = TRACE_SYMBOLS
+    columns = {}
+    for column in label_columns or DATASET_LABEL_COLUMNS:
+        codes, labels = pd.factorize(data[column], sort=True)
+        columns[column] = {"labels": list(labels), "codes": encode_array(codes, _index_dtype(len(labels)), encoding)}
+        if posting_lists:
+            columns[column]["postings"] = _posting_lists(codes, len(labels), encoding)
+    payload = {
+        "columns": columns,
+        "grades": {
+            name: encode_array(data[column], "f4", encoding) for name, column in DATASET_GRADE_COLUMNS.items()
+        },
+        "traces": [
+            {
+                "name": result,
+                "y": y_positions.get(result, 0),
+                "color": TRACE_COLORS[result]["fill"],
+                "border": TRACE_COLORS[result]["border"],
+                "symbol": symbol_map.get(result, "circle"),
+            }
+            for result in RESULT_ORDER
+        ],
+        "rowBase": dict(row_bases or {}),
+    }
+    return payload
 
-    # 선택된 모집단위 필터링
-    if selected_depts:
-        df_filtered = df_filtered[df_filtered['dept'].isin(selected_depts)]
 
-    # 선택된 지역 필터링
-    if selected_regions:
-        df_filtered = df_filtered[df_filtered['region'].isin(selected_regions)]
+def _scatter_mode(data, point_thresholds) -> str:
+    """점 수(두 등급 중 많은 쪽)로 산점도 표시 방식 결정: scatter / scattergl / density"""
+    if point_thresholds is None:
+        return "scatter"
+    webgl_threshold, density_threshold = point_thresholds
+    n_points = max(int(data[column].notna().sum()) for column in DATASET_GRADE_COLUMNS.values())
+    if n_points > density_threshold:
+        return "density"
+    if n_points > webgl_threshold:
+        return "scattergl"
+    return "scatter"
 
-    # 선택된 대학 필터링
-    if selected_univs:
-        df_filtered = df_filtered[df_filtered['univ'].isin(selected_univs)]
 
-    # 선택된 전형 필터링
-    if selected_subtypes:
-        df_filtered = df_filtered[df_filtered['subtype'].isin(selected_subtypes)]
+def _density_bins(data, column, result_masks, encoding="binary") -> list:
+    """
+    결과별 0.1등급 구간 밀도 (RESULT_ORDER 순서)
+    각 결과: {"x": 구간 중심, "count": 구간 인원, "top": 구간에서 인원이 많은 모집단위 요약}
+    """
+    grades = grade_series(data[column]).to_numpy(dtype=np.float64, na_value=np.nan)
+    has_grade = ~np.isnan(grades)
+    bins = np.zeros(len(grades), dtype=np.int64)
+    bins[has_grade] = np.floor(np.round(grades[has_grade] * 10, 6))  # 1.25 → 12 (1.2~1.3 구간)
+    dept_codes, dept_labels = pd.factorize(data["dept"], sort=True)
+
+    result_bins = []
+    for mask in result_masks:
+        selected = mask & has_grade
+        frame = pd.DataFrame({"bin": bins[selected], "dept": dept_codes[selected]})
+        pair_counts = frame.groupby(["bin", "dept"]).size()
+        bin_counts = pair_counts.groupby(level="bin").sum()
+        # 구간마다 인원이 많은 모집단위 (동률이면 이름순)
+        top = {}
+        ranked = pair_counts.sort_values(ascending=False, kind="stable")
+        for (b, d), n in ranked.groupby(level="bin").head(DENSITY_TOP_DEPTS).items():
+            top.setdefault(b, []).append(f"{dept_labels[d] if d >= 0 else '(없음)'} {n}명")
+        result_bins.append({
+            "x": encode_array((bin_counts.index.to_numpy() + 0.5) / 10, "f4", encoding),
+            "count": encode_array(bin_counts.to_numpy(), "i4", encoding),
+            "top": [", ".join(top[b]) for b in bin_counts.index],
+        })
+    return result_bins
+
+
+def _json_island(element_id: str, value) -> str:
+    """
+    값 → 실행되지 않는 JSON 데이터 섬 (<script type="application/json">)
+    문서를 파싱할 때 실행되지 않고, 페이지가 필요할 때 textContent를 JSON.parse로 읽는다.
+    '<'는 \\u003c로 바꿔 문자열 안의 </script>가 블록을 닫지 않게 하고, NaN은 허용하지 않는다 (유효한 JSON만)
+    """
+    text = json.dumps(value, ensure_ascii=False, cls=NumpyEncoder, allow_nan=False).replace("<", "\\u003c")
+    return f'<script type="application/json" id="{element_id}">{text}</script>'
 
-    # 선택된 전형유형 필터링
-    if selected_apptypes:
-        df_filtered = df_filtered[df_filtered['apptype'].isin(selected_apptypes)]
 
-    if df_filtered.empty:
-        return "선택된 조건에 맞는 데이터가 없습니다."
+    # 플롯 데이터 스크립트 생성 함수 (수정됨: 평균 숫자 표시 제거)
+def create_plot_data_script(plot_id, data, add_stats=None, encoding="binary", point_thresholds=None):
+    """
+    환산등급과 전교과 등급에 대한 산점도 데이터를 JSON 데이터 섬(id="plot-data-{plot_id}")으로 반환
+    추가 통계 정보를 함께 표시, 결과 순서 변경
+    점 데이터는 공유 데이터셋(create_dataset_script)의 행 번호로만 싣고,
+    trace는 페이지 JS(buildTraces)가 결과별로 만든다 (결과가 비어 있어도 trace 생성)
+    data의 인덱스는 공유 데이터셋의 행 번호여야 한다. 행 번호 배열은 encoding 형식으로 싣는다.
+    add_stats: 미리 계산된 (환산등급, 전교과등급) 상세 통계. 없으면 data에서 계산
+    point_thresholds: (WebGL 기준, 밀도 기준) 점 수. 넘으면 "mode"를 scattergl로 표시하거나,
+                      행 번호 대신 결과별 0.1등급 구간 밀도(_density_bins)를 싣는다. None이면 항상 SVG 산점도
+    """
+    if add_stats is not None:
+        conv_add_stats, all_subj_add_stats = add_stats
+    else:
+        conv_add_stats = compute_additional_stats(data, "conv_grade")
+        all_subj_add_stats = compute_additional_stats(data, "all_subj_grade")
+
+    # 결과별로 해당 등급이 있는 행 번호 (conv / allSubj 각각 RESULT_ORDER 순서)
+    # 점이 아주 많으면 행 번호 대신 구간 밀도를 싣는다
+    mode = _scatter_mode(data, point_thresholds)
+    result_masks = [value_mask(data, "result", [result]) for result in RESULT_ORDER]
+    plot_rows = {}
+    if mode == "density":
+        plot_rows["mode"] = mode
+        for name, column in (("conv", "conv_grade"), ("allSubj", "all_subj_grade")):
+            plot_rows[name] = _density_bins(data, column, result_masks, encoding)
+    else:
+        if mode == "scattergl":
+            plot_rows["mode"] = mode
+        rows = np.asarray(data.index)
+        rows_dtype = _index_dtype(int(rows.max()) if len(rows) else 0)
+        for name, column in (("conv", "conv_grade"), ("allSubj", "all_subj_grade")):
+            has_grade = data[column].notna().to_numpy()
+            plot_rows[name] = [encode_array(rows[m & has_grade], rows_dtype, encoding) for m in result_masks]
+
+    conv_stats_html_table = create_additional_stats_html(conv_add_stats, "환산등급", RESULT_ORDER)
+    all_subj_stats_html_table = create_additional_stats_html(all_subj_add_stats, "전교과등급", RESULT_ORDER)
+    script = f"""
+    {_json_island(f"plot-data-{plot_id}", plot_rows)}
+    """
 
-    # 필터링된 데이터에서 대학 목록 추출 (순서 보존을 위해 사용)
-    universities = sorted(df_filtered['univ'].unique())
+    return script, conv_stats_html_table, all_subj_stats_html_table
 
-    html_content = f"""
+# 보고서 HTML의 고정 부분 (머리: 스타일/헤더, 스크립트, 꼬리)
+# 보고서 머리: 문서 시작 ~ <title>, 공용 스타일, </head> ~ 목차 영역 시작
+# (inline 레이아웃은 스타일을 문서에 싣고, assets 레이아웃은 assets/report.css를 참조한다)
+_REPORT_HEAD_OPEN = """
     <!DOCTYPE html>
     <html lang="ko">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>선택된 모집단위 입시 결과</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body, html {{ margin:0; padding:0; font-family:'Malgun Gothic', '맑은 고딕', sans-serif; background-color: #f4f7f6; }}
-            .fixed-header {{ position: sticky; top: 0; background-color: white; padding: 10px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); z-index: 1000; width: 100%; border-bottom: 1px solid #ddd; }}
-            .header-content {{ max-width: 1200px; margin: 0 auto; padding: 0 20px; display: flex; flex-direction: column; align-items: center; position: relative; }}
-            .site-title {{
+"""
+
+_REPORT_CSS = """            body, html { margin:0; padding:0; font-family:'Malgun Gothic', '맑은 고딕', sans-serif; background-color: #f4f7f6; }
+            .fixed-header { position: sticky; top: 0; background-color: white; padding: 10px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.1); z-index: 1000; width: 100%; border-bottom: 1px solid #ddd; }
+            .header-content { max-width: 1200px; margin: 0 auto; padding: 0 20px; display: flex; flex-direction: column; align-items: center; position: relative; }
+            .site-title {
                 position: absolute;
                 top: 6px;
                 right: 20px;
@@ -627,114 +699,125 @@ def plot_selected_depts(
                 font-weight: bold;
                 color: #5b9bd5;
                 opacity: 0.85;
-            }}
-            .university-title {{ text-align: center; font-size: 24px; margin: 10px 0 15px; font-weight: bold; color: #333; }}
-            .controls-legend-wrapper {{ display: flex; justify-content: space-between; align-items: center; width: 100%; margin-bottom: 10px; flex-wrap: wrap; }}
-            .grade-toggle-container {{ padding: 10px; background-color: #f8f8f8; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); flex: 1; min-width: 280px; margin-right: 10px; text-align: center; }}
-            .grade-toggle-btn {{ padding: 10px 18px; margin: 0 5px; font-size: 14px; cursor: pointer; border: 1px solid #ccc; border-radius: 6px; background-color: white; transition: all 0.2s ease-in-out; font-weight: 500; }}
-            .grade-toggle-btn:hover {{ background-color: #e9e9e9; border-color: #bbb; }}
-            .grade-toggle-btn.active {{ background-color: #007bff; color: white; border-color: #0056b3; box-shadow: 0 0 5px rgba(0,123,255,0.5); }}
-            .legend-container {{ display: flex; flex-direction: column; align-items: flex-start; flex: 1; min-width: 300px; background-color: #f8f8f8; padding: 10px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }}
-            .legend-items-wrapper {{ display: flex; justify-content: flex-start; margin-bottom: 8px; flex-wrap: wrap; }}
-            .legend-item {{ display: inline-flex; align-items: center; margin: 5px 10px 5px 0; }}
-            .legend-marker {{ font-size: 18px; margin-right: 6px; display: inline-flex; align-items: center; justify-content: center; }}
-            .legend-pass {{ color: #3366CC; }}
-            .legend-wait {{ color: #109618; }}
-            .legend-fail {{ color: #DC3912; }}
-            .legend-text {{ font-size: 14px; color: #333; }}
-            .axis-label {{ font-size: 13px; color: #505050; font-weight: bold; margin-top: 5px; }}
-            .axis-icon {{ font-size: 16px; margin-right: 5px; }}
-            .layout {{ display: flex; justify-content: center; align-items: flex-start; max-width: 1200px; margin: 20px auto; padding: 0 20px; }}
-            .toc-container {{ flex: 0 0 220px; position: sticky; top: 160px; margin-right: 25px; background-color: white; border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; max-height: calc(100vh - 200px); overflow-y: auto; box-shadow: 0 4px 12px rgba(0,0,0,0.08); z-index: 900; }}
-            .toc-header {{ font-weight: bold; font-size: 18px; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; color: #333; }}
-            .toc-university {{ font-weight: bold; margin-top: 10px; cursor: pointer; padding: 6px 8px; border-radius: 4px; transition: background-color 0.2s; color: #0056b3; display:flex; align-items:center; }}
-            .toc-university:hover {{ background-color: #e9ecef; }}
-            .toc-arrow {{ margin-right: 6px; }}
-            .toc-subitems {{ margin-left: 18px; display:none; }}
-            .toc-subtype-item {{ font-size: 0.9em; cursor: pointer; padding: 5px 8px; border-radius: 4px; transition: background-color 0.2s; color: #333; }}
-            .toc-subtype-item:hover {{ background-color: #f1f3f5; }}
-            .main-content {{ flex: 1 1 auto; max-width: calc(100% - 245px); padding-top: 20px; }}
-            .dept-container {{ margin-bottom: 50px; border: 1px solid #d1d9e6; border-radius: 12px; padding: 25px; background-color: #ffffff; box-shadow: 0 6px 18px rgba(0,0,0,0.07); }}
-            .dept-header {{ margin-bottom: 20px; font-weight: bold; font-size: 22px; color: #2c3e50; border-bottom: 2px solid #007bff; padding-bottom: 12px; }}
-            .subtype-container {{ margin-bottom: 30px; border: 1px solid #e7eaf0; border-radius: 8px; padding: 20px; background-color: #fdfdfd; }}
-            .subtype-header {{ margin-bottom: 15px; font-weight: bold; font-size: 18px; color: #34495e; }}
-            .visualization-container {{ display: flex; flex-direction: column; width: 100%; margin-bottom: 20px; }}
-            .plot-stats-wrapper {{ width: 100%; margin-bottom: 10px; }}
-            .stats-container {{ display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }}
-            .stats-item {{ padding: 6px 12px; border-radius: 6px; background-color: #f0f4f7; white-space: nowrap; font-size: 14px; color: #333; border: 1px solid #d6dde3; }}
-            .stats-total {{ font-weight: bold; background-color: #e2e8ef; border-color: #c8d0d8; }}
-            .stats-pass {{ border-left: 4px solid #007bff; }}
-            .stats-wait {{ border-left: 4px solid #28a745; }}
-            .stats-fail {{ border-left: 4px solid #dc3545; }}
-            .highlight-rate, .highlight-fail-rate {{ font-weight: bold; }}
-            .highlight-rate {{ color: #0056b3; }}
-            .highlight-fail-rate {{ color: #c82333; }}
-            .highlight-mean {{ font-weight: bold; color: #1e7e34; }}
-            .highlight-range {{ color: #5a6268; font-size: 13px; }}
-            .plot-container {{ height: 200px; width: 100%; margin: 0 auto; }}
-            .stats-tables-wrapper {{ width: 100%; margin-bottom: 30px; }}
-            .additional-stats-container {{ width: 100%; padding: 10px 0; background-color: transparent; border-radius: 0; font-size: 13px; }}
-            .stats-detail-title {{ font-weight: bold; margin-bottom: 8px; color: #333; font-size: 15px; }}
-            .stats-table {{ width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }}
-            .stats-table th, .stats-table td {{ padding: 8px; text-align: center; border: 1px solid #dee2e6; }}
-            .stats-table th {{ background-color: #e9ecef; font-weight: bold; color: #495057; }}
-            .stats-table .pass-row td {{ background-color: rgba(0, 123, 255, 0.05); }}
-            .stats-table .fail-row td {{ background-color: rgba(220, 53, 69, 0.05); }}
-            .stats-table .waitlist-row td {{ background-color: rgba(40, 167, 69, 0.05); }}
-            .no-stats {{ font-style: italic; color: #6c757d; text-align: center; padding: 15px; }}
+            }
+            .university-title { text-align: center; font-size: 24px; margin: 10px 0 15px; font-weight: bold; color: #333; }
+            .controls-legend-wrapper { display: flex; justify-content: space-between; align-items: center; width: 100%; margin-bottom: 10px; flex-wrap: wrap; }
+            .grade-toggle-container { padding: 10px; background-color: #f8f8f8; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); flex: 1; min-width: 280px; margin-right: 10px; text-align: center; }
+            .grade-toggle-btn { padding: 10px 18px; margin: 0 5px; font-size: 14px; cursor: pointer; border: 1px solid #ccc; border-radius: 6px; background-color: white; transition: all 0.2s ease-in-out; font-weight: 500; }
+            .grade-toggle-btn:hover { background-color: #e9e9e9; border-color: #bbb; }
+            .grade-toggle-btn.active { background-color: #007bff; color: white; border-color: #0056b3; box-shadow: 0 0 5px rgba(0,123,255,0.5); }
+            .legend-container { display: flex; flex-direction: column; align-items: flex-start; flex: 1; min-width: 300px; background-color: #f8f8f8; padding: 10px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }
+            .legend-items-wrapper { display: flex; justify-content: flex-start; margin-bottom: 8px; flex-wrap: wrap; }
+            .legend-item { display: inline-flex; align-items: center; margin: 5px 10px 5px 0; }
+            .legend-marker { font-size: 18px; margin-right: 6px; display: inline-flex; align-items: center; justify-content: center; }
+            .legend-pass { color: #3366CC; }
+            .legend-wait { color: #109618; }
+            .legend-fail { color: #DC3912; }
+            .legend-text { font-size: 14px; color: #333; }
+            .axis-label { font-size: 13px; color: #505050; font-weight: bold; margin-top: 5px; }
+            .axis-icon { font-size: 16px; margin-right: 5px; }
+            .layout { display: flex; justify-content: center; align-items: flex-start; max-width: 1200px; margin: 20px auto; padding: 0 20px; }
+            .toc-container { flex: 0 0 220px; position: sticky; top: 160px; margin-right: 25px; background-color: white; border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; max-height: calc(100vh - 200px); overflow-y: auto; box-shadow: 0 4px 12px rgba(0,0,0,0.08); z-index: 900; }
+            .toc-header { font-weight: bold; font-size: 18px; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; color: #333; }
+            .toc-university { font-weight: bold; margin-top: 10px; cursor: pointer; padding: 6px 8px; border-radius: 4px; transition: background-color 0.2s; color: #0056b3; display:flex; align-items:center; }
+            .toc-university:hover { background-color: #e9ecef; }
+            .toc-arrow { margin-right: 6px; }
+            .toc-subitems { margin-left: 18px; display:none; }
+            .toc-subtype-item { font-size: 0.9em; cursor: pointer; padding: 5px 8px; border-radius: 4px; transition: background-color 0.2s; color: #333; }
+            .toc-subtype-item:hover { background-color: #f1f3f5; }
+            .filter-box { margin-bottom: 16px; }
+            .filter-title { font-weight: bold; font-size: 14px; color: #0056b3; margin-bottom: 6px; }
+            .filter-search { width: 100%; box-sizing: border-box; padding: 4px 6px; margin-bottom: 4px; border: 1px solid #ccc; border-radius: 4px; }
+            .filter-options { max-height: 160px; overflow-y: auto; border: 1px solid #eee; border-radius: 4px; padding: 4px; }
+            .filter-option { display: flex; align-items: center; gap: 4px; font-size: 13px; padding: 2px 0; cursor: pointer; }
+            .filter-option.empty { color: #aaa; }
+            .filter-count { margin-left: auto; font-size: 11px; color: #888; }
+            .filter-actions { display: flex; justify-content: space-between; margin-top: 4px; }
+            .filter-actions button { font-size: 12px; padding: 2px 8px; cursor: pointer; }
+            .selection-info { font-size: 14px; font-weight: normal; color: #666; margin-left: 8px; }
+            .main-content { flex: 1 1 auto; max-width: calc(100% - 245px); padding-top: 20px; }
+            .dept-container { margin-bottom: 50px; border: 1px solid #d1d9e6; border-radius: 12px; padding: 25px; background-color: #ffffff; box-shadow: 0 6px 18px rgba(0,0,0,0.07); }
+            .dept-header { margin-bottom: 20px; font-weight: bold; font-size: 22px; color: #2c3e50; border-bottom: 2px solid #007bff; padding-bottom: 12px; }
+            .subtype-container { margin-bottom: 30px; border: 1px solid #e7eaf0; border-radius: 8px; padding: 20px; background-color: #fdfdfd; }
+            .subtype-header { margin-bottom: 15px; font-weight: bold; font-size: 18px; color: #34495e; }
+            .visualization-container { display: flex; flex-direction: column; width: 100%; margin-bottom: 20px; }
+            .plot-stats-wrapper { width: 100%; margin-bottom: 10px; }
+            .stats-container { display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }
+            .stats-item { padding: 6px 12px; border-radius: 6px; background-color: #f0f4f7; white-space: nowrap; font-size: 14px; color: #333; border: 1px solid #d6dde3; }
+            .stats-total { font-weight: bold; background-color: #e2e8ef; border-color: #c8d0d8; }
+            .stats-pass { border-left: 4px solid #007bff; }
+            .stats-wait { border-left: 4px solid #28a745; }
+            .stats-fail { border-left: 4px solid #dc3545; }
+            .highlight-rate, .highlight-fail-rate { font-weight: bold; }
+            .highlight-rate { color: #0056b3; }
+            .highlight-fail-rate { color: #c82333; }
+            .highlight-mean { font-weight: bold; color: #1e7e34; }
+            .highlight-range { color: #5a6268; font-size: 13px; }
+            .plot-container { height: 200px; width: 100%; margin: 0 auto; }
+            .stats-tables-wrapper { width: 100%; margin-bottom: 30px; }
+            .additional-stats-container { width: 100%; padding: 10px 0; background-color: transparent; border-radius: 0; font-size: 13px; }
+            .stats-detail-title { font-weight: bold; margin-bottom: 8px; color: #333; font-size: 15px; }
+            .stats-table { width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }
+            .stats-table th, .stats-table td { padding: 8px; text-align: center; border: 1px solid #dee2e6; }
+            .stats-table th { background-color: #e9ecef; font-weight: bold; color: #495057; }
+            .stats-table .pass-row td { background-color: rgba(0, 123, 255, 0.05); }
+            .stats-table .fail-row td { background-color: rgba(220, 53, 69, 0.05); }
+            .stats-table .waitlist-row td { background-color: rgba(40, 167, 69, 0.05); }
+            .no-stats { font-style: italic; color: #6c757d; text-align: center; padding: 15px; }
             /* 추가 시각화를 위한 스타일 */
-            .advanced-visualizations-container {{ width: 100%; margin-top: 20px; }}
-            .visualization-row {{ display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }}
-            .half-width-visualization {{ flex: 1 1 calc(50% - 10px); min-width: 400px; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }}
-            .full-width-visualization {{ flex: 1 1 100%; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }}
-            .visualization-title {{ font-weight: bold; font-size: 16px; margin-bottom: 15px; color: #506380; text-align: center; }}
-            @media (max-width: 992px) {{
-                .layout {{ flex-direction: column; align-items: center; }}
-                .toc-container {{ position: static; width: 100%; max-width: 600px; margin-right: 0; margin-bottom: 20px; max-height: 300px; }}
-                .main-content {{ max-width: 100%; width: 100%; }}
-                .controls-legend-wrapper {{ flex-direction: column; align-items: stretch; }}
-                .grade-toggle-container, .legend-container {{ width: auto; margin-right: 0; margin-bottom: 10px; }}
-                .visualization-row {{ flex-direction: column; }}
-                .half-width-visualization {{ min-width: 100%; margin-bottom: 15px; }}
-            }}
-            @media (max-width: 768px) {{
-                .fixed-header {{ padding: 5px 0; }}
-                .header-content {{ padding: 0 10px; }}
-                .university-title {{ font-size: 20px; margin-bottom: 10px; }}
-                .grade-toggle-btn {{ padding: 8px 12px; font-size: 13px; }}
-                .legend-item {{ margin: 3px 8px 3px 0; }}
-                .legend-text, .axis-label {{ font-size: 12px; }}
-                .dept-header {{ font-size: 20px; }}
-                .subtype-header {{ font-size: 17px; }}
-                .stats-item {{ font-size: 13px; padding: 5px 10px; }}
-                .plot-container {{ height: 200px; }}
-                .additional-stats-container {{ padding: 10px 0; }}
-                .stats-detail-title {{ font-size: 14px; }}
-                .stats-table th, .stats-table td {{ padding: 6px; }}
-            }}
-            .filter-info-container {{
+            .advanced-visualizations-container { width: 100%; margin-top: 20px; }
+            .visualization-row { display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }
+            .half-width-visualization { flex: 1 1 calc(50% - 10px); min-width: 400px; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }
+            .full-width-visualization { flex: 1 1 100%; background-color: #FFFFFF; border-radius: 12px; padding: 20px; box-shadow: 0 3px 10px rgba(0,0,0,0.05); }
+            .visualization-title { font-weight: bold; font-size: 16px; margin-bottom: 15px; color: #506380; text-align: center; }
+            @media (max-width: 992px) {
+                .layout { flex-direction: column; align-items: center; }
+                .toc-container { position: static; width: 100%; max-width: 600px; margin-right: 0; margin-bottom: 20px; max-height: 300px; }
+                .main-content { max-width: 100%; width: 100%; }
+                .controls-legend-wrapper { flex-direction: column; align-items: stretch; }
+                .grade-toggle-container, .legend-container { width: auto; margin-right: 0; margin-bottom: 10px; }
+                .visualization-row { flex-direction: column; }
+                .half-width-visualization { min-width: 100%; margin-bottom: 15px; }
+            }
+            @media (max-width: 768px) {
+                .fixed-header { padding: 5px 0; }
+                .header-content { padding: 0 10px; }
+                .university-title { font-size: 20px; margin-bottom: 10px; }
+                .grade-toggle-btn { padding: 8px 12px; font-size: 13px; }
+                .legend-item { margin: 3px 8px 3px 0; }
+                .legend-text, .axis-label { font-size: 12px; }
+                .dept-header { font-size: 20px; }
+                .subtype-header { font-size: 17px; }
+                .stats-item { font-size: 13px; padding: 5px 10px; }
+                .plot-container { height: 200px; }
+                .additional-stats-container { padding: 10px 0; }
+                .stats-detail-title { font-size: 14px; }
+                .stats-table th, .stats-table td { padding: 6px; }
+            }
+            .filter-info-container {
                 margin: 15px 0;
                 background-color: #e9f7fe;
                 border: 1px solid #b8e3ff;
                 padding: 15px;
                 border-radius: 8px;
-            }}
-            .filter-info-container h3 {{
+            }
+            .filter-info-container h3 {
                 margin-top: 0;
                 color: #0275d8;
                 font-size: 16px;
                 margin-bottom: 10px;
-            }}
-            .filter-info-container ul {{
+            }
+            .filter-info-container ul {
                 margin: 0;
                 padding-left: 20px;
-            }}
-            .filter-info-container li {{
+            }
+            .filter-info-container li {
                 margin-bottom: 5px;
                 font-size: 14px;
-            }}
-        </style>
+            }
+"""
 
+_REPORT_HEAD_CLOSE = """
     </head>
     <body>
         <div class="fixed-header">
@@ -759,372 +842,312 @@ def plot_selected_depts(
         </div>
         <div class="layout">
             <aside class="toc-container">
-                <div class="toc-header">목차</div>
-                <div id="toc-content"></div>
-            </aside>
+"""
+
+_REPORT_HEAD = (
+    _REPORT_HEAD_OPEN
+    + f'        <script src="{PLOTLY_CDN_URL}"></script>\n'
+    + "        <style>\n" + _REPORT_CSS + "        </style>\n"
+    + _REPORT_HEAD_CLOSE
+)
+
+# 목차(create_toc_html) 뒤, 본문 시작
+_REPORT_MAIN_OPEN = """            </aside>
             <main class="main-content">\n"""
 
-    y_positions = {"합격":0.01, "충원합격":0.0, "불합격":-0.03}
-    marker_styles = {
-        "합격": {"opacity":0.7, "line":dict(width=1.5, color="blue"), "color":"rgba(0,0,255,0.3)"},
-        "불합격": {"opacity":0.6, "line":dict(width=0.7, color="red"), "color":"rgba(255,0,0,0.2)"},
-        "충원합격": {"opacity":0.7, "line":dict(width=1.2, color="steelblue"), "color":"rgba(70,130,180,0.3)"}
+_REPORT_SCRIPT = """
+    <script>
+    var currentGradeType = 'all_subj';
+    var plotsInitialized = false;
+    var initializedPlots = {};
+    // 목차와 접힌 대학 섹션은 생성기가 미리 렌더링하므로, 페이지 로드 때는 플롯 관찰만 시작한다
+    document.addEventListener('DOMContentLoaded', function() {
+        startReportWorker();  // 데이터셋 디코딩을 작업자에서 먼저 시작
+        observePlots();
+    });
+
+    // ───── 플롯 수명 관리 ─────
+    // 화면 근처(LAZY_MARGIN 안)에 들어온 플롯만 만들고, RELEASE_MARGIN 밖으로 멀어진 플롯은 Plotly.purge로 해제한다.
+    // 살아 있는 플롯(initializedPlots)이 MAX_LIVE_PLOTS를 넘으면 화면 근처가 아닌 것부터 오래된 순으로 해제해
+    // 여러 대학을 열어 보아도 탭 메모리가 일정하게 유지된다.
+    var MAX_LIVE_PLOTS = (window.reportOptions && window.reportOptions.maxLivePlots) || 40;
+    var LAZY_MARGIN = '600px 0px';
+    var RELEASE_MARGIN = '2400px 0px';
+    var livePlots = [];   // 살아 있는 플롯 div id (만든 순서)
+    var nearPlots = {};   // LAZY_MARGIN 안에 있는 플롯 div id
+    var plotObserver = null;
+    var releaseObserver = null;
+
+    function observePlots() {
+        if (!('IntersectionObserver' in window)) {
+            // 지원하지 않는 브라우저: 기존처럼 섹션을 열 때 그 안의 플롯을 모두 만든다
+            initializePlotsInElement('overall-summary');
+            return;
+        }
+        plotObserver = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                if (entry.isIntersecting) {
+                    nearPlots[entry.target.id] = true;
+                    initializePlot(entry.target);
+                    refreshIfStale(entry.target.id);  // 등급 전환 때 미뤄 둔 플롯이면 지금 갱신
+                } else {
+                    delete nearPlots[entry.target.id];
+                }
+            });
+            enforceLivePlotCap();
+        }, {rootMargin: LAZY_MARGIN});
+        releaseObserver = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                if (!entry.isIntersecting) releasePlot(entry.target);
+            });
+        }, {rootMargin: RELEASE_MARGIN});
+        document.querySelectorAll('.plot-container[id^="plot-"]').forEach(observePlot);
     }
-    plot_counter = 1
 
-    for univ_idx, univ in enumerate(universities, 1):
-        # 현재 대학 + 선택된 모집단위에 해당하는 데이터 필터링
-        df_univ = df_filtered[df_filtered['univ'] == univ]
-        html_content += f"""
-        <div class="dept-container" id="univ-{univ_idx}">
-            <div class="dept-header">{univ}</div>
-        """
+    // 플롯 영역을 관찰 대상에 넣는다 (페이지가 나중에 만든 영역도; 관찰자가 없으면 바로 생성)
+    function observePlot(plotDiv) {
+        if (!plotObserver) {
+            initializePlot(plotDiv);
+            return;
+        }
+        plotObserver.observe(plotDiv);
+        releaseObserver.observe(plotDiv);
+    }
 
-        # 전형유형별 요약 먼저 추가
-        ap_summary_container_id = f"apptype-summary-{univ_idx}"
-        html_content += f"""
-        <div class="subtype-container" id="{ap_summary_container_id}" style="background-color: #eef2f7;">
-            <div class="subtype-header" style="color: #1a202c;">전형유형별 요약</div>
-        """
+    // 영역을 지우거나 데이터를 바꾸기 전에 플롯을 해제하고 관찰을 멈춘다
+    function forgetPlot(plotDiv) {
+        releasePlot(plotDiv);
+        delete nearPlots[plotDiv.id];
+        if (plotObserver) {
+            plotObserver.unobserve(plotDiv);
+            releaseObserver.unobserve(plotDiv);
+        }
+    }
 
-        if selected_apptypes:
-            apptypes_all = sorted(set(df_univ['apptype']) & set(selected_apptypes))
-        else:
-            apptypes_all = sorted(df_univ['apptype'].unique())
+    function releasePlot(plotDiv) {
+        var plotId = plotDiv.id;
+        delete plotRequests[plotId];  // 아직 오지 않은 trace 응답은 버린다
+        if (workerPlots[plotId]) {    // 작업자가 들고 있는 플롯 데이터도 놓는다 (다시 만들 때 데이터 섬을 다시 읽음)
+            delete workerPlots[plotId];
+            callWorker({type: 'release', plotId: plotId.slice(5)}, function() {});
+        }
+        if (!initializedPlots[plotId]) return;
+        Plotly.purge(plotDiv);
+        delete initializedPlots[plotId];
+        delete stalePlots[plotId];
+        var i = livePlots.indexOf(plotId);
+        if (i >= 0) livePlots.splice(i, 1);
+    }
 
-        for a_idx, apptype in enumerate(apptypes_all, 1):
-            ss = df_univ[df_univ['apptype'] == apptype]
+    function enforceLivePlotCap() {
+        var i = 0;
+        while (livePlots.length > MAX_LIVE_PLOTS && i < livePlots.length) {
+            if (nearPlots[livePlots[i]]) {
+                i++;  // 화면 근처 플롯은 상한을 넘어도 유지
+            } else {
+                releasePlot(document.getElementById(livePlots[i]));  // livePlots에서 빠지므로 i는 그대로
+            }
+        }
+    }
 
-            if selected_depts:
-                ss = ss[ss['dept'].isin(selected_depts)]
-                if ss.empty:
-                    continue
-            if selected_subtypes:
-                ss = ss[ss['subtype'].isin(selected_subtypes)]
-                if ss.empty:
-                    continue
+    function initializePlot(plotDiv) {
+        var plotId = plotDiv.id;
+        if (initializedPlots[plotId] || plotRequests[plotId] || !window.Plotly) return;
+        var gradeType = currentGradeType;
+        requestTraces(plotId, gradeType, function(div, traces) {
+            if (gradeType !== currentGradeType) {  // 기다리는 사이 등급이 바뀌었으면 현재 등급으로 다시 요청
+                initializePlot(div);
+                return;
+            }
+            try {
+                Plotly.newPlot(div, traces, createPlotLayout(), {displayModeBar: false, responsive: true, useResizeHandler: true});
+                initializedPlots[plotId] = true;
+                livePlots.push(plotId);
+                enforceLivePlotCap();
+            } catch (error) {
+                console.error(`플롯 ${plotId.slice(5)} 초기화 오류:`, error);
+                div.innerHTML = `<p style="text-align:center; color:red;">플롯 생성 중 오류 발생: ${error.message}</p>`;
+            }
+        });
+    }
 
-            conv_stats = compute_stats(ss, "conv_grade")
-            all_subj_stats = compute_stats(ss, "all_subj_grade")
-            conv_stats_html = create_stats_html(conv_stats)
-            all_subj_stats_html = create_stats_html(all_subj_stats)
+    function initializePlotsInElement(elementId) {
+        var container = document.getElementById(elementId);
+        if (!container) return;
+        container.querySelectorAll('.plot-container[id^="plot-"]').forEach(function(div) {
+            initializePlot(div);
+        });
+    }
 
-            plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                plot_counter, ss, y_positions, marker_styles
-            )
+    function initializeAllPlots() {
+        if (plotsInitialized || !window.Plotly) return;
+        console.log('모든 플롯 초기화 중...');
+        var plotContainers = document.querySelectorAll('.plot-container[id^="plot-"]');
+        plotContainers.forEach(function(plotDiv) {
+            initializePlot(plotDiv);
+        });
+        plotsInitialized = true;
+        console.log('모든 플롯 초기화 완료');
+    }
 
-            html_content += f"""
-                <div class="subtype-container" id="apptype-{univ_idx}-{a_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
-                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{apptype}</div>
-                    <div class="visualization-container">
-                        <div class="plot-stats-wrapper">
-                            <div id="conv-stats-{plot_counter}" class="stats-container" style="display:none;">{conv_stats_html}</div>
-                            <div id="all-subj-stats-{plot_counter}" class="stats-container">{all_subj_stats_html}</div>
-                            <div class="plot-container" id="plot-{plot_counter}"></div>
-                        </div>
-                        {plot_script}
-                    </div>
-                </div>
-            """
-            plot_counter += 1
+    // ───── 계산 작업자 ─────
+    // 데이터 디코딩과 trace 배열 계산은 작업자(report-worker-src, 인라인 Blob)가 하고,
+    // 메인 스레드는 받은 typed array에 hover 이름표만 붙여 Plotly를 호출한다.
+    // Worker를 쓸 수 없으면 같은 소스를 메인 스레드에서 비동기로 실행한다.
+    var reportWorker = null;
+    var workerPending = {};  // 요청 번호 → {message, callback}
+    var workerSeq = 0;
+    var workerInit = null;   // 작업자가 뜨기 전 실패하면 메인 스레드 실행기로 다시 보낼 init 메시지
+
+    function startReportWorker() {
+        if (reportWorker) return reportWorker;
+        var sourceBlock = document.getElementById('report-worker-src');  // assets 레이아웃은 report.js가 소스 문자열을 둔다
+        var source = sourceBlock ? sourceBlock.textContent : window.reportWorkerSource;
+        if (typeof Worker === 'undefined') {
+            reportWorker = mainThreadWorker(source);
+        } else try {
+            reportWorker = new Worker(URL.createObjectURL(new Blob([source], {type: 'text/javascript'})));
+            reportWorker.onmessage = function(event) { onWorkerReply(event.data); };
+            reportWorker.onerror = function(event) {
+                // 작업자 스크립트를 시작하지 못한 경우 (요청 처리 중 오류는 handleMessage가 응답으로 돌려준다)
+                if (event.preventDefault) event.preventDefault();
+                console.error('계산 작업자를 시작하지 못해 메인 스레드에서 계산합니다:', event.message);
+                useMainThreadWorker(source);
+            };
+        } catch (error) {
+            console.error('계산 작업자를 만들지 못해 메인 스레드에서 계산합니다:', error);
+            reportWorker = mainThreadWorker(source);
+        }
+        workerInit = initMessage();
+        postToWorker(workerInit, function() { workerInit = null; });
+        return reportWorker;
+    }
 
-        html_content += """
-        </div>
-        """
+    function mainThreadWorker(source) {
+        // 작업자 소스를 함수 본문으로 실행해 handleMessage를 꺼낸다 (소스 끝이 // 주석이어도 되도록 줄을 바꾼다)
+        var handleMessage = new Function(source + '\\n;return handleMessage;')();
+        return {postMessage: function(message) {
+            setTimeout(function() { onWorkerReply(handleMessage(message).message); }, 0);
+        }};
+    }
 
-        # 대학별 세부유형 요약 섹션을 먼저 추가
-        summary_container_id = f"summary-container-{univ_idx}"
-        html_content += f"""
-        <div class="subtype-container" id="{summary_container_id}" style="background-color: #eef2f7;">
-            <div class="subtype-header" style="color: #1a202c;">세부유형별 요약</div>
-        """
+    function useMainThreadWorker(source) {
+        if (!workerInit) return;  // 이미 init까지 끝난 작업자의 오류는 되살리지 않는다
+        reportWorker = mainThreadWorker(source);
+        Object.keys(workerPending).map(Number).sort(function(a, b) { return a - b; }).forEach(function(id) {
+            reportWorker.postMessage(workerPending[id].message);
+        });
+    }
 
-        # 전형 목록 가져오기
-        if selected_subtypes:
-            subtypes_all = sorted(set(df_univ['subtype']) & set(selected_subtypes))
-        else:
-            subtypes_all = sorted(df_univ['subtype'].unique())
+    // 공유 데이터셋의 배열은 작업자에게 넘기고, 메인 스레드에는 이름표와 trace 모양만 남긴다
+    function initMessage() {
+        var data = window.reportData, columns = {};
+        Object.keys(data.columns).forEach(function(name) {
+            var col = data.columns[name];
+            columns[name] = {labels: col.labels, codes: col.codes, postings: col.postings};
+            delete col.codes;
+            delete col.postings;
+        });
+        var dataset = {columns: columns, grades: data.grades, traces: data.traces, rowBase: data.rowBase};
+        delete data.grades;
+        return {type: 'init', dataset: dataset, options: window.reportOptions || {}};
+    }
 
-        for s_idx, subtype in enumerate(subtypes_all, 1):
-            # 해당 전형의 모든 데이터 추출
-            ss = df_univ[df_univ['subtype'] == subtype]
+    function postToWorker(message, callback) {
+        message.id = ++workerSeq;
+        workerPending[message.id] = {message: message, callback: callback};
+        reportWorker.postMessage(message);
+        return message.id;
+    }
 
-            # 선택된 모집단위 필터링 적용
-            if selected_depts:
-                ss = ss[ss['dept'].isin(selected_depts)]
-                if ss.empty:
-                    continue
+    function callWorker(message, callback) {
+        startReportWorker();
+        return postToWorker(message, callback);
+    }
 
-            # 통계 계산
-            conv_stats = compute_stats(ss, "conv_grade")
-            all_subj_stats = compute_stats(ss, "all_subj_grade")
-            conv_stats_html = create_stats_html(conv_stats)
-            all_subj_stats_html = create_stats_html(all_subj_stats)
+    function onWorkerReply(reply) {
+        var pending = workerPending[reply.id];
+        if (!pending) return;
+        delete workerPending[reply.id];
+        if (reply.error) console.error('계산 작업자 오류:', reply.error);
+        pending.callback(reply.error ? null : reply.result, reply.error);
+    }
 
-            # 박스플롯 스크립트 및 통계 테이블 생성
-            plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                plot_counter, ss, y_positions, marker_styles
-            )
+    // 플롯 데이터는 실행되지 않는 JSON 섬(plot-data-{플롯 id})에 있다. 플롯을 처음 요청할 때만 JSON.parse로 읽어
+    // 작업자에게 넘기고 메인 스레드는 참조를 두지 않는다. 작업자는 플롯이 해제될 때까지 디코딩한 데이터를 들고 있다.
+    function readPlotData(numericId) {
+        var island = document.getElementById('plot-data-' + numericId);
+        return island ? JSON.parse(island.textContent) : undefined;
+    }
 
-            html_content += f"""
-                <div class="subtype-container" id="subtype-summary-{univ_idx}-{s_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
-                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{subtype}</div>
-                    <div class="visualization-container">
-                        <div class="plot-stats-wrapper">
-                            <div id="conv-stats-{plot_counter}" class="stats-container" style="display:none;">{conv_stats_html}</div>
-                            <div id="all-subj-stats-{plot_counter}" class="stats-container">{all_subj_stats_html}</div>
-                            <div class="plot-container" id="plot-{plot_counter}"></div>
-                        </div>
-                        {plot_script}
-                    </div>
-                </div>
-            """
-            plot_counter += 1
+    // 플롯 하나의 trace 배열 요청. 응답 전에 플롯이 해제되거나 같은 플롯에 새 요청이 나가면 이 응답은 버린다.
+    var plotRequests = {};  // 플롯 div id → 진행 중인 요청 번호
+    var workerPlots = {};   // 플롯 데이터를 작업자에게 넘긴 플롯 div id
 
-        html_content += """
-        </div>
-        """
-
-        # 각 대학에서 모집단위 목록 가져오기
-        if selected_depts:
-            univ_depts = sorted(set(df_univ['dept']) & set(selected_depts))
-        else:
-            univ_depts = sorted(df_univ['dept'].unique())
-
-        # 모집단위별 루프
-        for d_idx, dept in enumerate(univ_depts, 1):
-            dd = df_univ[df_univ['dept'] == dept]
-
-            html_content += f"""
-            <div class="subtype-container" id="dept-container-{univ_idx}-{d_idx}">
-                <div class="subtype-header" style="color: #34495e;">{d_idx}) {dept}</div>
-            """
-
-            # 선택된 전형 목록 가져오기
-            if selected_subtypes:
-                dept_subtypes = sorted(set(dd['subtype']) & set(selected_subtypes))
-            else:
-                dept_subtypes = sorted(dd['subtype'].unique())
-
-            # 전형별 루프
-            for st_idx, subtype_val in enumerate(dept_subtypes, 1):
-                st_data = dd[dd['subtype'] == subtype_val]
-                if st_data.empty:
-                    continue
-
-                conv_stats = compute_stats(st_data, "conv_grade")
-                all_subj_stats = compute_stats(st_data, "all_subj_grade")
-                conv_stats_html = create_stats_html(conv_stats)
-                all_subj_stats_html = create_stats_html(all_subj_stats)
-
-                plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
-                    plot_counter, st_data, y_positions, marker_styles
-                )
-
-                html_content += f"""
-                <div class="subtype-container" id="subtype-{univ_idx}-{d_idx}-{st_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
-                    <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{st_idx}) {subtype_val}</div>
-                    <div class="visualization-container">
-                        <div class="plot-stats-wrapper">
-                            <div id="conv-stats-{plot_counter}" class="stats-container" style="display:none;">{conv_stats_html}</div>
-                            <div id="all-subj-stats-{plot_counter}" class="stats-container">{all_subj_stats_html}</div>
-                            <div class="plot-container" id="plot-{plot_counter}"></div>
-                        </div>
-                        {plot_script}
-                    </div>
-                </div>
-                """
-                plot_counter += 1
-
-            html_content += """
-            </div>
-            """
-
-        # 대학 컨테이너 닫기
-        html_content += """
-        </div>
-        """
-
-    # 전체 데이터 요약 섹션 추가
-    html_content += """
-    <div class="dept-container" id="overall-summary">
-        <div class="dept-header" style="color: #2c3e50; border-bottom: 2px solid #e74c3c;">전체 데이터 요약</div>
-        <div class="subtype-container" style="background-color: #f8f9fa;">
-            <div class="subtype-header" style="color: #1a202c;">선택된 모든 필터에 대한 종합 분석</div>
-    """
-
-    # 전체 필터링된 데이터에 대한 통계 계산
-    overall_conv_stats = compute_stats(df_filtered, "conv_grade")
-    overall_all_subj_stats = compute_stats(df_filtered, "all_subj_grade")
-    overall_conv_stats_html = create_stats_html(overall_conv_stats)
-    overall_all_subj_stats_html = create_stats_html(overall_all_subj_stats)
-
-    # 박스플롯 스크립트 및 통계 테이블 생성
-    overall_plot_script, overall_conv_detail_stats, overall_all_subj_detail_stats = create_plot_data_script(
-        plot_counter, df_filtered, y_positions, marker_styles
-    )
-
-    html_content += f"""
-        <div class="visualization-container">
-            <div class="plot-stats-wrapper">
-                <div id="conv-stats-{plot_counter}" class="stats-container" style="display:none;">{overall_conv_stats_html}</div>
-                <div id="all-subj-stats-{plot_counter}" class="stats-container">{overall_all_subj_stats_html}</div>
-                <div class="plot-container" id="plot-{plot_counter}"></div>
-            </div>
-            {overall_plot_script}
-            <div class="stats-tables-wrapper">
-                <div id="conv-additional-stats-{plot_counter}" class="additional-stats-container" style="display:none;">
-                    {overall_conv_detail_stats}
-                </div>
-                <div id="all-subj-additional-stats-{plot_counter}" class="additional-stats-container">
-                    {overall_all_subj_detail_stats}
-                </div>
-            </div>
-        </div>
-    """
-
-    # 추가 시각화 생성 - 전체 데이터 요약에 대한 추가 그래프
-    additional_visualizations = create_advanced_visualizations(plot_counter, df_filtered)
-    html_content += additional_visualizations
-
-    # 선택된 필터 정보 표시 (옵션)
-    filter_info = []
-    if selected_univs:
-        univ_count = len(selected_univs)
-        univ_text = f"{univ_count}개 대학" if univ_count > 3 else ", ".join(selected_univs)
-        filter_info.append(f"선택된 대학: {univ_text}")
-    if selected_subtypes:
-        subtype_count = len(selected_subtypes)
-        subtype_text = f"{subtype_count}개 전형" if subtype_count > 3 else ", ".join(selected_subtypes)
-        filter_info.append(f"선택된 전형: {subtype_text}")
-    if selected_depts:
-        dept_count = len(selected_depts)
-        dept_text = f"{dept_count}개 모집단위" if dept_count > 3 else ", ".join(selected_depts)
-        filter_info.append(f"선택된 모집단위: {dept_text}")
-
-    if filter_info:
-        filter_info_html = "<div class='filter-info-container'><h3>적용된 필터</h3><ul>"
-        for info in filter_info:
-            filter_info_html += f"<li>{info}</li>"
-        filter_info_html += "</ul></div>"
-        html_content += filter_info_html
-
-    html_content += """
-        </div>
-    </div>
-    """
-
-    plot_counter += 1
-
-    html_content += """
-    <script>
-    var currentGradeType = 'all_subj';
-    var plotsInitialized = false;
-    var initializedPlots = {};
-    document.addEventListener('DOMContentLoaded', function() {
-        console.log('페이지 초기화 시작...');
-        var toc = document.getElementById('toc-content');
-        var tocHTML = '';
-
-        // 대학별 컨테이너 순회
-        document.querySelectorAll('.dept-container').forEach(function(container) {
-            var uniId = container.id;
-            var uniHeader = container.querySelector('.dept-header');
-            if (!uniHeader) return; // dept-header가 없는 경우 건너뛰기 (예: 전체 요약)
-            var uniTitle = uniHeader.textContent;
-
-            // '전체 데이터 요약'은 별도로 처리
-            if (uniId === 'overall-summary') return;
-
-            var subId = 'toc-' + uniId;
-            tocHTML += `<div class="toc-university" onclick="toggleToc('${subId}', this); scrollToElement('${uniId}')"><span class="toc-arrow">▶</span>${uniTitle}</div>`;
-            tocHTML += `<div class="toc-subitems" id="${subId}">`;
-
-            var apSummary = container.querySelector('[id^="apptype-summary-"]');
-            if (apSummary) {
-                tocHTML += `<div class="toc-subtype-item" onclick="scrollToElement('${apSummary.id}')">전형유형별 요약</div>`;
-            }
-
-            var subtypeSummary = container.querySelector('[id^="summary-container-"]');
-            if (subtypeSummary) {
-                tocHTML += `<div class="toc-subtype-item" onclick="scrollToElement('${subtypeSummary.id}')">세부유형별 요약</div>`;
-            }
-
-            container.querySelectorAll('[id^="dept-container-"]').forEach(function(deptContainer) {
-                var deptHeader = deptContainer.querySelector('.subtype-header');
-                if (deptHeader) {
-                    var deptId = deptContainer.id;
-                    var deptTitle = deptHeader.textContent.replace(/^\\d+\\)\\s*/, '').trim();
-                    tocHTML += `<div class="toc-dept-item" style="margin-left: 18px; font-weight: bold; margin-top: 8px; color: #0056b3;" onclick="scrollToElement('${deptId}')">${deptTitle}</div>`;
-                }
-            });
-
-            tocHTML += `</div>`;
-        });
-
-        // 전체 요약 섹션 목차에 추가
-        var overallSummaryElem = document.getElementById('overall-summary');
-        if (overallSummaryElem) {
-            var overallHeader = overallSummaryElem.querySelector('.dept-header');
-            if (overallHeader) {
-                 tocHTML += `<div class="toc-university" onclick="scrollToElement('overall-summary')" style="margin-top: 20px; color: #e74c3c;">${overallHeader.textContent}</div>`;
-            }
+    function requestTraces(plotId, gradeType, onTraces) {
+        var numericId = plotId.slice(5); // 'plot-' 뒤의 플롯 id (예: u3-p2, overall)
+        var message = {type: 'traces', plotId: numericId, gradeType: gradeType};
+        if (!workerPlots[plotId]) {
+            message.plotData = readPlotData(numericId);  // 인터랙티브 플롯은 섬이 없다 (작업자가 계산한 데이터)
+            if (message.plotData) workerPlots[plotId] = true;
         }
-        toc.innerHTML = tocHTML;
-
-        // Hide all university containers initially except the overall summary
-        document.querySelectorAll('.dept-container').forEach(function(c) {
-            if (c.id !== 'overall-summary') {
-                c.style.display = 'none';
-            }
-        });
-
-        if (overallSummaryElem) {
-            initializePlotsInElement('overall-summary');
-        }
-
-    });
-
-    function initializePlot(plotDiv) {
-        var plotId = plotDiv.id;
-        if (initializedPlots[plotId] || !window.Plotly) return;
-        var numericId = plotId.split('-')[1];
-        try {
-            if (!window.plotsData || !window.plotsData[numericId]) {
-                console.error('플롯 데이터를 찾을 수 없음:', numericId);
-                plotDiv.innerHTML = '<p style="text-align:center; color:red;">플롯 데이터 로드 실패</p>';
+        var requestId = callWorker(message, function(result, error) {
+            if (plotRequests[plotId] !== requestId) return;
+            delete plotRequests[plotId];
+            var plotDiv = document.getElementById(plotId);
+            if (!plotDiv) return;
+            if (error) {
+                delete workerPlots[plotId];  // 작업자가 데이터를 받지 못했을 수 있으므로 다음 요청은 섬을 다시 읽는다
+                plotDiv.innerHTML = '<p style="text-align:center; color:red;">플롯 생성 중 오류 발생: ' + error + '</p>';
                 return;
             }
-            var plotData = window.plotsData[numericId];
-            var traces = JSON.parse(JSON.stringify(
-                currentGradeType === 'conv' ? plotData.convTraces : plotData.allSubjTraces
-            ));
-            var layout = createPlotLayout();
-            Plotly.newPlot(plotDiv, traces, layout, {displayModeBar: false, responsive: true, useResizeHandler: true});
-            initializedPlots[plotId] = true;
-        } catch (error) {
-            console.error(`플롯 ${numericId} 초기화 오류:`, error);
-            plotDiv.innerHTML = `<p style="text-align:center; color:red;">플롯 생성 중 오류 발생: ${error.message}</p>`;
-        }
+            onTraces(plotDiv, buildTraces(result, gradeType));
+        });
+        plotRequests[plotId] = requestId;
     }
 
-    function initializePlotsInElement(elementId) {
-        var container = document.getElementById(elementId);
-        if (!container) return;
-        container.querySelectorAll('.plot-container[id^="plot-"]').forEach(function(div) {
-            initializePlot(div);
+    // 작업자가 보낸 결과별 배열(x/y, hover용 customdata)로 산점도 trace를 만든다
+    // (매번 새 객체를 만들므로 Plotly가 trace를 고쳐도 원본 데이터는 그대로)
+    function buildTraces(result, gradeType) {
+        if (result.mode === 'density') return buildDensityTraces(result, gradeType);
+        var data = window.reportData;
+        var gradeLabel = gradeType === 'conv' ? '환산등급' : '전교과등급';
+        return data.traces.map(function(style, i) {
+            var arrays = result.traces[i], n = arrays.x.length;
+            var trace = {
+                x: arrays.x, y: arrays.y, type: result.mode === 'scattergl' ? 'scattergl' : 'scatter', mode: 'markers', name: style.name,
+                marker: { color: style.color, line: {color: style.border, width: 1.5}, symbol: style.symbol, size: 12 }
+            };
+            if (n === 0) {
+                trace.showlegend = false;
+                trace.hoverinfo = 'skip';
+                return trace;
+            }
+            trace.customdata = arrays.customdata;
+            trace.hovertemplate = gradeLabel + ': %{x}<br>대학: %{customdata[2]}<br>모집단위: %{customdata[0]}<br>세부유형: %{customdata[1]}<extra></extra>';
+            return trace;
         });
     }
 
-    function initializeAllPlots() {
-        if (plotsInitialized || !window.Plotly) return;
-        console.log('모든 플롯 초기화 중...');
-        var plotContainers = document.querySelectorAll('.plot-container[id^="plot-"]');
-        plotContainers.forEach(function(plotDiv) {
-            initializePlot(plotDiv);
+    // 점이 아주 많은 플롯: 결과별 0.1등급 구간마다 인원에 비례한 크기의 표시 하나 (hover: 구간, 인원, 주요 모집단위)
+    function buildDensityTraces(result, gradeType) {
+        var data = window.reportData;
+        var gradeLabel = gradeType === 'conv' ? '환산등급' : '전교과등급';
+        return data.traces.map(function(style, i) {
+            var bins = result.traces[i], n = bins.x.length;
+            var trace = {
+                x: bins.x, y: bins.y, type: 'scatter', mode: 'markers', name: style.name,
+                marker: { color: style.color, line: {color: style.border, width: 1.5}, symbol: style.symbol, size: bins.size }
+            };
+            if (n === 0) {
+                trace.showlegend = false;
+                trace.hoverinfo = 'skip';
+                return trace;
+            }
+            trace.customdata = bins.customdata;
+            trace.hovertemplate = gradeLabel + ': %{customdata[0]}<br>' + style.name + ': %{customdata[1]}명<br>주요 모집단위: %{customdata[2]}<extra></extra>';
+            return trace;
         });
-        plotsInitialized = true;
-        console.log('모든 플롯 초기화 완료');
     }
 
     function createPlotLayout() {
@@ -1187,16 +1210,28 @@ def plot_selected_depts(
         if (overallSummaryContainer) {
             var plotContainer = overallSummaryContainer.querySelector('.plot-container[id^="plot-"]');
             if (plotContainer) {
-                overallSummaryPlotId = plotContainer.id.split('-')[1];
+                overallSummaryPlotId = plotContainer.id.slice(5);
             }
         }
 
 
         updateAllPlots(gradeType); // 먼저 박스플롯들을 업데이트
+        applyGradeVisibility(document, gradeType);
         
-        // 통계 정보 및 상세 통계 테이블 가시성 업데이트
-        document.querySelectorAll('.plot-stats-wrapper').forEach(function(wrapper) {
-            var plotId = wrapper.querySelector('.plot-container[id^="plot-"]').id.split('-')[1];
+        // 전체 데이터 요약 섹션의 히스토그램 가시성 업데이트
+        if (overallSummaryPlotId) {
+            var convHistogram = document.getElementById('conv-grade-histogram-' + overallSummaryPlotId);
+            var allSubjHistogram = document.getElementById('all-subj-grade-histogram-' + overallSummaryPlotId);
+            
+            if (convHistogram) convHistogram.style.display = (gradeType === 'conv') ? 'block' : 'none';
+            if (allSubjHistogram) allSubjHistogram.style.display = (gradeType === 'all_subj') ? 'block' : 'none';
+        }
+    }
+
+    // 통계 정보 및 상세 통계 테이블 가시성 업데이트 (나중에 불러온 대학 섹션에도 쓴다)
+    function applyGradeVisibility(root, gradeType) {
+        root.querySelectorAll('.plot-stats-wrapper').forEach(function(wrapper) {
+            var plotId = wrapper.querySelector('.plot-container[id^="plot-"]').id.slice(5);
             
             var convStatsElem = document.getElementById('conv-stats-' + plotId);
             var allSubjStatsElem = document.getElementById('all-subj-stats-' + plotId);
@@ -1208,44 +1243,69 @@ def plot_selected_depts(
             if (convAddStatsElem) convAddStatsElem.style.display = (gradeType === 'conv') ? 'block' : 'none';
             if (allSubjAddStatsElem) allSubjAddStatsElem.style.display = (gradeType === 'all_subj') ? 'block' : 'none';
         });
-        
-        // 전체 데이터 요약 섹션의 히스토그램 가시성 업데이트
-        if (overallSummaryPlotId) {
-            var convHistogram = document.getElementById('conv-grade-histogram-' + overallSummaryPlotId);
-            var allSubjHistogram = document.getElementById('all-subj-grade-histogram-' + overallSummaryPlotId);
-            
-            if (convHistogram) convHistogram.style.display = (gradeType === 'conv') ? 'block' : 'none';
-            if (allSubjHistogram) allSubjHistogram.style.display = (gradeType === 'all_subj') ? 'block' : 'none';
-        }
+    }
+
+    // 등급 전환: 화면 근처 플롯만 바로 갱신하고, 나머지 살아 있는 플롯은 stale로 표시해
+    // 유휴 시간(requestIdleCallback)에 몇 개씩 갱신한다. 그 전에 화면 근처로 오면 그때 바로 갱신한다.
+    // (작업자가 매번 새 배열을 보내므로 깊은 복사 없이 Plotly.react에 넘긴다)
+    var stalePlots = {};   // 현재 등급과 다른 trace를 그리고 있는 플롯 div id
+    var staleQueue = [];
+    var staleScheduled = false;
+    var requestIdle = window.requestIdleCallback || function(callback) {
+        return setTimeout(function() { callback({didTimeout: true, timeRemaining: function() { return 0; }}); }, 16);
+    };
+
+    function isNearViewport(plotId) {
+        if (plotObserver) return !!nearPlots[plotId];
+        var rect = document.getElementById(plotId).getBoundingClientRect();
+        return rect.bottom > -600 && rect.top < window.innerHeight + 600;
     }
 
     function updateAllPlots(gradeType) {
-        console.log('모든 플롯 업데이트 중... 타입:', gradeType);
-        var plotContainers = document.querySelectorAll('.plot-container[id^="plot-"]');
-        plotContainers.forEach(function(plotDiv) {
-            var plotId = plotDiv.id;
-            if (!initializedPlots[plotId]) return;
-            var numericId = plotId.split('-')[1]; // plot-container의 ID에서 숫자 부분 추출
+        console.log('플롯 업데이트 중... 타입:', gradeType);
+        staleQueue = [];
+        livePlots.forEach(function(plotId) {
+            if (isNearViewport(plotId)) {
+                delete stalePlots[plotId];
+                updatePlot(document.getElementById(plotId), gradeType);
+            } else {
+                stalePlots[plotId] = true;
+                staleQueue.push(plotId);
+            }
+        });
+        console.log('화면 플롯 업데이트 완료, 나머지 ' + staleQueue.length + '개는 유휴 시간에 갱신');
+        scheduleStaleUpdates();
+    }
+
+    function scheduleStaleUpdates() {
+        if (staleScheduled || staleQueue.length === 0) return;
+        staleScheduled = true;
+        requestIdle(function(deadline) {
+            staleScheduled = false;
+            // 한 번에 최소 하나는 갱신해 유휴 시간이 없어도 조금씩 진행한다
+            do {
+                refreshIfStale(staleQueue.shift());
+            } while (staleQueue.length && deadline.timeRemaining() > 4);
+            scheduleStaleUpdates();
+        }, {timeout: 500});
+    }
+
+    function refreshIfStale(plotId) {
+        if (!stalePlots[plotId]) return;
+        delete stalePlots[plotId];
+        if (initializedPlots[plotId]) updatePlot(document.getElementById(plotId), currentGradeType);
+    }
+
+    function updatePlot(plotDiv, gradeType) {
+        var plotId = plotDiv.id;
+        requestTraces(plotId, gradeType, function(div, traces) {
+            if (!initializedPlots[plotId] || gradeType !== currentGradeType) return;  // 그 사이 해제됐거나 등급이 또 바뀜
             try {
-                if (!window.plotsData || !window.plotsData[numericId]) {
-                    console.error('플롯 데이터를 찾을 수 없음 (update):', numericId);
-                    return;
-                }
-                var plotData = window.plotsData[numericId];
-                var traces;
-                if (gradeType === 'conv') {
-                    traces = JSON.parse(JSON.stringify(plotData.convTraces));
-                } else {
-                    traces = JSON.parse(JSON.stringify(plotData.allSubjTraces));
-                }
-                var layout = createPlotLayout();
-                Plotly.react(plotDiv, traces, layout, {displayModeBar: false, responsive: true, useResizeHandler: true});
+                Plotly.react(div, traces, createPlotLayout(), {displayModeBar: false, responsive: true, useResizeHandler: true});
             } catch (error) {
-                console.error(`플롯 ${numericId} 업데이트 오류:`, error);
-                // plotDiv.innerHTML = `<p style="text-align:center; color:red;">플롯 업데이트 중 오류 발생: ${error.message}</p>`;
+                console.error(`플롯 ${plotId.slice(5)} 업데이트 오류:`, error);
             }
         });
-        console.log('모든 플롯 업데이트 완료');
     }
 
     function toggleToc(id, headerEl) {
@@ -1266,7 +1326,9 @@ def plot_selected_depts(
             if (dept && dept.id !== 'overall-summary' && dept.style.display === 'none') {
                 dept.style.display = 'block';
             }
-            initializePlotsInElement(dept ? dept.id : id);
+            if (dept) loadShard(dept);
+            // 플롯은 IntersectionObserver가 화면 근처에 올 때 만든다 (미지원 브라우저만 즉시 생성)
+            if (!plotObserver) initializePlotsInElement(dept ? dept.id : id);
 
             var headerHeight = document.querySelector('.fixed-header').offsetHeight;
             var elementPosition = el.getBoundingClientRect().top + window.pageYOffset;
@@ -1276,21 +1338,1293 @@ def plot_selected_depts(
             el.style.transition = 'background-color 0.5s ease-out';
             el.style.backgroundColor = 'rgba(255, 223, 186, 0.5)'; // 연한 주황색 하이라이트
             setTimeout(function() { el.style.backgroundColor = ''; }, 1500); // 1.5초 후 원래대로
+        } else {
+            pendingScroll = id;  // 아직 불러오는 중인 대학 조각 안의 항목이면 조각이 도착한 뒤 이동한다
         }
     }
+
+    // ───── 대학별 분할 보고서 ─────
+    // 대학 섹션 자리(data-shard)를 처음 열 때 그 대학의 조각 파일만 <script>로 불러온다 (file://에서도 동작).
+    // 조각은 registerReportShard로 섹션 HTML(플롯 데이터 섬 포함)과 대학 데이터셋을 넘기고,
+    // 데이터셋은 작업자에게 넘기고 메인 스레드에는 남기지 않는다 (hover 이름표도 작업자가 채운다).
+    var pendingScroll = null;
+
+    function loadShard(container) {
+        var src = container.getAttribute('data-shard');
+        if (!src || container.getAttribute('data-shard-state')) return;
+        container.setAttribute('data-shard-state', 'loading');
+        var script = document.createElement('script');
+        script.src = src;
+        script.onerror = function() {
+            container.setAttribute('data-shard-state', '');  // 다시 열면 재시도
+            container.insertAdjacentHTML('beforeend', '<p style="text-align:center; color:red;">대학 데이터를 불러오지 못했습니다: ' + src + '</p>');
+        };
+        document.body.appendChild(script);
+    }
+
+    window.registerReportShard = function(shard) {
+        var prefix = 'u' + shard.univ, placeholder = document.getElementById('univ-' + shard.univ);
+        if (!placeholder || placeholder.getAttribute('data-shard-state') === 'loaded') return;
+        callWorker({type: 'shard', prefix: prefix, dataset: shard.data}, function() {});
+
+        var display = placeholder.style.display;
+        placeholder.insertAdjacentHTML('afterend', shard.html);
+        placeholder.parentNode.removeChild(placeholder);
+        var container = document.getElementById('univ-' + shard.univ);
+        container.style.display = display;
+        container.setAttribute('data-shard-state', 'loaded');
+        applyGradeVisibility(container, currentGradeType);
+        container.querySelectorAll('.plot-container[id^="plot-"]').forEach(observePlot);
+        if (pendingScroll && document.getElementById(pendingScroll)) {
+            var target = pendingScroll;
+            pendingScroll = null;
+            scrollToElement(target);
+        }
+    };
     </script>
     """
-    html_content += """
+
+# 보고서 계산 작업자 소스: 실행되지 않는 script 블록에 두고, 페이지가 인라인 Blob으로 Worker를 만든다
+_REPORT_WORKER = """
+    <script type="text/js-worker" id="report-worker-src">
+    // ───── 보고서 계산 작업자 (Web Worker, 인라인 Blob으로 시작) ─────
+    // 내장 데이터셋/플롯 행 번호 디코딩, 플롯별 trace 배열 계산, 인터랙티브 필터 집계를 메인 스레드 밖에서 한다.
+    // 결과 배열은 새로 만든 typed array로 돌려주고 그 버퍼를 transfer한다 (복사 없음).
+    // Worker를 만들 수 없는 환경에서는 페이지가 같은 소스를 메인 스레드에서 실행한다 (handleMessage).
+    var ARRAY_TYPES = {f4: Float32Array, f8: Float64Array, i1: Int8Array, i2: Int16Array, i4: Int32Array};
+    var dataset = null;   // 디코딩된 공유 데이터셋
+    var options = {};     // window.reportOptions
+    var ownedPlots = {};  // 작업자가 계산한 플롯 데이터 (인터랙티브: sel, iu{대학 코드})
+    var shardDatasets = {};  // 대학별 분할 보고서: 플롯 id 접두어("u3") → 대학 데이터셋 (행 번호가 대학 안에서 0부터)
+    var plotCache = {};   // 보고서에 실린 플롯 id → 디코딩한 플롯 데이터 (페이지가 플롯을 해제하면 release로 지운다)
+
+    // encode_array의 base64 배열({dtype, bdata})을 typed array로 푼다 (JSON 배열은 그대로 반환)
+    // Float32 등급은 Python grade_list처럼 소수 6자리로 반올림해 float32 잡음을 없앤다
+    function decodeArray(value) {
+        if (!value || typeof value.bdata !== 'string') return value;
+        var binary = atob(value.bdata);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        var arr = new ARRAY_TYPES[value.dtype](bytes.buffer);
+        if (value.dtype !== 'f4') return arr;
+        var out = new Float64Array(arr.length);
+        for (var j = 0; j < arr.length; j++) out[j] = Math.round(arr[j] * 1e6) / 1e6;
+        return out;
+    }
+
+    function toTypedRows(values) {
+        return ArrayBuffer.isView(values) ? values : Int32Array.from(values);
+    }
+
+    // 받은 데이터셋은 고치지 않고 디코딩한 사본을 만든다 (메인 스레드 실행 시 원본을 공유하므로)
+    function decodeDataset(raw) {
+        var decoded = {columns: {}, grades: {}, traces: raw.traces, rowBase: raw.rowBase || {}};
+        Object.keys(raw.columns).forEach(function(name) {
+            var col = raw.columns[name];
+            decoded.columns[name] = {labels: col.labels, codes: decodeArray(col.codes), postings: col.postings};
+        });
+        Object.keys(raw.grades).forEach(function(name) {
+            decoded.grades[name] = decodeArray(raw.grades[name]);
+        });
+        return decoded;
+    }
+
+    function init(msg) {
+        options = msg.options || {};
+        dataset = decodeDataset(msg.dataset);
+        return {rows: dataset.grades.conv.length};
+    }
+
+    // 대학별 분할 보고서에서 연 대학의 데이터셋 (그 대학 플롯은 이 데이터셋의 행 번호를 쓴다)
+    function shard(msg) {
+        shardDatasets[msg.prefix] = decodeDataset(msg.dataset);
+        return {rows: shardDatasets[msg.prefix].grades.conv.length};
+    }
+
+    // 대학 섹션 플롯은 대학 안의 상대 행 번호를 실으므로 대학의 시작 행을 더한다 (전체 요약은 0)
+    function rowBase(plotId) {
+        return dataset.rowBase[plotId.split('-')[0]] || 0;
+    }
+
+    // 플롯 데이터 섬의 결과별 배열을 한 번만 푼다 (산점도: 행 번호, 밀도: 구간 중심/인원)
+    function decodePlotData(raw) {
+        function decode(byResult) {
+            return byResult.map(function(item) {
+                if (item && item.count) return {x: toFloat(decodeArray(item.x)), count: decodeArray(item.count), top: item.top};
+                return decodeArray(item);
+            });
+        }
+        return {mode: raw.mode, conv: decode(raw.conv), allSubj: decode(raw.allSubj)};
+    }
+
+    function release(msg) {
+        delete plotCache[msg.plotId];
+        return {};
+    }
+
+    // 플롯 하나의 결과별 trace 배열: 산점도는 x/y와 hover용 customdata([모집단위, 세부유형, 대학] 이름),
+    // 밀도는 구간 중심/점 크기와 hover용 customdata([구간, 인원, 주요 모집단위])
+    // 페이지는 플롯마다 처음 한 번만 plotData(데이터 섬)를 보내고, 이후 요청은 plotCache를 쓴다
+    function traces(msg) {
+        if (msg.plotData) plotCache[msg.plotId] = decodePlotData(msg.plotData);
+        var cached = plotCache[msg.plotId], plotData = cached || ownedPlots[msg.plotId];
+        if (!plotData) throw new Error('플롯 데이터를 찾을 수 없음: ' + msg.plotId);
+        var byResult = msg.gradeType === 'conv' ? plotData.conv : plotData.allSubj;
+        if (plotData.mode === 'density') return {mode: 'density', traces: densityArrays(byResult)};
+        var source = cached && shardDatasets[msg.plotId.split('-')[0]];
+        var data = source || dataset, base = cached && !source ? rowBase(msg.plotId) : 0;
+        var grades = data.grades[msg.gradeType];
+        var dept = data.columns.dept, subtype = data.columns.subtype, univ = data.columns.univ;
+        return {mode: plotData.mode || 'scatter', traces: dataset.traces.map(function(style, i) {
+            var rows = byResult[i] || [], n = rows.length;
+            var x = new Float64Array(n), y = new Float64Array(n).fill(style.y), customdata = new Array(n);
+            for (var k = 0; k < n; k++) {
+                var r = rows[k] + base;
+                x[k] = grades[r];
+                customdata[k] = [dept.labels[dept.codes[r]], subtype.labels[subtype.codes[r]], univ.labels[univ.codes[r]]];
+            }
+            return {x: x, y: y, customdata: customdata};
+        })};
+    }
+
+    function densityArrays(binsByResult) {
+        var decoded = binsByResult.map(function(bins) {
+            return {x: toFloat(decodeArray(bins.x)), count: decodeArray(bins.count), top: bins.top};
+        });
+        var maxCount = 1;
+        decoded.forEach(function(bins) {
+            for (var k = 0; k < bins.count.length; k++) maxCount = Math.max(maxCount, bins.count[k]);
+        });
+        return dataset.traces.map(function(style, i) {
+            var bins = decoded[i], n = bins.count.length;
+            var size = new Float64Array(n), customdata = new Array(n);
+            for (var k = 0; k < n; k++) {
+                var x = bins.x[k];
+                size[k] = 6 + 24 * Math.sqrt(bins.count[k] / maxCount);
+                customdata[k] = [(x - 0.05).toFixed(1) + '~' + (x + 0.05).toFixed(1), bins.count[k], bins.top[k]];
+            }
+            // x는 새 배열로 복사한다 (응답 버퍼는 transfer되므로 plotCache의 배열을 넘기면 안 됨)
+            return {x: Float64Array.from(bins.x), y: new Float64Array(n).fill(style.y), size: size, customdata: customdata};
+        });
+    }
+
+    function toFloat(values) {
+        return values instanceof Float64Array ? values : Float64Array.from(values);
+    }
+
+    // ───── 인터랙티브 필터 집계 ─────
+    function postingList(column, code) {
+        var col = dataset.columns[column];
+        if (!col.postingRows) {
+            col.postingRows = toTypedRows(decodeArray(col.postings.rows));
+            col.postingOffsets = toTypedRows(decodeArray(col.postings.offsets));
+        }
+        return col.postingRows.subarray(col.postingOffsets[code], col.postingOffsets[code + 1]);
+    }
+
+    // 활성 필터(skip 열 제외)마다 선택 값의 행 번호를 세어, hits[r] === active인 행이 모든 필터에 걸린 행
+    function filterHits(state, skip) {
+        var hits = new Uint8Array(dataset.grades.conv.length), active = 0;
+        Object.keys(state).forEach(function(column) {
+            var codes = state[column];
+            if (column === skip || !codes || codes.length === 0) return;
+            active++;
+            codes.forEach(function(code) {
+                var rows = postingList(column, code);
+                for (var k = 0; k < rows.length; k++) hits[rows[k]]++;
+            });
+        });
+        return {hits: hits, active: active};
+    }
+
+    function selectedRows(match) {
+        var hits = match.hits, out = new Int32Array(hits.length), m = 0;
+        for (var r = 0; r < hits.length; r++) if (hits[r] === match.active) out[m++] = r;
+        return out.subarray(0, m);
+    }
+
+    // 그룹(0 = 선택 범위 전체, u + 1 = 대학 u) × 결과 칸(b = 그룹 * 3 + 결과)마다
+    // 인원, 등급 개수/합/최소/최대, 산점도 행 번호를 typed array 두 번 훑기로 모은다
+    function newGradeAgg(nBuckets) {
+        var agg = {n: new Int32Array(nBuckets), sum: new Float64Array(nBuckets),
+                   min: new Float64Array(nBuckets).fill(Infinity), max: new Float64Array(nBuckets).fill(-Infinity)};
+        agg.offsets = new Int32Array(nBuckets + 1);
+        return agg;
+    }
+
+    function addGrade(agg, b, x) {
+        agg.n[b]++;
+        agg.sum[b] += x;
+        if (x < agg.min[b]) agg.min[b] = x;
+        if (x > agg.max[b]) agg.max[b] = x;
+    }
+
+    function aggregate(rows) {
+        var univCodes = dataset.columns.univ.codes, resultCodes = dataset.columns.result.codes;
+        var traceNames = dataset.traces.map(function(style) { return style.name; });
+        var resultIndex = dataset.columns.result.labels.map(function(label) { return traceNames.indexOf(label); });
+        var nGroups = dataset.columns.univ.labels.length + 1, nBuckets = nGroups * 3;
+        var agg = {total: new Int32Array(nGroups), people: new Int32Array(nBuckets), grades: {}};
+        var gradeTypes = ['conv', 'all_subj'];
+        gradeTypes.forEach(function(gradeType) { agg.grades[gradeType] = newGradeAgg(nBuckets); });
+        var gradeAggs = gradeTypes.map(function(gradeType) { return agg.grades[gradeType]; });
+        var gradeArrays = gradeTypes.map(function(gradeType) { return dataset.grades[gradeType]; });
+        var k, r, g, ri, t, x;
+        for (k = 0; k < rows.length; k++) {
+            r = rows[k];
+            g = univCodes[r] + 1;   // 대학 결측(-1)이면 0 → 전체에만 센다
+            agg.total[0]++;
+            if (g > 0) agg.total[g]++;
+            ri = resultCodes[r] >= 0 ? resultIndex[resultCodes[r]] : -1;
+            if (ri < 0) continue;
+            agg.people[ri]++;
+            if (g > 0) agg.people[g * 3 + ri]++;
+            for (t = 0; t < 2; t++) {
+                x = gradeArrays[t][r];
+                if (x === null || x !== x) continue;  // 결측(null / NaN) 제외
+                addGrade(gradeAggs[t], ri, x);
+                if (g > 0) addGrade(gradeAggs[t], g * 3 + ri, x);
+            }
+        }
+        // 칸별 행 번호: 개수로 시작 위치를 정하고 한 번 더 훑으며 채운다 (칸 안은 행 번호 순)
+        gradeTypes.forEach(function(gradeType) {
+            var ga = agg.grades[gradeType], grades = dataset.grades[gradeType];
+            for (var b = 0; b < nBuckets; b++) ga.offsets[b + 1] = ga.offsets[b] + ga.n[b];
+            var cursor = ga.offsets.slice(0, nBuckets);
+            ga.rows = new Int32Array(ga.offsets[nBuckets]);
+            for (k = 0; k < rows.length; k++) {
+                r = rows[k];
+                ri = resultCodes[r] >= 0 ? resultIndex[resultCodes[r]] : -1;
+                x = grades[r];
+                if (ri < 0 || x === null || x !== x) continue;
+                ga.rows[cursor[ri]++] = r;
+                g = univCodes[r] + 1;
+                if (g > 0) ga.rows[cursor[g * 3 + ri]++] = r;
+            }
+        });
+        return agg;
+    }
+
+    function bucketRows(ga, g) {
+        return [0, 1, 2].map(function(ri) { return ga.rows.subarray(ga.offsets[g * 3 + ri], ga.offsets[g * 3 + ri + 1]); });
+    }
+
+    // create_stats_html과 같은 통계 요약 (합격(전체) = 합격 + 충원합격)
+    function statsHtml(agg, g, gradeType) {
+        var ga = agg.grades[gradeType], total = agg.total[g], b = g * 3;
+        var people = [agg.people[b], agg.people[b + 1], agg.people[b + 2]];
+        function rate(count) { return (count / total * 100).toFixed(1); }
+        var html = '<div class="stats-item stats-total">총 ' + total + '명</div>';
+        var allPass = people[0] + people[1];
+        if (allPass > 0) {
+            html += '<div class="stats-item stats-pass">합격(전체): ' + allPass + '명 <span class="highlight-rate">(' + rate(allPass) + '%)</span> ';
+            var n = ga.n[b] + ga.n[b + 1];
+            if (n > 0) {
+                html += '<span class="highlight-range">등급 ' + Math.min(ga.min[b], ga.min[b + 1]).toFixed(1) + '~' + Math.max(ga.max[b], ga.max[b + 1]).toFixed(1) + '</span>, ';
+                html += '<span class="highlight-mean">평균 ' + ((ga.sum[b] + ga.sum[b + 1]) / n).toFixed(2) + '</span>';
+            }
+            html += '</div>';
+        }
+        if (people[0] > 0) html += '<div class="stats-item stats-pass">합격(일반): ' + people[0] + '명 <span class="highlight-rate">(' + rate(people[0]) + '%)</span></div>';
+        if (people[1] > 0) html += '<div class="stats-item stats-wait">합격(충원): ' + people[1] + '명 <span class="highlight-rate">(' + rate(people[1]) + '%)</span></div>';
+        if (people[2] > 0) html += '<div class="stats-item stats-fail">불합격: ' + people[2] + '명 <span class="highlight-fail-rate">(' + rate(people[2]) + '%)</span></div>';
+        return html;
+    }
+
+    // Python _density_bins와 같은 형식의 결과별 0.1등급 구간 밀도
+    // 행을 구간별로 모은 뒤(계수 정렬) 구간마다 모집단위 인원을 세고 바로 0으로 되돌린다
+    function densityBins(rowsByResult, grades) {
+        var dept = dataset.columns.dept, missing = dept.labels.length;
+        var topDepts = options.densityTopDepts || 3;
+        var deptCounts = new Int32Array(missing + 1);  // 마지막 칸: 모집단위 결측
+        var tieKey = function(d) { return d === missing ? -1 : d; };  // 동률이면 코드순 (결측이 먼저, Python과 같음)
+        return rowsByResult.map(function(rows) {
+            var out = {x: [], count: [], top: []};
+            if (rows.length === 0) return out;
+            var binOf = new Int32Array(rows.length), lo = Infinity, hi = -Infinity, k;
+            for (k = 0; k < rows.length; k++) {
+                var b = Math.floor(Math.round(grades[rows[k]] * 1e7) / 1e6);  // 1.25 → 12 (1.2~1.3 구간)
+                binOf[k] = b;
+                if (b < lo) lo = b;
+                if (b > hi) hi = b;
+            }
+            var nBins = hi - lo + 1, offsets = new Int32Array(nBins + 1);
+            for (k = 0; k < rows.length; k++) offsets[binOf[k] - lo + 1]++;
+            for (var i = 0; i < nBins; i++) offsets[i + 1] += offsets[i];
+            var cursor = offsets.slice(0, nBins), ordered = new Int32Array(rows.length);
+            for (k = 0; k < rows.length; k++) ordered[cursor[binOf[k] - lo]++] = rows[k];
+            for (i = 0; i < nBins; i++) {
+                if (offsets[i] === offsets[i + 1]) continue;
+                var touched = [];
+                for (k = offsets[i]; k < offsets[i + 1]; k++) {
+                    var d = dept.codes[ordered[k]];
+                    if (d < 0) d = missing;
+                    if (deptCounts[d]++ === 0) touched.push(d);
+                }
+                // 인원이 많은 모집단위 topDepts개만 삽입 정렬로 고른다 (전체 정렬 없이)
+                var best = [];
+                touched.forEach(function(d) {
+                    var j = best.length;
+                    while (j > 0 && (deptCounts[d] > deptCounts[best[j - 1]] ||
+                           (deptCounts[d] === deptCounts[best[j - 1]] && tieKey(d) < tieKey(best[j - 1])))) j--;
+                    if (j < topDepts) {
+                        best.splice(j, 0, d);
+                        if (best.length > topDepts) best.pop();
+                    }
+                });
+                out.x.push((i + lo + 0.5) / 10);
+                out.count.push(offsets[i + 1] - offsets[i]);
+                out.top.push(best.map(function(d) {
+                    return (d === missing ? '(없음)' : dept.labels[d]) + ' ' + deptCounts[d] + '명';
+                }).join(', '));
+                touched.forEach(function(d) { deptCounts[d] = 0; });
+            }
+            return out;
+        });
+    }
+
+    // 그룹의 산점도 데이터 (점 수에 따라 scatter / scattergl / 밀도, create_plot_data_script와 같은 기준)
+    function groupPlotData(agg, g) {
+        var conv = bucketRows(agg.grades.conv, g), allSubj = bucketRows(agg.grades.all_subj, g);
+        var count = function(rowsByResult) { return rowsByResult[0].length + rowsByResult[1].length + rowsByResult[2].length; };
+        var points = Math.max(count(conv), count(allSubj));
+        if (points > (options.densityThreshold || Infinity)) {
+            return {mode: 'density', conv: densityBins(conv, dataset.grades.conv), allSubj: densityBins(allSubj, dataset.grades.all_subj)};
+        }
+        var plotData = {conv: conv, allSubj: allSubj};
+        if (points > (options.webglThreshold || Infinity)) plotData.mode = 'scattergl';
+        return plotData;
+    }
+
+    // 필터 상태 → 선택 행 수, 그룹별 통계 요약 HTML, 값별 인원(다른 열의 필터만 적용)
+    // 그룹의 플롯 데이터는 작업자에 두고(ownedPlots) 플롯을 그릴 때 traces 요청으로 꺼낸다
+    function filter(msg) {
+        var state = msg.state;
+        var rows = selectedRows(filterHits(state, null));
+        var agg = aggregate(rows);
+        ownedPlots = {sel: groupPlotData(agg, 0)};
+        var groups = [{plotId: 'sel', conv: statsHtml(agg, 0, 'conv'), allSubj: statsHtml(agg, 0, 'all_subj')}];
+        for (var g = 1; g < agg.total.length; g++) {
+            if (agg.total[g] === 0) continue;
+            var plotId = 'iu' + (g - 1);
+            ownedPlots[plotId] = groupPlotData(agg, g);
+            groups.push({plotId: plotId, univ: g - 1, conv: statsHtml(agg, g, 'conv'), allSubj: statsHtml(agg, g, 'all_subj')});
+        }
+        return {rows: rows.length, groups: groups, counts: filterCounts(state, msg.columns)};
+    }
+
+    function filterCounts(state, columns) {
+        var counts = {};
+        columns.forEach(function(column) {
+            var match = filterHits(state, column), hits = match.hits, active = match.active;
+            var codes = dataset.columns[column].codes;
+            var out = new Int32Array(dataset.columns[column].labels.length);
+            for (var r = 0; r < codes.length; r++) if (hits[r] === active && codes[r] >= 0) out[codes[r]]++;
+            counts[column] = out;
+        });
+        return counts;
+    }
+
+    var HANDLERS = {init: init, shard: shard, traces: traces, release: release, filter: filter};
+
+    // 결과 안의 typed array 버퍼 목록 (transfer 대상; 결과 배열은 모두 새로 만든 것이라 작업자 데이터는 그대로)
+    function transferables(value, out) {
+        if (ArrayBuffer.isView(value)) {
+            if (out.indexOf(value.buffer) < 0) out.push(value.buffer);
+        } else if (value && typeof value === 'object') {
+            Object.keys(value).forEach(function(key) { transferables(value[key], out); });
+        }
+        return out;
+    }
+
+    function handleMessage(msg) {
+        try {
+            var result = HANDLERS[msg.type](msg);
+            return {message: {id: msg.id, result: result}, transfer: transferables(result, [])};
+        } catch (error) {
+            return {message: {id: msg.id, error: String(error && error.message || error)}, transfer: []};
+        }
+    }
+
+    if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+        self.onmessage = function(event) {
+            var reply = handleMessage(event.data);
+            self.postMessage(reply.message, reply.transfer);
+        };
+    }
+    </script>
+    """
+
+_REPORT_FOOT = """
             </main>
         </div>
     </body>
     </html>
     """
 
+
+def _page_options_script(max_live_plots: int = 40, point_thresholds: tuple = None) -> str:
+    """페이지 옵션 (살아 있는 플롯 상한, 브라우저에서 만드는 산점도의 WebGL/밀도 기준) → window.reportOptions"""
+    webgl_threshold, density_threshold = point_thresholds or (DEFAULT_WEBGL_THRESHOLD, DEFAULT_DENSITY_THRESHOLD)
+    options = {
+        "maxLivePlots": max_live_plots,
+        "webglThreshold": webgl_threshold,
+        "densityThreshold": density_threshold,
+        "densityTopDepts": DENSITY_TOP_DEPTS,
+    }
+    return f"""
+    <script>
+    window.reportOptions = {json.dumps(options)};
+    </script>
+    """
+
+
+# inline: 단일 파일, assets: 공용 자산 참조, sharded: assets + 대학별 조각 파일 (목차/전체 요약만 든 색인 페이지)
+REPORT_LAYOUTS = ("inline", "assets", "sharded")
+
+
+def _block_body(block: str, open_tag: str, close_tag: str) -> str:
+    """script/style 블록 문자열에서 태그 사이 내용만"""
+    start = block.index(open_tag) + len(open_tag)
+    return block[start:block.rindex(close_tag)]
+
+
+def report_asset_files() -> dict:
+    """
+    assets 레이아웃의 공용 파일 (이름 → 내용)
+    report.js: 작업자 소스(문자열) + 추가 시각화 함수 + 페이지 스크립트, report-interactive.js: 인터랙티브 보고서 스크립트
+    """
+    worker_source = _block_body(_REPORT_WORKER, '<script type="text/js-worker" id="report-worker-src">', "</script>")
+    return {
+        "report.css": _REPORT_CSS,
+        "report.js": (
+            f"window.reportWorkerSource = {json.dumps(worker_source, ensure_ascii=False)};\n"
+            + _ADVANCED_VIS_FUNCTIONS
+            + _block_body(_REPORT_SCRIPT, "<script>", "</script>")
+        ),
+        "report-interactive.js": _block_body(_INTERACTIVE_SCRIPT, "<script>", "</script>"),
+    }
+
+
+def _report_head(assets: dict = None) -> str:
+    """보고서 머리 (assets가 있으면 plotly.js/report.css를 assets에서 참조)"""
+    if assets is None:
+        return _REPORT_HEAD
+    return (
+        _REPORT_HEAD_OPEN
+        + f'        <script src="{assets["plotly"]}"></script>\n'
+        + f'        <link rel="stylesheet" href="{assets["report.css"]}">\n'
+        + _REPORT_HEAD_CLOSE
+    )
+
+
+def _report_scripts(assets: dict = None, interactive: bool = False) -> str:
+    """본문 끝의 공용 페이지 스크립트 (inline: 작업자 소스 + 페이지 JS, assets: report.js 참조)"""
+    if assets is None:
+        return _REPORT_WORKER + _REPORT_SCRIPT + (_INTERACTIVE_SCRIPT if interactive else "")
+    names = ["report.js"] + (["report-interactive.js"] if interactive else [])
+    return "".join(f'\n    <script src="{assets[name]}"></script>\n' for name in names)
+
+
+def _section_stats(entry):
+    """통계 항목 → (환산등급 요약 HTML, 전교과등급 요약 HTML, (환산등급, 전교과등급) 상세 통계)"""
+    conv_stats = basic_from_entry(entry, "conv_grade")
+    all_subj_stats = basic_from_entry(entry, "all_subj_grade")
+    add_stats = (
+        additional_from_entry(entry, "conv_grade"),
+        additional_from_entry(entry, "all_subj_grade"),
+    )
+    return create_stats_html(conv_stats), create_stats_html(all_subj_stats), add_stats
+
+
+# 대학 조각 안의 대학 순번 자리표시자: 조각은 순번과 무관하게 만들어 캐시하고, 이어 붙일 때 채운다
+_UNIV_IDX_TOKEN = "{{univ_idx}}"
+PARALLEL_MIN_UNIVS = 4  # 새로 렌더링할 대학이 이보다 많을 때만 프로세스 풀을 쓴다
+# 대학 섹션이 읽는 열 (조각 캐시 키의 행 해시 대상)
+_FRAGMENT_COLUMNS = ["univ", "apptype", "subtype", "dept", "result", "conv_grade", "all_subj_grade"]
+
+
+def _fragment_key(
+    univ, df_univ, entries, selected_depts, selected_subtypes, selected_apptypes, array_encoding, point_thresholds=None,
+) -> str:
+    """
+    대학 조각의 캐시 키: 대학 행 내용 해시 + 섹션 통계 + 조각에 영향을 주는 필터(모집단위/전형/전형유형)
+    + 배열 형식 + 산점도 표시 기준 + 보고서 버전. 대학/지역 선택은 행과 통계에 이미 반영되어 따로 넣지 않는다.
+    """
+    rows = pd.util.hash_pandas_object(df_univ[_FRAGMENT_COLUMNS], index=False).to_numpy()
+    stats = json.dumps(
+        [[level, list(key), entry] for (level, key), entry in entries.items()],
+        ensure_ascii=False, sort_keys=True, cls=NumpyEncoder,
+    )
+    filters = json.dumps(
+        [sorted(map(str, selected or [])) for selected in (selected_depts, selected_subtypes, selected_apptypes)],
+        ensure_ascii=False,
+    )
+    return digest(f"v{REPORT_VERSION}", univ, rows.tobytes(), stats, filters, array_encoding, point_thresholds)
+
+
+def _render_universities(tasks, max_workers: int = 1, fragment_cache=None):
+    """
+    _render_university 인자 묶음(대학 순번 제외)들을 차례로 렌더링해 순서대로 내보낸다.
+    fragment_cache가 있으면 키가 같은 조각은 캐시에서 꺼내고, 새로 만든 조각만 저장한다.
+    max_workers > 1이어도 새로 렌더링할(캐시에 없는) 대학이 PARALLEL_MIN_UNIVS개를 넘을 때에만 프로세스 풀을 띄운다.
+    앞의 PARALLEL_MIN_UNIVS개는 이 프로세스에서 만들고, 그다음부터 풀에서 병렬로 만들되 앞선 대학이 끝나기를 기다려 순서를 지킨다.
+    작업은 2 × max_workers개까지만 미리 제출해 메모리에 쌓이는 조각 수를 제한한다.
+    """
+    use_cache = fragment_cache is not None and fragment_cache.enabled
+
+    def lookup(task):
+        if not use_cache:
+            return None, None
+        key = _fragment_key(*task)
+        return key, fragment_cache.load(key)
+
+    def remember(key, fragment):
+        if use_cache:
+            fragment_cache.store(key, fragment)
+        return fragment
+
+    def place(univ_idx, fragment):
+        return fragment.replace(_UNIV_IDX_TOKEN, str(univ_idx))
+
+    # 풀 시작 비용(프로세스 생성, 데이터 전달)이 렌더링보다 큰 작은 보고서는 풀 없이 끝낸다
+    numbered = enumerate(tasks, 1)
+    rendered = 0
+    for univ_idx, task in numbered:
+        key, fragment = lookup(task)
+        if fragment is None:
+            if max_workers > 1 and rendered >= PARALLEL_MIN_UNIVS:
+                break
+            fragment = remember(key, _render_university(_UNIV_IDX_TOKEN, *task))
+            rendered += 1
+        yield place(univ_idx, fragment)
+    else:
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        # (대학 순번, 키, 캐시 조각 또는 Future). 첫 항목은 위에서 멈춘 대학
+        pending = deque([(univ_idx, key, ex.submit(_render_university, _UNIV_IDX_TOKEN, *task))])
+        for univ_idx, task in numbered:
+            key, fragment = lookup(task)
+            if fragment is None:
+                fragment = ex.submit(_render_university, _UNIV_IDX_TOKEN, *task)
+            pending.append((univ_idx, key, fragment))
+            if len(pending) >= 2 * max_workers:
+                univ_idx, key, item = pending.popleft()
+                yield place(univ_idx, item if isinstance(item, str) else remember(key, item.result()))
+        while pending:
+            univ_idx, key, item = pending.popleft()
+            yield place(univ_idx, item if isinstance(item, str) else remember(key, item.result()))
+
+
+def _university_depts(depts: pd.Series, selected_depts: list = None) -> list:
+    """대학의 모집단위 목록 (선택이 있으면 교집합, 이름순). 대학 섹션과 목차가 같은 순서를 쓴다"""
+    if selected_depts:
+        return sorted(set(depts) & set(selected_depts))
+    return sorted(depts.unique())
+
+
+def create_toc_html(university_depts: list) -> str:
+    """
+    목차 HTML: 대학(펼치기) → 전형유형별 요약 / 세부유형별 요약 / 모집단위, 마지막에 전체 데이터 요약
+    university_depts: 보고서 순서의 (대학, 모집단위 목록). id는 _render_university와 같은 규칙
+    """
+    parts = ['                <div class="toc-header">목차</div>\n                <div id="toc-content">']
+    for univ_idx, (univ, depts) in enumerate(university_depts, 1):
+        parts.append(
+            f"""<div class="toc-university" onclick="toggleToc('toc-univ-{univ_idx}', this); scrollToElement('univ-{univ_idx}')"><span class="toc-arrow">▶</span>{univ}</div>"""
+            f"""<div class="toc-subitems" id="toc-univ-{univ_idx}">"""
+            f"""<div class="toc-subtype-item" onclick="scrollToElement('apptype-summary-{univ_idx}')">전형유형별 요약</div>"""
+            f"""<div class="toc-subtype-item" onclick="scrollToElement('summary-container-{univ_idx}')">세부유형별 요약</div>"""
+        )
+        for d_idx, dept in enumerate(depts, 1):
+            parts.append(
+                f"""<div class="toc-dept-item" style="margin-left: 18px; font-weight: bold; margin-top: 8px; color: #0056b3;" onclick="scrollToElement('dept-container-{univ_idx}-{d_idx}')">{dept}</div>"""
+            )
+        parts.append("</div>")
+    parts.append(
+        """<div class="toc-university" onclick="scrollToElement('overall-summary')" style="margin-top: 20px; color: #e74c3c;">전체 데이터 요약</div>"""
+    )
+    parts.append("</div>\n")
+    return "".join(parts)
+
+
+# 대학 한 곳의 섹션 HTML (전형유형별 요약 / 세부유형별 요약 / 모집단위별 전형)
+# 다른 대학과 공유하는 상태가 없어 작업 프로세스에서 따로 만들 수 있다.
+# 플롯 번호는 대학 안에서 매기고 id를 "u{대학 순번}-p{번호}"로 구분해, 어느 프로세스가 만들어도 결과가 같다.
+# df_univ의 인덱스는 대학 안의 상대 행 번호(0..)이고, 공유 데이터셋의 시작 행은 reportData.rowBase에 있다.
+# entries: (수준, 키) → 통계 항목 (plot_selected_depts가 미리 조회해 넘김)
+def _render_university(
+    univ_idx: int,
+    univ,
+    df_univ: pd.DataFrame,
+    entries: dict,
+    selected_depts: list = None,
+    selected_subtypes: list = None,
+    selected_apptypes: list = None,
+    array_encoding: str = "binary",
+    point_thresholds: tuple = None,
+) -> str:
+    def section_stats(level, key):
+        return _section_stats(entries.get((level, tuple(key))))
+
+    parts = []
+    plot_n = 1
+    parts.append(f"""
+    <div class="dept-container" id="univ-{univ_idx}" style="display: none;">
+        <div class="dept-header">{univ}</div>
+    """)
+
+    # 전형유형별 요약 먼저 추가
+    ap_summary_container_id = f"apptype-summary-{univ_idx}"
+    parts.append(f"""
+    <div class="subtype-container" id="{ap_summary_container_id}" style="background-color: #eef2f7;">
+        <div class="subtype-header" style="color: #1a202c;">전형유형별 요약</div>
+    """)
+
+    if selected_apptypes:
+        apptypes_all = sorted(set(df_univ['apptype']) & set(selected_apptypes))
+    else:
+        apptypes_all = sorted(df_univ['apptype'].unique())
+
+    for a_idx, apptype in enumerate(apptypes_all, 1):
+        ss = df_univ[value_mask(df_univ, 'apptype', [apptype])]
+
+        if selected_depts:
+            ss = ss[value_mask(ss, 'dept', selected_depts)]
+            if ss.empty:
+                continue
+        if selected_subtypes:
+            ss = ss[value_mask(ss, 'subtype', selected_subtypes)]
+            if ss.empty:
+                continue
+
+        conv_stats_html, all_subj_stats_html, add_stats = section_stats("apptype", (univ, apptype))
+
+        plot_id = f"u{univ_idx}-p{plot_n}"
+        plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
+            plot_id, ss, add_stats=add_stats, encoding=array_encoding, point_thresholds=point_thresholds
+        )
+
+        parts.append(f"""
+            <div class="subtype-container" id="apptype-{univ_idx}-{a_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
+                <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{apptype}</div>
+                <div class="visualization-container">
+                    <div class="plot-stats-wrapper">
+                        <div id="conv-stats-{plot_id}" class="stats-container" style="display:none;">{conv_stats_html}</div>
+                        <div id="all-subj-stats-{plot_id}" class="stats-container">{all_subj_stats_html}</div>
+                        <div class="plot-container" id="plot-{plot_id}"></div>
+                    </div>
+                    {plot_script}
+                </div>
+            </div>
+        """)
+        plot_n += 1
+
+    parts.append("""
+    </div>
+    """)
+
+    # 대학별 세부유형 요약 섹션을 먼저 추가
+    summary_container_id = f"summary-container-{univ_idx}"
+    parts.append(f"""
+    <div class="subtype-container" id="{summary_container_id}" style="background-color: #eef2f7;">
+        <div class="subtype-header" style="color: #1a202c;">세부유형별 요약</div>
+    """)
+
+    # 전형 목록 가져오기
+    if selected_subtypes:
+        subtypes_all = sorted(set(df_univ['subtype']) & set(selected_subtypes))
+    else:
+        subtypes_all = sorted(df_univ['subtype'].unique())
+
+    for s_idx, subtype in enumerate(subtypes_all, 1):
+        # 해당 전형의 모든 데이터 추출
+        ss = df_univ[value_mask(df_univ, 'subtype', [subtype])]
+
+        # 선택된 모집단위 필터링 적용
+        if selected_depts:
+            ss = ss[value_mask(ss, 'dept', selected_depts)]
+            if ss.empty:
+                continue
+
+        # 통계 조회
+        conv_stats_html, all_subj_stats_html, add_stats = section_stats("subtype", (univ, subtype))
+
+        # 박스플롯 스크립트 및 통계 테이블 생성
+        plot_id = f"u{univ_idx}-p{plot_n}"
+        plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
+            plot_id, ss, add_stats=add_stats, encoding=array_encoding, point_thresholds=point_thresholds
+        )
+
+        parts.append(f"""
+            <div class="subtype-container" id="subtype-summary-{univ_idx}-{s_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
+                <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{subtype}</div>
+                <div class="visualization-container">
+                    <div class="plot-stats-wrapper">
+                        <div id="conv-stats-{plot_id}" class="stats-container" style="display:none;">{conv_stats_html}</div>
+                        <div id="all-subj-stats-{plot_id}" class="stats-container">{all_subj_stats_html}</div>
+                        <div class="plot-container" id="plot-{plot_id}"></div>
+                    </div>
+                    {plot_script}
+                </div>
+            </div>
+        """)
+        plot_n += 1
+
+    parts.append("""
+    </div>
+    """)
+
+    # 각 대학에서 모집단위 목록 가져오기
+    univ_depts = _university_depts(df_univ['dept'], selected_depts)
+
+    # 모집단위별 루프
+    for d_idx, dept in enumerate(univ_depts, 1):
+        dd = df_univ[value_mask(df_univ, 'dept', [dept])]
+
+        parts.append(f"""
+        <div class="subtype-container" id="dept-container-{univ_idx}-{d_idx}">
+            <div class="subtype-header" style="color: #34495e;">{d_idx}) {dept}</div>
+        """)
+
+        # 선택된 전형 목록 가져오기
+        if selected_subtypes:
+            dept_subtypes = sorted(set(dd['subtype']) & set(selected_subtypes))
+        else:
+            dept_subtypes = sorted(dd['subtype'].unique())
+
+        # 전형별 루프
+        for st_idx, subtype_val in enumerate(dept_subtypes, 1):
+            st_data = dd[value_mask(dd, 'subtype', [subtype_val])]
+            if st_data.empty:
+                continue
+
+            conv_stats_html, all_subj_stats_html, add_stats = section_stats(
+                "dept_subtype", (univ, dept, subtype_val)
+            )
+
+            plot_id = f"u{univ_idx}-p{plot_n}"
+            plot_script, conv_detail_stats, all_subj_detail_stats = create_plot_data_script(
+                plot_id, st_data, add_stats=add_stats, encoding=array_encoding, point_thresholds=point_thresholds
+            )
+
+            parts.append(f"""
+            <div class="subtype-container" id="subtype-{univ_idx}-{d_idx}-{st_idx}" style="margin-left: 20px; background-color: #fbfcfe;">
+                <div class="subtype-header" style="font-size: 16px; color: #4a5568;">{st_idx}) {subtype_val}</div>
+                <div class="visualization-container">
+                    <div class="plot-stats-wrapper">
+                        <div id="conv-stats-{plot_id}" class="stats-container" style="display:none;">{conv_stats_html}</div>
+                        <div id="all-subj-stats-{plot_id}" class="stats-container">{all_subj_stats_html}</div>
+                        <div class="plot-container" id="plot-{plot_id}"></div>
+                    </div>
+                    {plot_script}
+                </div>
+            </div>
+            """)
+            plot_n += 1
+
+        parts.append("""
+        </div>
+        """)
+
+    # 대학 컨테이너 닫기
+    parts.append("""
+    </div>
+    """)
+    return "".join(parts)
+
+
+def create_shard_script(univ_idx: int, df_univ: pd.DataFrame, fragment: str, encoding: str = "binary") -> str:
+    """
+    대학 섹션 조각 → 대학 조각 파일(.js) 내용: registerReportShard({univ, data, html}) 호출 하나
+    data: 대학 행만 담은 데이터셋 (create_dataset_script 형식, 행 번호는 대학 안에서 0부터)
+    html: 섹션 HTML (플롯 데이터 섬 포함, 페이지가 문서에 넣은 뒤 플롯을 만들 때 읽는다)
+    페이지는 대학 섹션을 처음 열 때 이 파일을 <script>로 불러온다 (file://에서도 동작)
+    """
+    data = _dataset_payload(df_univ, TRACE_Y_POSITIONS, encoding=encoding)
+    return (
+        f"registerReportShard({{univ: {univ_idx}, "
+        f"data: {json.dumps(data, ensure_ascii=False, cls=NumpyEncoder)}, "
+        f"html: {json.dumps(fragment, ensure_ascii=False)}}});\n"
+    )
+
+
+def _shard_placeholder(univ_idx: int, univ, href: str) -> str:
+    """색인 페이지의 대학 섹션 자리 (처음 열 때 href의 조각 파일로 바뀐다)"""
+    return f"""
+    <div class="dept-container" id="univ-{univ_idx}" data-shard="{href}" style="display: none;">
+        <div class="dept-header">{univ}</div>
+        <p style="text-align:center; color:#718096;">대학 데이터를 불러오는 중…</p>
+    </div>
+    """
+
+
+# 보고서 본문 섹션 생성기: 대학별 섹션과 전체 요약을 조각 단위로 내보낸다
+# (plot_selected_depts가 조각을 파일에 바로 흘려 쓰므로 문서 전체를 메모리에 모으지 않음)
+# df_filtered는 대학별로 행이 모여 있어야 한다 (대학 조각이 시작 행 + 상대 행 번호로 점을 참조)
+def _report_sections(
+    df_filtered: pd.DataFrame,
+    universities: list,
+    section_entry,
+    university_entries,
+    selected_depts: list = None,
+    selected_univs: list = None,
+    selected_subtypes: list = None,
+    selected_apptypes: list = None,
+    array_encoding: str = "binary",
+    max_workers: int = 1,
+    fragment_cache=None,
+    max_live_plots: int = 40,
+    point_thresholds: tuple = None,
+    assets: dict = None,
+    shard_dir: Path = None,
+    shard_names: list = None,
+):
+    # shard_dir가 있으면 대학 섹션은 shard_dir의 대학 조각 파일(univ-{순번}-{내용 해시}.js)로 쓰고
+    # 문서에는 자리만 남긴다. 전체 요약 산점도가 구간 밀도 기준을 넘으면 색인 페이지의 데이터셋은 비우고
+    # 밀도로 싣는다 (색인 크기가 행 수와 무관). 기준 이하이면 전체 행을 색인 데이터셋에 실어 점으로 그린다.
+    # 쓴 조각 파일 이름은 shard_names에 모은다 (호출 측이 옛 조각 정리)
+    # 목차는 대학별 모집단위 목록만으로 미리 렌더링한다 (페이지에서 DOM을 훑지 않음)
+    univ_rows = df_filtered.groupby('univ', observed=True, sort=True).indices
+    yield _report_head(assets)
+    yield create_toc_html([
+        (univ, _university_depts(df_filtered['dept'].iloc[univ_rows[univ]], selected_depts)) for univ in universities
+    ])
+    yield _REPORT_MAIN_OPEN
+
+    # 필터링된 행을 한 번만 싣고, 아래 플롯들은 행 번호로만 참조한다
+    if shard_dir is None:
+        row_bases = {f"u{univ_idx}": int(univ_rows[univ][0]) for univ_idx, univ in enumerate(universities, 1)}
+        yield create_dataset_script(df_filtered, TRACE_Y_POSITIONS, encoding=array_encoding, row_bases=row_bases)
+    elif _scatter_mode(df_filtered, point_thresholds) == "density":
+        yield create_dataset_script(df_filtered.iloc[:0], TRACE_Y_POSITIONS, encoding=array_encoding)
+    else:  # 대학 섹션 플롯은 조각의 데이터셋을 쓰므로 전체 요약만 색인 데이터셋(시작 행 0)을 쓴다
+        yield create_dataset_script(df_filtered, TRACE_Y_POSITIONS, encoding=array_encoding)
+
+    # 대학별 섹션은 서로 독립이라 작업 단위로 나눠 렌더링(또는 캐시에서 재사용)하고 순서대로 이어 붙인다
+    tasks = (
+        (
+            univ, df_univ, university_entries(univ, df_univ),
+            selected_depts, selected_subtypes, selected_apptypes, array_encoding, point_thresholds,
+        )
+        for univ in universities
+        for df_univ in (df_filtered.iloc[univ_rows[univ]].reset_index(drop=True),)
+    )
+    fragments = _render_universities(tasks, max_workers, fragment_cache)
+    if shard_dir is None:
+        yield from fragments
+    else:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        for univ_idx, (univ, fragment) in enumerate(zip(universities, fragments), 1):
+            df_univ = df_filtered.iloc[univ_rows[univ]].reset_index(drop=True)
+            shard = create_shard_script(univ_idx, df_univ, fragment, array_encoding)
+            name = f"univ-{univ_idx}-{digest(shard)[:12]}.js"
+            write_atomic(shard_dir / name, [shard])
+            if shard_names is not None:
+                shard_names.append(name)
+            yield _shard_placeholder(univ_idx, univ, f"{shard_dir.name}/{name}")
+
+    # 전체 데이터 요약 섹션 추가
+    yield """
+    <div class="dept-container" id="overall-summary">
+        <div class="dept-header" style="color: #2c3e50; border-bottom: 2px solid #e74c3c;">전체 데이터 요약</div>
+        <div class="subtype-container" style="background-color: #f8f9fa;">
+            <div class="subtype-header" style="color: #1a202c;">선택된 모든 필터에 대한 종합 분석</div>
+    """
+
+    # 전체 필터링된 데이터에 대한 통계 조회
+    plot_id = "overall"
+    overall_conv_stats_html, overall_all_subj_stats_html, overall_add_stats = _section_stats(section_entry("overall", ()))
+
+    # 박스플롯 스크립트 및 통계 테이블 생성
+    overall_plot_script, overall_conv_detail_stats, overall_all_subj_detail_stats = create_plot_data_script(
+        plot_id, df_filtered, add_stats=overall_add_stats, encoding=array_encoding, point_thresholds=point_thresholds
+    )
+
+    yield f"""
+        <div class="visualization-container">
+            <div class="plot-stats-wrapper">
+                <div id="conv-stats-{plot_id}" class="stats-container" style="display:none;">{overall_conv_stats_html}</div>
+                <div id="all-subj-stats-{plot_id}" class="stats-container">{overall_all_subj_stats_html}</div>
+                <div class="plot-container" id="plot-{plot_id}"></div>
+            </div>
+            {overall_plot_script}
+            <div class="stats-tables-wrapper">
+                <div id="conv-additional-stats-{plot_id}" class="additional-stats-container" style="display:none;">
+                    {overall_conv_detail_stats}
+                </div>
+                <div id="all-subj-additional-stats-{plot_id}" class="additional-stats-container">
+                    {overall_all_subj_detail_stats}
+                </div>
+            </div>
+        </div>
+    """
+
+    # 추가 시각화 생성 - 전체 데이터 요약에 대한 추가 그래프
+    additional_visualizations = create_advanced_visualizations(plot_id, df_filtered, include_functions=assets is None)
+    yield additional_visualizations
+
+    # 선택된 필터 정보 표시 (옵션)
+    filter_info = []
+    if selected_univs:
+        univ_count = len(selected_univs)
+        univ_text = f"{univ_count}개 대학" if univ_count > 3 else ", ".join(selected_univs)
+        filter_info.append(f"선택된 대학: {univ_text}")
+    if selected_subtypes:
+        subtype_count = len(selected_subtypes)
+        subtype_text = f"{subtype_count}개 전형" if subtype_count > 3 else ", ".join(selected_subtypes)
+        filter_info.append(f"선택된 전형: {subtype_text}")
+    if selected_depts:
+        dept_count = len(selected_depts)
+        dept_text = f"{dept_count}개 모집단위" if dept_count > 3 else ", ".join(selected_depts)
+        filter_info.append(f"선택된 모집단위: {dept_text}")
+
+    if filter_info:
+        filter_info_html = "<div class='filter-info-container'><h3>적용된 필터</h3><ul>"
+        for info in filter_info:
+            filter_info_html += f"<li>{info}</li>"
+        filter_info_html += "</ul></div>"
+        yield filter_info_html
+
+    yield """
+        </div>
+    </div>
+    """
+
+    yield _page_options_script(max_live_plots, point_thresholds)
+    yield _report_scripts(assets)
+    yield _REPORT_FOOT
+
+
+# 인터랙티브(크로스필터) 보고서: 선택 범위의 행을 한 번 싣고 필터/통계/플롯을 브라우저에서 다시 계산한다
+# 필터는 GUI의 MultiSelectFilter와 같은 열/이름/순서
+INTERACTIVE_FILTERS = [("region", "지역"), ("univ", "대학"), ("apptype", "전형유형"), ("subtype", "전형"), ("dept", "모집단위")]
+REPORT_MODES = ("static", "interactive")
+
+
+def _interactive_filters(data) -> list:
+    """INTERACTIVE_FILTERS 중 데이터에 있는 열"""
+    return [(column, label) for column, label in INTERACTIVE_FILTERS if column in data.columns]
+
+
+def create_filter_panel_html(data) -> str:
+    """
+    인터랙티브 보고서의 필터 패널: 열마다 검색창 + 값 체크박스 + 모두 선택/비우기
+    체크박스 순서(= value)는 데이터셋의 값 코드(pd.factorize(sort=True))와 같다
+    데이터에 없는 열(예: 지역)은 건너뛴다
+    """
+    parts = ['                <div class="toc-header">필터</div>\n                <div id="filter-panel">']
+    for column, label in _interactive_filters(data):
+        _, labels = pd.factorize(data[column], sort=True)
+        options = "".join(
+            f"""<label class="filter-option"><input type="checkbox" value="{code}" onchange="onFilterChange('{column}')">"""
+            f"""<span class="filter-label">{value}</span><span class="filter-count"></span></label>"""
+            for code, value in enumerate(labels)
+        )
+        parts.append(f"""
+                    <div class="filter-box" id="filter-{column}">
+                        <div class="filter-title">{label}</div>
+                        <input type="search" class="filter-search" placeholder="검색" oninput="searchFilterOptions('{column}', this.value)">
+                        <div class="filter-options">{options}</div>
+                        <div class="filter-actions">
+                            <button type="button" onclick="setFilterAll('{column}', true)">모두 선택</button>
+                            <button type="button" onclick="setFilterAll('{column}', false)">비우기</button>
+                        </div>
+                    </div>""")
+    parts.append("\n                </div>\n")
+    return "".join(parts)
+
+
+# 인터랙티브 보고서 본문: 선택 범위 요약 카드 + 대학별 카드 자리 (카드는 페이지 JS가 채운다)
+_INTERACTIVE_BODY = """
+    <div class="dept-container" id="interactive-summary">
+        <div class="dept-header">선택 범위 요약<span id="selection-info" class="selection-info"></span></div>
+        <div class="visualization-container">
+            <div class="plot-stats-wrapper">
+                <div id="conv-stats-sel" class="stats-container" style="display:none;"></div>
+                <div id="all-subj-stats-sel" class="stats-container"></div>
+                <div class="plot-container" id="plot-sel"></div>
+            </div>
+        </div>
+    </div>
+    <div id="interactive-univs"></div>
+"""
+
+_INTERACTIVE_SCRIPT = """
+    <script>
+    // ───── 인터랙티브(크로스필터) 보고서 ─────
+    // 필터 상태를 계산 작업자에 보내면 작업자가 값별 행 번호 목록(postings)으로 선택 행을 모아 통계 요약과
+    // 산점도 데이터를 다시 만든다. 페이지는 카드 HTML만 바꾸고, 플롯 생성/해제와 등급 전환은
+    // 정적 보고서와 같은 함수(observePlot, forgetPlot, switchGradeType)를 쓴다.
+    var FILTER_COLUMNS = Array.prototype.map.call(  // 필터 패널에 있는 열 (id="filter-{열}")
+        document.querySelectorAll('#filter-panel .filter-box'), function(box) { return box.id.slice(7); });
+    var filterState = {};     // 열 → 선택된 값 코드 목록 (비어 있으면 필터 없음)
+    var filterOptionCache = {};
+    var filterRequest = 0;    // 가장 최근 필터 요청 번호 (이전 응답은 버린다)
+
+    function applyFilters() {
+        var started = performance.now();
+        var state = {};
+        FILTER_COLUMNS.forEach(function(column) { state[column] = (filterState[column] || []).slice(); });
+        var requestId = callWorker({type: 'filter', state: state, columns: FILTER_COLUMNS}, function(result, error) {
+            if (error || requestId !== filterRequest) return;
+            renderSelection(result, started);
+        });
+        filterRequest = requestId;
+    }
+
+    function statsBlocksHtml(plotId, group) {
+        var conv = currentGradeType === 'conv';
+        return '<div id="conv-stats-' + plotId + '" class="stats-container" style="display:' + (conv ? 'flex' : 'none') + ';">' + group.conv + '</div>' +
+            '<div id="all-subj-stats-' + plotId + '" class="stats-container" style="display:' + (conv ? 'none' : 'flex') + ';">' + group.allSubj + '</div>';
+    }
+
+    function renderSelection(result, started) {
+        var univLabels = window.reportData.columns.univ.labels;
+        // 선택 범위 요약 카드
+        var summaryWrapper = document.querySelector('#interactive-summary .plot-stats-wrapper');
+        var summaryPlot = document.getElementById('plot-sel');
+        forgetPlot(summaryPlot);
+        summaryWrapper.querySelectorAll('.stats-container').forEach(function(el) { el.remove(); });
+        summaryWrapper.insertAdjacentHTML('afterbegin', statsBlocksHtml('sel', result.groups[0]));
+        observePlot(summaryPlot);
+
+        // 대학별 카드 (값 코드 순 = 이름순)
+        var container = document.getElementById('interactive-univs');
+        container.querySelectorAll('.plot-container').forEach(forgetPlot);
+        container.innerHTML = result.groups.slice(1).map(function(group) {
+            return '<div class="dept-container" id="univ-card-' + group.univ + '"><div class="dept-header">' + univLabels[group.univ] + '</div>' +
+                '<div class="visualization-container"><div class="plot-stats-wrapper">' + statsBlocksHtml(group.plotId, group) +
+                '<div class="plot-container" id="plot-' + group.plotId + '"></div></div></div></div>';
+        }).join('');
+        container.querySelectorAll('.plot-container').forEach(observePlot);
+
+        updateFilterCounts(result.counts);
+        document.getElementById('selection-info').textContent =
+            ' ' + result.rows + '명 · 대학 ' + (result.groups.length - 1) + '곳 · ' + Math.round(performance.now() - started) + 'ms';
+    }
+
+    // 필터 값 옆 인원: 다른 열의 필터만 적용했을 때 그 값을 가진 행 수 (0이면 흐리게)
+    function updateFilterCounts(counts) {
+        FILTER_COLUMNS.forEach(function(column) {
+            filterOptions(column).forEach(function(option, code) {
+                option.querySelector('.filter-count').textContent = counts[column][code];
+                option.classList.toggle('empty', counts[column][code] === 0);
+            });
+        });
+    }
+
+    function filterOptions(column) {
+        return filterOptionCache[column] || (filterOptionCache[column] = Array.prototype.slice.call(
+            document.querySelectorAll('#filter-' + column + ' .filter-option')));
+    }
+
+    function onFilterChange(column) {
+        filterState[column] = [];
+        filterOptions(column).forEach(function(option, code) {
+            if (option.querySelector('input').checked) filterState[column].push(code);
+        });
+        applyFilters();
+    }
+
+    // 검색으로 보이는 값만 모두 선택 / 비우기
+    function setFilterAll(column, checked) {
+        filterOptions(column).forEach(function(option) {
+            if (option.style.display !== 'none') option.querySelector('input').checked = checked;
+        });
+        onFilterChange(column);
+    }
+
+    function searchFilterOptions(column, query) {
+        filterOptions(column).forEach(function(option) {
+            var label = option.querySelector('.filter-label').textContent;
+            option.style.display = label.indexOf(query) >= 0 ? '' : 'none';
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', applyFilters);
+    </script>
+    """
+
+
+def _interactive_report_sections(
+    df_filtered: pd.DataFrame,
+    array_encoding: str = "binary",
+    max_live_plots: int = 40,
+    point_thresholds: tuple = None,
+    assets: dict = None,
+):
+    """인터랙티브 보고서 조각: 필터 패널 + 값별 행 번호 목록을 포함한 공유 데이터셋 + 요약/대학 카드 자리 + 페이지 JS"""
+    yield _report_head(assets)
+    yield create_filter_panel_html(df_filtered)
+    yield _REPORT_MAIN_OPEN
+    label_columns = [column for column, _ in _interactive_filters(df_filtered)] + ["result"]
+    yield create_dataset_script(
+        df_filtered, TRACE_Y_POSITIONS, encoding=array_encoding, label_columns=label_columns, posting_lists=True,
+    )
+    yield _INTERACTIVE_BODY
+    yield _page_options_script(max_live_plots, point_thresholds)
+    yield _report_scripts(assets, interactive=True)
+    yield _REPORT_FOOT
+
+
+# 새로운 함수: 히스토그램 및 추가 시각화 생성
+# 선택된 모집단위에 대한 대학별 시각화 함수 (전형 필터 추가)
+def plot_selected_depts(
+    df: pd.DataFrame,
+    out_dir: Path,
+    selected_depts: list = None,
+    selected_univs: list = None,
+    selected_subtypes: list = None,
+    selected_apptypes: list = None,
+    selected_regions: list = None,
+    output_file: str = "선택된_모집단위들.html",
+    stats_cube=None,
+    exact_stats: bool = False,
+    quantiles: str = "exact",
+    array_encoding: str = "binary",
+    max_workers: Optional[int] = None,
+    fragment_cache=None,
+    max_live_plots: int = 40,
+    webgl_threshold: int = DEFAULT_WEBGL_THRESHOLD,
+    density_threshold: int = DEFAULT_DENSITY_THRESHOLD,
+    report_mode: str = "static",
+    report_layout: str = "inline",
+) -> str:
+    """
+    선택된 모집단위에 대한 입시 결과를 대학별로 시각화
+    stats_cube가 주어지면 통계 표는 큐브에서 조회한다 (exact_stats=True면 원본 행으로 정확히 계산)
+    quantiles="sketch"면 원본 행 계산에서도 사분위수를 leaf 요약 병합으로 구한다
+    array_encoding="json"이면 등급/행 번호 배열을 base64 typed array 대신 일반 JSON 리스트로 싣는다
+    max_workers: 대학별 섹션을 렌더링할 프로세스 수 (기본: min(대학 수, CPU 수), 1이면 순차 처리)
+                 캐시에 없는 대학이 PARALLEL_MIN_UNIVS개 이하이면 프로세스 풀을 띄우지 않는다
+                 작업자 수와 상관없이 같은 입력이면 같은 파일이 나온다.
+    fragment_cache: 대학별 섹션 조각 캐시 (FragmentCache). 행/통계/필터가 그대로인 대학은 다시 렌더링하지 않는다.
+    max_live_plots: 페이지에서 동시에 살아 있는 산점도 수 상한. 플롯은 화면 근처에 올 때 만들고
+                    멀어지거나 상한을 넘으면 해제한다 (화면 근처 플롯은 유지).
+    webgl_threshold: 산점도 점 수가 이보다 많으면 WebGL(scattergl)로 그린다
+    density_threshold: 이보다 많으면 점 대신 결과별 0.1등급 구간 인원을 크기로 표시한다 (hover: 인원, 주요 모집단위)
+    report_mode="interactive"면 선택 범위의 행을 한 번 싣고 지역/대학/전형유형/전형/모집단위 필터와
+                통계 요약, 산점도를 브라우저에서 다시 계산하는 보고서를 만든다 (통계 큐브는 쓰지 않음)
+    report_layout="inline"이면 스타일/페이지 JS를 문서에 싣는 단일 파일 (메일 첨부용),
+                 "assets"면 plotly.js(고정 버전 사본)/report.css/report.js를 out_dir/assets/에 한 번만 쓰고 참조한다
+                 (여러 보고서가 공유해 폴더가 작아지고, 고정 버전 plotly.js 사본을 써 네트워크 없이 열린다)
+                 "sharded"면 assets에 더해 대학 섹션을 {파일 이름}_shards/의 대학별 조각 파일로 나누고,
+                 output_file은 목차/전체 요약만 든 작은 색인 페이지가 된다 (연 대학의 조각만 불러옴, 정적 보고서 전용)
+    """
+    if report_mode not in REPORT_MODES:
+        raise ValueError(f"report_mode는 {REPORT_MODES} 중 하나여야 합니다: {report_mode!r}")
+    if report_layout not in REPORT_LAYOUTS:
+        raise ValueError(f"report_layout은 {REPORT_LAYOUTS} 중 하나여야 합니다: {report_layout!r}")
+    if report_layout == "sharded" and report_mode == "interactive":
+        raise ValueError("인터랙티브 보고서는 sharded 레이아웃을 쓸 수 없습니다 (필터가 모든 행을 쓰므로)")
+    if array_encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f"array_encoding은 {ARRAY_ENCODINGS} 중 하나여야 합니다: {array_encoding!r}")
+    if max_live_plots < 1:
+        raise ValueError(f"max_live_plots는 1 이상이어야 합니다: {max_live_plots!r}")
+    # 선택된 모집단위와 대학에 해당하는 데이터만 필터링
+    # 범주형 열은 정수 코드로 비교하며, 마스크를 모아 한 번만 슬라이싱한다
+    mask = None
+    selections = {
+        'dept': selected_depts,        # 선택된 모집단위 필터링
+        'region': selected_regions,    # 선택된 지역 필터링
+        'univ': selected_univs,        # 선택된 대학 필터링
+        'subtype': selected_subtypes,  # 선택된 전형 필터링
+        'apptype': selected_apptypes,  # 선택된 전형유형 필터링
+    }
+    for column, selected in selections.items():
+        if selected:
+            m = value_mask(df, column, selected)
+            mask = m if mask is None else mask & m
+    df_filtered = df if mask is None else df[mask]
+    # 플롯은 공유 데이터셋의 행 번호(0..n-1)로 점을 참조하므로 인덱스를 위치로 맞춘다
+    # 대학별로 행을 모아(안정 정렬) 대학 조각이 시작 행 + 상대 행 번호로 점을 참조할 수 있게 한다
+    df_filtered = df_filtered.sort_values('univ', kind='stable').reset_index(drop=True)
+
+    if df_filtered.empty:
+        return "선택된 조건에 맞는 데이터가 없습니다."
+
     output_path = out_dir / output_file
+    assets = None
+    if report_layout in ("assets", "sharded"):
+        try:
+            assets = write_assets(out_dir, report_asset_files(), page_dir=output_path.parent)
+        except OSError as e:
+            return f"공용 자산 저장 중 오류 발생: {e}"
+    if report_mode == "interactive":
+        sections = _interactive_report_sections(
+            df_filtered, array_encoding=array_encoding, max_live_plots=max_live_plots,
+            point_thresholds=(webgl_threshold, density_threshold), assets=assets,
+        )
+        try:
+            write_atomic(output_path, sections)
+            return f"{output_path.resolve()} 파일이 생성되었습니다."
+        except (OSError, UnicodeError) as e:
+            return f"파일 저장 중 오류 발생: {e}"
+
+    # 필터링된 데이터에서 대학 목록 추출 (순서 보존을 위해 사용)
+    universities = sorted(df_filtered['univ'].unique())
+
+    # 모든 수준의 통계를 한 번에 계산해 두고 아래에서는 조회만 한다
+    # (큐브가 있으면 필터 선택을 만족하는 큐브 셀을 수준별로 한 번 합쳐 원본 행 없이 조회)
+    use_cube = stats_cube is not None and not exact_stats
+    group_stats = None if use_cube else GroupStats(df_filtered, quantiles=quantiles)
+    cube_tables = {}
+
+    def section_entry(level, key):
+        if not use_cube:
+            return group_stats.table(level).get(tuple(key))
+        if level not in cube_tables:
+            cube_tables[level] = stats_cube.table(selections, DEFAULT_LEVELS[level])
+        return cube_tables[level].get(tuple(key))
+
+    def university_entries(univ, df_univ):
+        """대학 섹션이 조회할 (수준, 키) → 통계 항목 (작업 프로세스로 넘길 수 있도록 미리 조회)"""
+        entries = {}
+        for level, columns in DEFAULT_LEVELS.items():
+            if not columns:
+                continue
+            for key in df_univ[list(columns)].drop_duplicates().itertuples(index=False, name=None):
+                entries[(level, key)] = section_entry(level, key)
+        return entries
+
+    workers = max_workers or min(len(universities), os.cpu_count() or 1)
+
+    # 대학 조각 파일은 이름에 내용 해시가 있어, 색인 페이지를 다 쓴 뒤에 이번에 쓰지 않은 옛 조각만 지운다
+    shard_dir = report_shard_dir(output_path) if report_layout == "sharded" else None
+    shard_names = []
+
+    # 섹션 조각을 버퍼드 임시 파일에 바로 쓰고, 다 쓰면 rename으로 한 번에 교체한다
+    sections = _report_sections(
+        df_filtered, universities, section_entry, university_entries,
+        selected_depts, selected_univs, selected_subtypes, selected_apptypes,
+        array_encoding=array_encoding, max_workers=workers, fragment_cache=fragment_cache,
+        max_live_plots=max_live_plots, point_thresholds=(webgl_threshold, density_threshold), assets=assets,
+        shard_dir=shard_dir, shard_names=shard_names,
+    )
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        return f"{output_path.resolve()} 파일이 생성되었습니다."
-    except Exception as e:
-        return f"파일 저장 중 오류 발생: {e}"
\ No newline at end of file
+        write_atomic(output_path, sections)
+    except (OSError, UnicodeError) as e:
+        return f"파일 저장 중 오류 발생: {e}"
+    if shard_dir is not None:
+        _remove_stale_shards(shard_dir, shard_names)
+    return f"{output_path.resolve()} 파일이 생성되었습니다."
+
+
+def report_shard_dir(output_path: Path) -> Path:
+    """분할 보고서의 대학 조각 파일 폴더 ({파일 이름}_shards/)"""
+    return Path(output_path).with_name(f"{Path(output_path).stem}_shards")
+
+
+def _remove_stale_shards(shard_dir: Path, keep: list) -> int:
+    """shard_dir에서 keep에 없는 대학 조각 파일 삭제 (지운 개수)"""
+    keep = set(keep)
+    removed = 0
+    for entry in shard_dir.glob("univ-*.js"):
+        if entry.name not in keep:
+            try:
+                entry.unlink()
+                removed += 1
+            except OSError as e:
+                print(f"경고: 옛 대학 조각 파일을 지우지 못했습니다 ({entry.name}): {e}")
+    return removed
@@ -8,8 +8,12 @@ from pathlib import Path
 import pandas as pd  # used only for typing hints, not strictly required
 
 from filter_widgets import MultiSelectFilter
-from data_processor import read_input
+from data_processor import expand_input_paths, read_inputs
+from data_cache import get_default_cache
+from filter_index import FilterIndex
+from fragment_cache import get_default_fragment_cache
 from html_generator import plot_selected_depts
+from stats_cube import StatsCube, get_or_build_cube
 from utils import sanitize
 
 
@@ -33,6 +37,8 @@ class DepartmentSelector(tk.Tk):
 
         # DataFrame 자리
         self.df: pd.DataFrame | None = None
+        self.filter_index: FilterIndex | None = None
+        self.stats_cube: StatsCube | None = None
 
         # 출력 디렉터리
         self.output_dir = Path("output_htmls")
@@ -74,7 +80,14 @@ class DepartmentSelector(tk.Tk):
         ttk.Button(top_frame, text="파일 찾아보기", command=self._browse_file).pack(
             side=tk.LEFT, padx=(0, 5)
         )
+        ttk.Button(top_frame, text="폴더 선택", command=self._browse_dir).pack(
+            side=tk.LEFT, padx=(0, 5)
+        )
         ttk.Button(top_frame, text="데이터 로드", command=self._load_file).pack(side=tk.LEFT)
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(top_frame, text="캐시 사용", variable=self.use_cache_var).pack(side=tk.LEFT, padx=(10, 0))
+        self.use_cube_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="통계 큐브", variable=self.use_cube_var).pack(side=tk.LEFT, padx=(5, 0))
 
         # ── 필터 영역 placeholder (엑셀 로드 후 build_filters) ──
         self.filter_container = ttk.Frame(self.main_frame)
@@ -96,6 +109,18 @@ class DepartmentSelector(tk.Tk):
         ttk.Entry(bottom_frame, textvariable=self.filename_var).pack(
             side=tk.LEFT, fill=tk.X, expand=True, padx=5
         )
+        # 큐브가 있어도 원본 행으로 정확히 다시 계산하고 싶을 때
+        self.exact_stats_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="정확 계산", variable=self.exact_stats_var).pack(side=tk.LEFT, padx=(0, 5))
+        # 필터/통계/플롯을 브라우저에서 다시 계산하는 인터랙티브 보고서
+        self.interactive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="인터랙티브", variable=self.interactive_var).pack(side=tk.LEFT, padx=(0, 5))
+        # plotly.js/CSS/JS를 출력 폴더의 assets/에 한 번만 두고 여러 보고서가 공유 (끄면 메일 첨부용 단일 파일)
+        self.shared_assets_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="공용 자산(assets/)", variable=self.shared_assets_var).pack(side=tk.LEFT, padx=(0, 5))
+        # 대학 섹션을 대학별 조각 파일로 나눠 색인 페이지가 바로 열리게 (공용 자산도 씀, 정적 보고서 전용)
+        self.sharded_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text="대학별 분할", variable=self.sharded_var).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(
             bottom_frame,
             text="HTML 보고서 생성",
@@ -157,32 +182,61 @@ class DepartmentSelector(tk.Tk):
     # ▶ 파일 다이얼로그
     # ------------------------------------------------------------
     def _browse_file(self) -> None:
-        file_path = filedialog.askopenfilename(title="입시 결과 엑셀 파일 선택", filetypes=[("Excel files", "*.xlsx *.xls")])
-        if file_path:
-            self.file_path_var.set(file_path)
-            self.status_var.set(f"선택된 파일: {Path(file_path).name}")
+        file_paths = filedialog.askopenfilenames(title="입시 결과 엑셀 파일 선택 (여러 개 가능)", filetypes=[("Excel files", "*.xlsx *.xls")])
+        if file_paths:
+            self.file_path_var.set(";".join(file_paths))
+            if len(file_paths) == 1:
+                self.status_var.set(f"선택된 파일: {Path(file_paths[0]).name}")
+            else:
+                self.status_var.set(f"선택된 파일: {len(file_paths)}개")
+
+    def _browse_dir(self) -> None:
+        dir_path = filedialog.askdirectory(title="입시 결과 엑셀 파일이 있는 폴더 선택")
+        if dir_path:
+            self.file_path_var.set(dir_path)
+            self.status_var.set(f"선택된 폴더: {Path(dir_path).name}")
 
     # ------------------------------------------------------------
     # ▶ 엑셀 로드 (스레드)
     # ------------------------------------------------------------
     def _load_file(self) -> None:
-        file_path = self.file_path_var.get().strip()
-        if not file_path:
+        # 여러 파일은 ';'로 구분, 폴더를 지정하면 폴더 안의 엑셀 파일을 모두 읽는다
+        file_paths = [p.strip() for p in self.file_path_var.get().split(";") if p.strip()]
+        if not file_paths:
             messagebox.showerror("오류", "먼저 엑셀 파일을 선택해주세요.")
             return
-        if not Path(file_path).exists():
-            messagebox.showerror("오류", f"파일을 찾을 수 없습니다: {file_path}")
-            return
+        for file_path in file_paths:
+            if not Path(file_path).exists():
+                messagebox.showerror("오류", f"파일을 찾을 수 없습니다: {file_path}")
+                return
 
         # UI 잠금
         self._set_widgets_state(tk.DISABLED)
         self.status_var.set("데이터 로드 중...")
 
-        threading.Thread(target=self._load_file_thread, args=(file_path,), daemon=True).start()
+        threading.Thread(
+            target=self._load_file_thread,
+            args=(file_paths, self.use_cache_var.get(), self.use_cube_var.get()),
+            daemon=True,
+        ).start()
 
-    def _load_file_thread(self, file_path: str) -> None:
+    def _load_file_thread(self, file_paths: list[str], use_cache: bool = True, use_cube: bool = False) -> None:
         try:
-            df = read_input(Path(file_path))
+            paths = expand_input_paths(file_paths)
+            unit = "행" if len(paths) == 1 else "개 파일"
+
+            def on_progress(done: int, total: int | None) -> None:
+                text = f"데이터 로드 중... {done:,}{unit}" + (f" / {total:,}{unit}" if total else "")
+                self.after(0, lambda: self.status_var.set(text))
+
+            df = read_inputs(paths, use_cache=use_cache, progress=on_progress)
+            self.after(0, lambda: self.status_var.set("필터 색인 생성 중..."))
+            self.filter_index = FilterIndex(df)
+            self.stats_cube = None
+            if use_cube:
+                # 큐브는 데이터 캐시 옆에 저장되어 같은 데이터를 다시 열 때는 바로 읽힌다
+                self.after(0, lambda: self.status_var.set("통계 큐브 준비 중..."))
+                self.stats_cube = get_or_build_cube(df, paths, get_default_cache() if use_cache else None)
             self.df = df
             self.after(0, self._build_filters)
             self.after(0, lambda: self.status_var.set("데이터 로드 완료. 필터를 선택하세요."))
@@ -207,61 +261,16 @@ class DepartmentSelector(tk.Tk):
         depts = self.dept_filter.get_selected()
         apptypes = self.apptype_filter.get_selected()
 
-        # 기본 데이터프레임 복사
-        filtered_df = self.df.copy()
-        
-        # 필터링을 위한 임시 데이터프레임 (각 필터에 적용할 데이터)
-        region_filter_df = self.df.copy()
-        univ_filter_df = self.df.copy()
-        subtype_filter_df = self.df.copy()
-        dept_filter_df = self.df.copy()
-        apptype_filter_df = self.df.copy()
-        
-        # 선택된 필터 적용 - 결과 확인용
-        if regions:
-            filtered_df = filtered_df[filtered_df["region"].isin(regions)]
-            # 다른 필터들의 후보는 선택된 지역에 맞춰 제한하지만
-            # 지역 필터 자체의 후보 목록은 모든 가능한 지역을 유지한다
-            univ_filter_df = univ_filter_df[univ_filter_df["region"].isin(regions)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["region"].isin(regions)]
-            dept_filter_df = dept_filter_df[dept_filter_df["region"].isin(regions)]
-            apptype_filter_df = apptype_filter_df[apptype_filter_df["region"].isin(regions)]
-
-        if univs:
-            filtered_df = filtered_df[filtered_df["univ"].isin(univs)]
-            region_filter_df = region_filter_df[region_filter_df["univ"].isin(univs)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["univ"].isin(univs)]
-            dept_filter_df = dept_filter_df[dept_filter_df["univ"].isin(univs)]
-            apptype_filter_df = apptype_filter_df[apptype_filter_df["univ"].isin(univs)]
-        
-        if subs:
-            filtered_df = filtered_df[filtered_df["subtype"].isin(subs)]
-            region_filter_df = region_filter_df[region_filter_df["subtype"].isin(subs)]
-            univ_filter_df = univ_filter_df[univ_filter_df["subtype"].isin(subs)]
-            dept_filter_df = dept_filter_df[dept_filter_df["subtype"].isin(subs)]
-            apptype_filter_df = apptype_filter_df[apptype_filter_df["subtype"].isin(subs)]
-        
-        if depts:
-            filtered_df = filtered_df[filtered_df["dept"].isin(depts)]
-            region_filter_df = region_filter_df[region_filter_df["dept"].isin(depts)]
-            univ_filter_df = univ_filter_df[univ_filter_df["dept"].isin(depts)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["dept"].isin(depts)]
-            apptype_filter_df = apptype_filter_df[apptype_filter_df["dept"].isin(depts)]
-
-        if apptypes:
-            filtered_df = filtered_df[filtered_df["apptype"].isin(apptypes)]
-            region_filter_df = region_filter_df[region_filter_df["apptype"].isin(apptypes)]
-            univ_filter_df = univ_filter_df[univ_filter_df["apptype"].isin(apptypes)]
-            subtype_filter_df = subtype_filter_df[subtype_filter_df["apptype"].isin(apptypes)]
-            dept_filter_df = dept_filter_df[dept_filter_df["apptype"].isin(apptypes)]
-
-        # 각 필터 항목 업데이트
-        # 이미 선택된 항목은 후보 목록에서 사라지지 않도록 항상 포함시킨다
-        region_candidates = set(region_filter_df["region"].unique()).union(regions)
-        univ_candidates = set(univ_filter_df["univ"].unique()).union(univs)
-        apptype_candidates = set(apptype_filter_df["apptype"].unique()).union(apptypes)
-        subtype_candidates = set(subtype_filter_df["subtype"].unique()).union(subs)
-        dept_candidates = set(dept_filter_df["dept"].unique()).union(depts)
+        # 역색인에서 비트맵 교집합으로 후보 계산 (DataFrame 복사 없음)
+        # 각 필터의 후보는 "자기 자신을 제외한 나머지 필터"를 적용한 결과이며
+        # 이미 선택된 항목은 후보 목록에서 사라지지 않도록 항상 포함된다
+        selections = {"region": regions, "univ": univs, "apptype": apptypes, "subtype": subs, "dept": depts}
+        candidates = self.filter_index.candidates(selections)
+        region_candidates = candidates["region"]
+        univ_candidates = candidates["univ"]
+        apptype_candidates = candidates["apptype"]
+        subtype_candidates = candidates["subtype"]
+        dept_candidates = candidates["dept"]
 
         self.region_filter.refresh(region_candidates)
         self.univ_filter.refresh(univ_candidates)
@@ -269,9 +278,28 @@ class DepartmentSelector(tk.Tk):
         self.subtype_filter.refresh(subtype_candidates)
         self.dept_filter.refresh(dept_candidates)
 
+        # 큐브가 있으면 선택 조합의 요약을 원본 행 없이 상태바에 표시
+        if self.stats_cube is not None:
+            self.status_var.set(self._cube_summary(selections))
+
         # 필요하다면 그래프 즉시 렌더
-        if not filtered_df.empty and hasattr(self, "render_plots"):
-            self.render_plots(filtered_df)
+        if hasattr(self, "render_plots"):
+            row_ids = self.filter_index.row_ids(selections)
+            filtered_df = self.df if row_ids is None else self.df.iloc[row_ids]
+            if not filtered_df.empty:
+                self.render_plots(filtered_df)
+
+    def _cube_summary(self, selections: dict) -> str:
+        stats = self.stats_cube.basic(selections, "conv_grade")
+        total = stats["total_count"]
+        if total == 0:
+            return "선택된 조건에 맞는 데이터가 없습니다."
+        text = f"선택 {total:,}명 · 합격(전체) {stats.get('all_pass_count', 0):,}명"
+        if "all_pass_rate" in stats:
+            text += f" ({stats['all_pass_rate']})"
+        if "all_pass_mean" in stats:
+            text += f" · 합격 평균 환산등급 {stats['all_pass_mean']:.2f}"
+        return text
 
     # ------------------------------------------------------------
     # ▶ HTML 보고서 생성
@@ -287,9 +315,17 @@ class DepartmentSelector(tk.Tk):
         selected_apptypes = self.apptype_filter.get_selected() or None
         selected_regions = self.region_filter.get_selected() or None
 
-        if not any([selected_depts, selected_univs, selected_subtypes, selected_apptypes, selected_regions]):
+        interactive = self.interactive_var.get()
+        # 인터랙티브 보고서는 브라우저에서 범위를 좁힐 수 있으므로 선택 없이(전체 데이터)도 만들 수 있다
+        if not interactive and not any([selected_depts, selected_univs, selected_subtypes, selected_apptypes, selected_regions]):
             messagebox.showerror("오류", "대학, 전형 또는 모집단위를 하나 이상 선택해주세요.")
             return
+        report_layout = "assets" if self.shared_assets_var.get() else "inline"
+        if self.sharded_var.get():
+            if interactive:
+                messagebox.showerror("오류", "인터랙티브 보고서는 대학별로 분할할 수 없습니다.")
+                return
+            report_layout = "sharded"
 
         filename = self.filename_var.get().strip()
         if not filename:
@@ -313,6 +349,11 @@ class DepartmentSelector(tk.Tk):
         bar.pack(pady=(0, 15))
         bar.start(10)
 
+        exact_stats = self.exact_stats_var.get()
+        # 대학 하나만 추가/제외한 재생성은 나머지 대학 섹션을 조각 캐시에서 재사용한다
+        # GUI의 작업 스레드에서는 프로세스 풀을 띄우지 않고 순차로 렌더링한다 (max_workers=1)
+        fragment_cache = get_default_fragment_cache() if self.use_cache_var.get() else None
+
         def worker():
             try:
                 msg = plot_selected_depts(
@@ -324,6 +365,12 @@ class DepartmentSelector(tk.Tk):
                     selected_apptypes,
                     selected_regions,
                     filename,
+                    stats_cube=self.stats_cube,
+                    exact_stats=exact_stats,
+                    fragment_cache=fragment_cache,
+                    max_workers=1,
+                    report_mode="interactive" if interactive else "static",
+                    report_layout=report_layout,
                 )
                 self.after(0, lambda: self._on_html_done(msg, output_path, prog_win))
             except Exception as e:
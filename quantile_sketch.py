@@ -0,0 +1,176 @@
+# quantile_sketch.py
+# ---------------------------------------------------------------------
+# 합치기 가능한 등급 분위수 요약 (run-length 히스토그램)
+#   - 요약 = 정렬된 (값, 개수) 쌍. 두 요약을 합치면 쌍을 합쳐 같은 값끼리 더하면 된다.
+#   - 표본이 exact_threshold개를 넘는 그룹만 값을 resolution 눈금으로 반올림해 압축한다.
+#     (작은 그룹은 원래 값을 그대로 보관하므로 분위수가 정확하다)
+#   - 반올림 오차는 resolution/2 이하이며, 등급처럼 소수 둘째 자리까지인 값을
+#     0.01 눈금으로 요약하면 손실이 없다.
+#   - 분위수는 pandas Series.quantile과 같은 선형 보간으로 읽는다.
+#
+# 벡터화 함수(encode_runs / merge_runs / runs_quantiles)는 여러 그룹의 요약을
+# 공유 값 표 하나로 한꺼번에 다루며, GroupStats와 StatsCube가 같이 쓴다.
+# ---------------------------------------------------------------------
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEFAULT_RESOLUTION = 0.01
+DEFAULT_EXACT_THRESHOLD = 256
+QUARTILES = (0.25, 0.5, 0.75)
+_DENSE_LIMIT = 1 << 22  # bincount로 처리할 (그룹 × 값) 키 공간 상한
+
+
+def quantize(values: np.ndarray, resolution: Optional[float]) -> np.ndarray:
+    """값을 resolution 눈금으로 반올림 (None이면 그대로)"""
+    if not resolution:
+        return values
+    return np.round(np.rint(values / resolution) * resolution, 10)
+
+
+def _run_length(groups: np.ndarray, codes: np.ndarray, counts: np.ndarray, n_codes: int) -> tuple:
+    """(그룹, 값 코드) 쌍의 개수를 합쳐 그룹, 값 순으로 정렬된 run을 만든다"""
+    if len(codes) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    key = groups.astype(np.int64) * n_codes + codes
+    n_keys = int(key.max()) + 1
+    if n_keys <= _DENSE_LIMIT or n_keys <= 4 * len(key):
+        # 키 공간이 작으면 정렬 없이 bincount 한 번으로 끝난다
+        total = np.bincount(key, weights=counts, minlength=n_keys)
+        key = np.flatnonzero(total)
+        total = total[key]
+    else:
+        key, inverse = np.unique(key, return_inverse=True)
+        total = np.bincount(inverse.ravel(), weights=counts, minlength=len(key))
+    return key // n_codes, key % n_codes, np.rint(total).astype(np.int64)
+
+
+def encode_runs(
+    groups: np.ndarray,
+    values: np.ndarray,
+    resolution: Optional[float] = DEFAULT_RESOLUTION,
+    exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+) -> tuple:
+    """
+    행 단위 (그룹 번호, 값)에서 그룹별 요약을 만든다. NaN 값은 제외.
+    반환: (table, run_group, run_code, run_count)
+      table은 정렬된 고유 값 표이고 run의 값은 table의 위치(code)로 나타낸다.
+      run은 그룹, 값 순으로 정렬되어 있다.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    ok = ~np.isnan(values)
+    groups, values = groups[ok], values[ok]
+    if resolution and len(values):
+        # 표본이 많은 그룹만 눈금으로 반올림해 압축한다
+        sizes = np.bincount(groups)
+        values = np.where(sizes[groups] > exact_threshold, quantize(values, resolution), values)
+    table, codes = np.unique(values, return_inverse=True)
+    runs = _run_length(groups, codes.ravel(), np.ones(len(values), dtype=np.int64), len(table))
+    return (table,) + runs
+
+
+def merge_runs(table: np.ndarray, run_group: np.ndarray, run_code: np.ndarray, run_count: np.ndarray, group_map: np.ndarray) -> tuple:
+    """
+    하위 그룹 요약을 상위 그룹으로 합친다 (값 표는 그대로 공유).
+    group_map[하위 그룹] = 상위 그룹 번호 (-1이면 버림)
+    """
+    parent = np.asarray(group_map, dtype=np.int64)[run_group]
+    keep = parent >= 0
+    return (table,) + _run_length(parent[keep], run_code[keep], run_count[keep], len(table))
+
+
+def runs_quantiles(
+    table: np.ndarray,
+    run_group: np.ndarray,
+    run_code: np.ndarray,
+    run_count: np.ndarray,
+    n_groups: int,
+    qs: Iterable[float] = QUARTILES,
+) -> np.ndarray:
+    """그룹별 분위수 표 (n_groups × len(qs)). 값이 없는 그룹은 NaN"""
+    qs = np.asarray(list(qs), dtype=np.float64)
+    out = np.full((n_groups, len(qs)), np.nan)
+    if len(run_count) == 0:
+        return out
+    n = np.bincount(run_group, weights=run_count, minlength=n_groups).astype(np.int64)
+    cum = np.cumsum(run_count)
+    # 그룹 g의 누적 개수는 before[g]에서 시작한다 (run은 그룹 순으로 정렬되어 있음)
+    before = np.concatenate(([0], np.cumsum(n)[:-1]))
+    present = np.flatnonzero(n > 0)
+    pos = qs[None, :] * (n[present, None] - 1)
+    lo, hi = np.floor(pos), np.ceil(pos)
+    base = before[present, None]
+    v_lo = table[run_code[np.searchsorted(cum, base + lo, side="right")]]
+    v_hi = table[run_code[np.searchsorted(cum, base + hi, side="right")]]
+    out[present] = v_lo + (v_hi - v_lo) * (pos - lo)
+    return out
+
+
+class GradeSketch:
+    """
+    한 그룹의 합치기 가능한 분위수 요약
+
+    Parameters
+    ----------
+    resolution : float, optional     # 압축 눈금 (None이면 압축 없이 항상 정확)
+    exact_threshold : int, optional  # 표본이 이 수 이하인 동안은 원래 값을 보관 (0이면 항상 압축)
+    """
+
+    def __init__(
+        self,
+        resolution: Optional[float] = DEFAULT_RESOLUTION,
+        exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+    ):
+        self.resolution = resolution
+        self.exact_threshold = exact_threshold
+        self.values = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.exact = True
+
+    @classmethod
+    def from_values(cls, values, **kwargs) -> "GradeSketch":
+        sketch = cls(**kwargs)
+        sketch.add(values)
+        return sketch
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, values) -> "GradeSketch":
+        """값 추가 (NaN은 무시)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self._absorb(values, np.ones(len(values), dtype=np.int64), exact=True)
+        return self
+
+    def merge(self, other: "GradeSketch") -> "GradeSketch":
+        """다른 요약을 합친다 (같은 resolution끼리만)"""
+        if other.resolution != self.resolution:
+            raise ValueError(f"resolution이 다른 요약은 합칠 수 없습니다: {self.resolution} != {other.resolution}")
+        self._absorb(other.values, other.counts, exact=other.exact)
+        return self
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles((q,))[0])
+
+    def quantiles(self, qs: Iterable[float] = QUARTILES) -> np.ndarray:
+        zeros = np.zeros(len(self.values), dtype=np.int64)
+        codes = np.arange(len(self.values))
+        return runs_quantiles(self.values, zeros, codes, self.counts, 1, qs)[0]
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _absorb(self, values: np.ndarray, counts: np.ndarray, exact: bool) -> None:
+        values = np.concatenate((self.values, values))
+        counts = np.concatenate((self.counts, counts))
+        self.exact = self.exact and exact
+        total = int(counts.sum())
+        if self.resolution and (not self.exact or total > self.exact_threshold):
+            values = quantize(values, self.resolution)
+            self.exact = False
+        table, codes = np.unique(values, return_inverse=True)
+        _, codes, self.counts = _run_length(np.zeros(len(values), dtype=np.int64), codes.ravel(), counts, len(table))
+        self.values = table[codes]
@@ -0,0 +1,75 @@
+# report_assets.py
+# ---------------------------------------------------------------------
+# 보고서 공용 자산(plotly.js, report.css, report.js …)을 출력 폴더의 assets/에 한 번만 쓴다
+#   - 보고서는 상대 경로 + 내용 해시(assets/report.js?v=…)로 참조 → 브라우저가 캐시하고, 내용이 바뀌면 새로 받는다
+#   - plotly.js는 저장소에 든 고정 버전 사본(vendor/plotly-{버전}.min.js)을 쓴다 (네트워크 불필요)
+#     사본이 없으면 CDN으로 대신하지 않고 오류를 낸다
+#   - 내용이 같은 파일은 다시 쓰지 않는다 (일괄 생성에서 보고서마다 호출해도 됨)
+#   - 여러 프로세스가 같은 자산을 동시에 써도 깨지지 않도록 프로세스별 임시 파일 → rename
+# ---------------------------------------------------------------------
+import os
+from functools import lru_cache
+from pathlib import Path
+from fragment_cache import digest
+
+ASSETS_DIR_NAME = "assets"
+PLOTLY_JS_VERSION = "2.35.2"
+PLOTLY_CDN_URL = f"https://cdn.plot.ly/plotly-{PLOTLY_JS_VERSION}.min.js"  # inline 레이아웃도 같은 고정 버전
+PLOTLY_JS_PATH = Path(__file__).resolve().parent / "vendor" / f"plotly-{PLOTLY_JS_VERSION}.min.js"
+
+# 이 프로세스가 확인한 자산 파일 → 내용 해시 (같은 파일을 매번 다시 읽어 비교하지 않기 위함)
+_verified: dict = {}
+
+
+@lru_cache(maxsize=1)
+def plotly_js() -> str:
+    """저장소에 든 고정 버전 plotly.min.js 소스. 파일이 없으면 FileNotFoundError"""
+    if not PLOTLY_JS_PATH.exists():
+        raise FileNotFoundError(f"고정 버전 plotly.js 사본이 없습니다: {PLOTLY_JS_PATH}")
+    return PLOTLY_JS_PATH.read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=16)
+def _content_digest(text: str) -> str:
+    return digest(text)
+
+
+def _write_if_changed(path: Path, text: str, text_digest: str) -> None:
+    if _verified.get(path) == text_digest and path.exists():
+        return
+    data = text.encode("utf-8")
+    try:
+        unchanged = path.stat().st_size == len(data) and path.read_bytes() == data
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+    _verified[path] = text_digest
+
+
+def write_assets(out_dir: Path, files: dict, page_dir: Path = None) -> dict:
+    """
+    files(파일 이름 → 내용)와 plotly.js를 out_dir/assets/에 쓰고,
+    이름 → 보고서에서 쓸 참조 경로(page_dir 기준 상대 경로 + ?v=내용 해시)를 반환한다.
+    plotly.js의 참조는 "plotly" 키에 있다.
+    """
+    assets_dir = Path(out_dir) / ASSETS_DIR_NAME
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    prefix = Path(os.path.relpath(assets_dir, page_dir or out_dir)).as_posix()
+
+    plotly_name = PLOTLY_JS_PATH.name
+    files = {**files, plotly_name: plotly_js()}
+
+    hrefs = {}
+    for name, text in files.items():
+        text_digest = _content_digest(text)
+        _write_if_changed(assets_dir / name, text, text_digest)
+        hrefs[name] = f"{prefix}/{name}?v={text_digest[:12]}"
+    hrefs["plotly"] = hrefs[plotly_name]
+    return hrefs
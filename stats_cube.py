@@ -0,0 +1,301 @@
+# stats_cube.py
+# ---------------------------------------------------------------------
+# 지역×대학×전형유형×세부유형×모집단위×결과 조합별 집계 큐브
+#   - 데이터 로드 후 한 번 만들고 데이터 캐시 옆에 .npz로 저장한다.
+#   - 셀마다 더할 수 있는 값(행 수, 등급 수, 합, 제곱합, 최솟값, 최댓값)과
+#     합치기 가능한 등급 분위수 요약(quantile_sketch.py)을 보관한다.
+#   - 어떤 필터 조합이든 원본 행을 보지 않고 셀을 합쳐서 통계를 낸다.
+#     (작은 셀은 원래 값을, 큰 셀은 0.01 눈금 값을 보관하므로
+#      등급이 소수 둘째 자리까지인 데이터라면 분위수도 원본과 같다)
+# ---------------------------------------------------------------------
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data_processor import GRADE_COLUMNS, grade_series
+from quantile_sketch import (
+    DEFAULT_EXACT_THRESHOLD,
+    DEFAULT_RESOLUTION,
+    QUARTILES,
+    encode_runs,
+    merge_runs,
+    runs_quantiles,
+)
+from stats_engine import ALL_PASS, BUCKETS, RESULT_BUCKETS, additional_from_entry, basic_from_entry
+from stats_kernel import segment_ids
+
+CUBE_VERSION = 2
+DIMENSIONS = ("region", "univ", "apptype", "subtype", "dept", "result")
+
+
+class StatsCube:
+    """
+    필터 조합별 통계를 원본 행 없이 계산하는 집계 큐브
+
+    Parameters
+    ----------
+    df : pandas.DataFrame        # encode_dataset을 거친 전체 데이터
+    resolution : float, optional     # 분위수 요약의 압축 눈금
+    exact_threshold : int, optional  # 등급 수가 이 수 이하인 셀은 원래 값을 보관
+    """
+
+    def __init__(
+        self,
+        df: Optional[pd.DataFrame] = None,
+        resolution: float = DEFAULT_RESOLUTION,
+        exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+    ):
+        self.resolution = resolution
+        self.exact_threshold = exact_threshold
+        self.scale = int(round(1 / resolution))
+        self.categories = {}
+        self.cell_codes = {}
+        self.rows = np.empty(0, dtype=np.int64)
+        self.grades = {}
+        if df is not None:
+            self._build(df)
+
+    # ───────────────────────── 생성 / 저장 ──────────────────────────
+    def _build(self, df: pd.DataFrame) -> None:
+        codes, sizes = [], []
+        for dim in DIMENSIONS:
+            col = df[dim]
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype("category")
+            self.categories[dim] = col.cat.categories
+            codes.append(col.cat.codes.to_numpy().astype(np.int64) + 1)  # 0 = 결측
+            sizes.append(len(col.cat.categories) + 1)
+
+        # 차원 코드를 혼합 진법으로 묶어 셀 번호를 만든다
+        key = np.zeros(len(df), dtype=np.int64)
+        for c, size in zip(codes, sizes):
+            key = key * size + c
+        cell_keys, cell = np.unique(key, return_inverse=True)
+        cell = cell.ravel()
+        n_cells = len(cell_keys)
+        for dim, size in zip(reversed(DIMENSIONS), reversed(sizes)):
+            self.cell_codes[dim] = (cell_keys % size - 1).astype(np.int32)
+            cell_keys = cell_keys // size
+        self.rows = np.bincount(cell, minlength=n_cells)
+
+        for g in GRADE_COLUMNS:
+            values = grade_series(df[g]).to_numpy(np.float64)
+            ok = ~np.isnan(values)
+            c, x = cell[ok], values[ok]
+
+            stats = {
+                "count": np.bincount(c, minlength=n_cells),
+                "sum": np.bincount(c, weights=x, minlength=n_cells),
+                "sumsq": np.bincount(c, weights=x * x, minlength=n_cells),
+                "min": np.full(n_cells, np.inf),
+                "max": np.full(n_cells, -np.inf),
+            }
+            np.minimum.at(stats["min"], c, x)
+            np.maximum.at(stats["max"], c, x)
+
+            # 셀별 분위수 요약 (값은 공유 값 표의 위치로 저장)
+            table, run_cell, run_code, run_count = encode_runs(c, x, self.resolution, self.exact_threshold)
+            stats.update(table=table, run_cell=run_cell, run_code=run_code, run_count=run_count)
+            # 등급이 모두 눈금 위에 있으면 평균/표준편차도 정수 합으로 정확히 계산할 수 있다
+            stats["on_grid"] = np.array(bool(np.all(np.abs(x * self.scale - np.rint(x * self.scale)) < 1e-6)))
+            self.grades[g] = stats
+
+    def save(self, path: Path) -> None:
+        """큐브를 .npz 파일로 저장"""
+        arrays = {
+            "version": np.array(CUBE_VERSION),
+            "resolution": np.array(self.resolution),
+            "exact_threshold": np.array(self.exact_threshold),
+            "rows": self.rows,
+        }
+        for dim in DIMENSIONS:
+            arrays[f"cat_{dim}"] = np.asarray(self.categories[dim], dtype=str)
+            arrays[f"cell_{dim}"] = self.cell_codes[dim]
+        for g, stats in self.grades.items():
+            for name, arr in stats.items():
+                arrays[f"{g}__{name}"] = arr
+        tmp = Path(path).with_name(Path(path).name + ".tmp.npz")
+        np.savez_compressed(tmp, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["StatsCube"]:
+        """저장된 큐브를 읽는다. 버전이 다르면 None"""
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["version"]) != CUBE_VERSION:
+                return None
+            cube = cls(resolution=float(z["resolution"]), exact_threshold=int(z["exact_threshold"]))
+            cube.rows = z["rows"]
+            for dim in DIMENSIONS:
+                cube.categories[dim] = pd.Index(z[f"cat_{dim}"].tolist())
+                cube.cell_codes[dim] = z[f"cell_{dim}"]
+            for g in GRADE_COLUMNS:
+                cube.grades[g] = {
+                    name.split("__", 1)[1]: z[name] for name in z.files if name.startswith(f"{g}__")
+                }
+        return cube
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def cell_mask(self, selections: dict) -> np.ndarray:
+        """선택(열 → 값 목록)을 만족하는 셀 마스크. 비어 있는 선택은 전체로 본다"""
+        mask = np.ones(len(self.rows), dtype=bool)
+        for dim, values in selections.items():
+            if not values or dim not in self.categories:
+                continue
+            wanted = self.categories[dim].get_indexer(list(values))
+            mask &= np.isin(self.cell_codes[dim], wanted[wanted >= 0])
+        return mask
+
+    def entry(self, selections: dict) -> dict:
+        """GroupStats 표 항목과 같은 구조의 집계 결과"""
+        return self.table(selections, ())[()]
+
+    def table(self, selections: dict, keys) -> dict:
+        """
+        선택을 만족하는 셀을 keys 수준 구간별로 합친 표 (GroupStats.table과 같은 구조).
+        보고서 한 번에 수준마다 한 번만 부르고 구간 항목은 표에서 조회한다.
+        """
+        keys = list(keys)
+        cells = np.flatnonzero(self.cell_mask(selections))
+        sizes = [len(self.categories[k]) for k in keys]
+        key_codes = [self.cell_codes[k][cells] for k in keys]
+
+        # 셀 결과 → 결과 구간 번호 (합격/충원합격 셀은 '합격(전체)' 구간에 한 번 더 넣는다)
+        result_index = self.categories["result"]
+        lookup = np.full(len(result_index) + 1, -1, dtype=np.int64)  # 마지막 칸 = 결측(-1)
+        for b, code in enumerate(result_index.get_indexer(list(RESULT_BUCKETS))):
+            if code >= 0:
+                lookup[code] = b
+        cell_bucket = lookup[self.cell_codes["result"][cells]]
+        passed = np.flatnonzero(np.isin(cell_bucket, [RESULT_BUCKETS.index(r) for r in ("합격", "충원합격")]))
+        long_pos = np.concatenate([np.arange(len(cells)), passed])
+        long_bucket = np.concatenate([cell_bucket, np.full(len(passed), BUCKETS.index(ALL_PASS))])
+
+        segment, seg_keys = segment_ids(
+            [c[long_pos] for c in key_codes] + [long_bucket], sizes + [len(BUCKETS)]
+        )
+        n_segments = seg_keys.shape[1]
+        ok = segment >= 0
+        seg, long_cells = segment[ok], cells[long_pos[ok]]
+        rows = np.bincount(seg, weights=self.rows[long_cells], minlength=n_segments).astype(np.int64)
+
+        # 큐브 셀 요약을 구간으로 합치는 대응표 (복제된 합격 셀은 셀 번호 + 셀 수 자리를 쓴다)
+        n_cells = len(self.rows)
+        group_map = np.full(2 * n_cells, -1, dtype=np.int64)
+        copied = np.arange(len(long_pos))[ok] >= len(cells)
+        group_map[long_cells + n_cells * copied] = seg
+        grades = {g: self._grade_table(stats, seg, long_cells, group_map, n_segments) for g, stats in self.grades.items()}
+
+        labels = [np.asarray(self.categories[k], dtype=object) for k in keys]
+        if keys:
+            total_segment, total_keys = segment_ids(key_codes, sizes)
+            valid = total_segment >= 0
+            totals = np.bincount(total_segment[valid], weights=self.rows[cells][valid], minlength=total_keys.shape[1])
+            table = {
+                tuple(lab[c] for lab, c in zip(labels, total_keys[:, i])): {"total": int(n), "buckets": {}}
+                for i, n in enumerate(totals)
+            }
+        else:
+            table = {(): {"total": int(self.rows[cells].sum()), "buckets": {}}}
+
+        for i in range(n_segments):
+            key = tuple(lab[c] for lab, c in zip(labels, seg_keys[:-1, i]))
+            bucket = {"rows": int(rows[i])}
+            for g, columns in grades.items():
+                bucket[g] = columns[i]
+            table[key]["buckets"][BUCKETS[seg_keys[-1, i]]] = bucket
+        return table
+
+    def basic(self, selections: dict, grade_column: str) -> dict:
+        """compute_stats와 같은 형식의 요약 통계"""
+        return basic_from_entry(self.entry(selections), grade_column)
+
+    def additional(self, selections: dict, grade_column: str) -> dict:
+        """compute_additional_stats와 같은 형식의 결과별 상세 통계"""
+        return additional_from_entry(self.entry(selections), grade_column)
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _grade_table(self, stats: dict, seg: np.ndarray, cells: np.ndarray, group_map: np.ndarray, n_segments: int) -> list:
+        """구간별 등급 통계 목록. seg[i]는 cells[i] 셀이 더해질 구간"""
+        count = np.bincount(seg, weights=stats["count"][cells], minlength=n_segments).astype(np.int64)
+        low = np.full(n_segments, np.inf)
+        high = np.full(n_segments, -np.inf)
+        np.minimum.at(low, seg, stats["min"][cells])
+        np.maximum.at(high, seg, stats["max"][cells])
+
+        # 셀 요약을 구간으로 합친다 (합격(전체) 구간용으로 run을 한 벌 더 붙여 한 번에 합친다)
+        run_cell = stats["run_cell"]
+        runs = merge_runs(
+            stats["table"],
+            np.concatenate([run_cell, run_cell + len(self.rows)]),
+            np.tile(stats["run_code"], 2),
+            np.tile(stats["run_count"], 2),
+            group_map,
+        )
+        # pandas quantile(선형 보간)과 같은 방식으로 분위수를 읽는다
+        quartiles = runs_quantiles(*runs, n_segments, QUARTILES)
+        if stats["on_grid"]:
+            # 정수 눈금 합은 더하는 순서와 무관하게 정확하다 (원본 평균의 반올림 경계까지 일치)
+            bins = np.rint(runs[0][runs[2]] * self.scale)
+            s1 = np.bincount(runs[1], weights=bins * runs[3], minlength=n_segments).astype(np.int64)
+            s2 = np.bincount(runs[1], weights=bins * bins * runs[3], minlength=n_segments).astype(np.int64)
+        else:
+            total = np.bincount(seg, weights=stats["sum"][cells], minlength=n_segments)
+            total_sq = np.bincount(seg, weights=stats["sumsq"][cells], minlength=n_segments)
+
+        out = []
+        for i in range(n_segments):
+            n = int(count[i])
+            if n == 0:
+                out.append({"count": 0})
+                continue
+            if stats["on_grid"]:
+                a, b = int(s1[i]), int(s2[i])
+                mean = a / (n * self.scale)
+                var = (b * n - a * a) / (n * (n - 1) * self.scale ** 2) if n > 1 else np.nan
+            else:
+                mean = total[i] / n
+                var = (total_sq[i] - total[i] * mean) / (n - 1) if n > 1 else np.nan
+            q1, median, q3 = quartiles[i]
+            out.append({
+                "count": n,
+                "mean": mean,
+                "std": float(np.sqrt(max(var, 0.0))) if n > 1 else np.nan,
+                "min": low[i],
+                "max": high[i],
+                "q1": q1, "median": median, "q3": q3,
+            })
+        return out
+
+def cube_path(cache_dir: Path, dataset_key: str) -> Path:
+    """데이터 캐시 디렉터리 안의 큐브 파일 경로"""
+    return Path(cache_dir) / f"cube_{dataset_key}.npz"
+
+
+def get_or_build_cube(df: pd.DataFrame, paths: list, cache=None) -> StatsCube:
+    """
+    데이터 캐시 옆에 저장된 큐브가 있으면 읽고, 없으면 만들어 저장한다.
+    cache가 None이거나 비활성이면 저장하지 않고 만들기만 한다.
+    """
+    if cache is None or not cache.enabled:
+        return StatsCube(df)
+    path = cube_path(cache.cache_dir, cache.dataset_key(paths))
+    if path.exists():
+        try:
+            cube = StatsCube.load(path)
+            if cube is not None:
+                os.utime(path)  # LRU 순서 갱신
+                return cube
+        except Exception as e:
+            print(f"경고: 통계 큐브를 읽지 못해 다시 만듭니다 ({e})")
+    cube = StatsCube(df)
+    try:
+        cache.cache_dir.mkdir(parents=True, exist_ok=True)
+        cube.save(path)
+        cache.evict()
+    except Exception as e:
+        print(f"경고: 통계 큐브 저장 실패 ({e})")
+    return cube
@@ -0,0 +1,233 @@
+# stats_engine.py
+# ---------------------------------------------------------------------
+# plot_selected_depts용 그룹 통계 엔진
+#   - 보고서에 필요한 모든 수준(대학×전형유형, 대학×세부유형, 대학×모집단위×세부유형, 전체)을
+#     수준마다 한 번의 groupby로 계산해 키 → 통계 표로 보관한다.
+#   - basic()은 compute_stats, additional()은 compute_additional_stats와 같은 형식의 dict를 돌려준다.
+#   - quantiles="sketch"면 분위수를 가장 세밀한 그룹(leaf)의 요약에서 만들고
+#     상위 수준은 leaf 요약을 합쳐서 구한다 (quantile_sketch.py 참고).
+# ---------------------------------------------------------------------
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data_processor import GRADE_COLUMNS, grade_series, result_codes
+from quantile_sketch import (
+    DEFAULT_EXACT_THRESHOLD,
+    DEFAULT_RESOLUTION,
+    QUARTILES,
+    encode_runs,
+    merge_runs,
+    runs_quantiles,
+)
+from stats_kernel import describe_groups, segment_ids, value_ranks
+
+# 결과 구분: 세 가지 결과 + 합격(충원 포함) 합집합
+RESULT_BUCKETS = ("합격", "충원합격", "불합격")
+ALL_PASS = "합격(전체)"
+BUCKETS = RESULT_BUCKETS + (ALL_PASS,)
+
+# 보고서 수준 이름 → 그룹 키
+DEFAULT_LEVELS = {
+    "apptype": ("univ", "apptype"),
+    "subtype": ("univ", "subtype"),
+    "dept_subtype": ("univ", "dept", "subtype"),
+    "overall": (),
+}
+
+
+class GroupStats:
+    """
+    수준별 그룹 통계 표
+
+    Parameters
+    ----------
+    df : pandas.DataFrame           # 보고서 대상(필터 적용 후) 데이터
+    levels : dict, optional         # 수준 이름 → 그룹 키 튜플
+    grade_columns : list, optional  # 통계를 낼 등급 열
+    quantiles : str, optional       # "exact"(그룹별 정렬) 또는 "sketch"(leaf 요약 병합)
+    resolution : float, optional    # sketch 모드의 압축 눈금
+    exact_threshold : int, optional # sketch 모드에서 이 수 이하인 leaf는 압축하지 않음
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        levels: Optional[dict] = None,
+        grade_columns=GRADE_COLUMNS,
+        quantiles: str = "exact",
+        resolution: Optional[float] = DEFAULT_RESOLUTION,
+        exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+    ):
+        if quantiles not in ("exact", "sketch"):
+            raise ValueError(f"quantiles는 'exact' 또는 'sketch'여야 합니다: {quantiles}")
+        self.levels = dict(levels or DEFAULT_LEVELS)
+        self.grade_columns = list(grade_columns)
+        self.quantiles = quantiles
+
+        key_columns = sorted({k for keys in self.levels.values() for k in keys})
+        self._n_rows = len(df)
+        bucket = result_codes(df, RESULT_BUCKETS).astype(np.int64)
+
+        # 키 열은 범주 코드로만 다룬다 (결측은 -1 → 해당 수준의 그룹에서 빠짐)
+        self._categories = {}
+        self._labels = {}
+        codes = {}
+        for k in key_columns:
+            col = df[k]
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype("category")
+            self._categories[k] = col.cat.categories
+            self._labels[k] = np.asarray(col.cat.categories, dtype=object)
+            codes[k] = col.cat.codes.to_numpy().astype(np.int64)
+
+        # 합격/충원합격 행을 ALL_PASS 구간으로 한 번 더 넣어 합집합 통계도 같은 커널 호출로 얻는다
+        rows = np.concatenate((np.flatnonzero(bucket >= 0), np.flatnonzero((bucket >= 0) & (bucket <= 1))))
+        self._long_bucket = bucket[rows]
+        self._long_bucket[np.count_nonzero(bucket >= 0):] = len(RESULT_BUCKETS)
+        self._long_codes = {k: c[rows] for k, c in codes.items()}
+        self._long_grades = {g: grade_series(df[g]).to_numpy(np.float64)[rows] for g in self.grade_columns}
+        # 등급 순위 표는 한 번만 만들고 모든 수준의 커널 호출에서 재사용한다
+        self._long_ranks = {g: value_ranks(v) for g, v in self._long_grades.items()}
+        self._codes = codes
+
+        if quantiles == "sketch":
+            # 모든 키 조합 × 결과 구간을 leaf로 삼아 등급 요약을 한 번만 만든다
+            leaf_ids, self._leaf_keys = self._segments(key_columns, long=True)
+            self._leaf_columns = key_columns
+            self._leaf_runs = {
+                g: encode_runs(leaf_ids[leaf_ids >= 0], self._long_grades[g][leaf_ids >= 0], resolution, exact_threshold)
+                for g in self.grade_columns
+            }
+
+        self._tables = {name: self._summarize(list(keys)) for name, keys in self.levels.items()}
+
+    # ───────────────────────── 공개 메서드 ──────────────────────────
+    def table(self, level: str) -> dict:
+        """수준의 키 → {'total': 행 수, 'buckets': {결과: {'rows': 행 수, 등급열: 통계}}} 표"""
+        return self._tables[level]
+
+    def basic(self, level: str, key: tuple, grade_column: str) -> dict:
+        """compute_stats와 같은 형식의 요약 통계"""
+        return basic_from_entry(self._tables[level].get(tuple(key)), grade_column)
+
+    def additional(self, level: str, key: tuple, grade_column: str) -> dict:
+        """compute_additional_stats와 같은 형식의 결과별 상세 통계"""
+        return additional_from_entry(self._tables[level].get(tuple(key)), grade_column)
+
+    # ──────────────────────── 내부 유틸 ───────────────────────────
+    def _segments(self, keys: list, long: bool) -> tuple:
+        """keys(+ 결과 구간) 조합별 구간 번호와 구간별 코드. long=False면 원래 행 기준 (구간 없음)"""
+        if long:
+            arrays = [self._long_codes[k] for k in keys] + [self._long_bucket]
+            sizes = [len(self._categories[k]) for k in keys] + [len(BUCKETS)]
+        else:
+            arrays = [self._codes[k] for k in keys]
+            sizes = [len(self._categories[k]) for k in keys]
+        return segment_ids(arrays, sizes)
+
+    def _summarize(self, keys: list) -> dict:
+        segment, seg_keys = self._segments(keys, long=True)
+        n_segments = seg_keys.shape[1]
+        rows = np.bincount(segment[segment >= 0], minlength=n_segments)
+        if self.quantiles == "sketch":
+            quartiles = self._sketch_quartiles(keys, seg_keys)
+        described = {}
+        for g in self.grade_columns:
+            described[g] = describe_groups(segment, self._long_grades[g], n_segments, QUARTILES, self._long_ranks[g])
+            if self.quantiles == "sketch":
+                described[g]["quantiles"] = quartiles[g]
+
+        if keys:
+            total_segment, total_keys = self._segments(keys, long=False)
+            totals = np.bincount(total_segment[total_segment >= 0], minlength=total_keys.shape[1])
+            table = {key: {"total": int(n), "buckets": {}} for key, n in zip(self._decode(keys, total_keys), totals)}
+        else:
+            table = {(): {"total": self._n_rows, "buckets": {}}}
+
+        for i, key in enumerate(self._decode(keys, seg_keys[:-1])):
+            bucket = BUCKETS[seg_keys[-1, i]]
+            entry = {"rows": int(rows[i])}
+            for g in self.grade_columns:
+                d = described[g]
+                q1, median, q3 = d["quantiles"][i]
+                entry[g] = {
+                    "count": int(d["count"][i]),
+                    "mean": d["mean"][i], "std": d["std"][i], "min": d["min"][i],
+                    "q1": q1, "median": median, "q3": q3, "max": d["max"][i],
+                }
+            table[key]["buckets"][bucket] = entry
+        return table
+
+    def _decode(self, keys: list, codes: np.ndarray) -> list:
+        """구간별 코드 (len(keys) × 구간 수) → 키 튜플 목록"""
+        if not keys:
+            return [()] * codes.shape[1]
+        return list(zip(*(self._labels[k][c].tolist() for k, c in zip(keys, codes))))
+
+    def _sketch_quartiles(self, keys: list, seg_keys: np.ndarray) -> dict:
+        """leaf 요약을 keys 수준 구간으로 합쳐 등급열별 분위수 표를 만든다"""
+        # leaf의 코드에서 수준 구간 번호를 찾아 leaf → 구간 대응표를 만든다
+        positions = [self._leaf_columns.index(k) for k in keys] + [len(self._leaf_columns)]
+        sizes = [len(self._categories[k]) for k in keys] + [len(BUCKETS)]
+        leaf_key = np.zeros(self._leaf_keys.shape[1], dtype=np.int64)
+        seg_key = np.zeros(seg_keys.shape[1], dtype=np.int64)
+        for j, (pos, size) in enumerate(zip(positions, sizes)):
+            leaf_key = leaf_key * size + self._leaf_keys[pos]
+            seg_key = seg_key * size + seg_keys[j]
+        group_map = np.searchsorted(seg_key, leaf_key)  # seg_key는 오름차순
+        return {
+            g: runs_quantiles(*merge_runs(*self._leaf_runs[g], group_map), seg_keys.shape[1], QUARTILES)
+            for g in self.grade_columns
+        }
+
+
+def basic_from_entry(entry: Optional[dict], grade_column: str) -> dict:
+    """통계 표 항목 하나를 compute_stats 형식의 dict로 변환"""
+    if entry is None or entry["total"] == 0:
+        return {"total_count": 0}
+    total = entry["total"]
+    buckets = entry["buckets"]
+    stats = {"total_count": total}
+
+    for bucket, prefix in ((ALL_PASS, "all_pass"), ("합격", "pass"), ("충원합격", "waitlist")):
+        b = buckets.get(bucket)
+        if b is None or b["rows"] == 0:
+            continue
+        stats[f"{prefix}_count"] = b["rows"]
+        stats[f"{prefix}_rate"] = f"{b['rows']/total*100:.1f}%"
+        g = b[grade_column]
+        if g["count"] > 0:
+            stats[f"{prefix}_min"] = g["min"]
+            stats[f"{prefix}_max"] = g["max"]
+            stats[f"{prefix}_mean"] = g["mean"]
+    if buckets.get("불합격", {}).get("rows", 0) > 0:
+        stats["fail_count"] = buckets["불합격"]["rows"]
+    return stats
+
+
+def additional_from_entry(entry: Optional[dict], grade_column: str) -> dict:
+    """통계 표 항목 하나를 compute_additional_stats 형식의 dict로 변환"""
+    if entry is None or entry["total"] == 0:
+        return {}
+    stats = {}
+    for result in RESULT_BUCKETS:
+        b = entry["buckets"].get(result)
+        g = None if b is None else b[grade_column]
+        if g is None or g["count"] == 0:
+            stats[result] = {"count": 0}
+            continue
+        std = g["std"] if g["count"] > 1 else "N/A"
+        stats[result] = {
+            "count": g["count"],
+            "mean": g["mean"],
+            "std": std,
+            "cv": (std / g["mean"]) * 100 if g["count"] > 1 and g["mean"] != 0 else 0,
+            "median": g["median"],
+            "max": g["max"],
+            "min": g["min"],
+            "q1": g["q1"],
+            "q3": g["q3"],
+        }
+    return stats
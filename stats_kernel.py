@@ -0,0 +1,156 @@
+# stats_kernel.py
+# ---------------------------------------------------------------------
+# 그룹별 기술통계 커널 (NumPy, 정렬 한 번)
+#   - (구간 번호, 등급) 순으로 한 번 정렬하면 구간마다 값이 연속된 오름차순 블록이 된다.
+#     같은 값으로 여러 번 부를 때는 value_ranks로 순위 표를 한 번 만들어 넘기면
+#     "구간 × 값 개수 + 순위" 정수 키 하나만 정렬한다.
+#   - 개수/합은 bincount, 편차 제곱합은 np.add.reduceat, 최솟값/최댓값은 블록의 처음/끝,
+#     중앙값/사분위수는 블록 안의 위치로 바로 읽는다 (pandas quantile과 같은 선형 보간).
+#   - 구간 번호는 보통 "그룹 코드 × 결과 코드"를 묶은 정수이다 (segment_ids 참고).
+#   - compute_stats / compute_additional_stats / GroupStats가 이 커널을 쓴다.
+# ---------------------------------------------------------------------
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+QUARTILES = (0.25, 0.5, 0.75)
+_DENSE_LIMIT = 1 << 22  # bincount로 번호를 매길 키 공간 상한
+
+
+def segment_ids(code_arrays: Sequence[np.ndarray], sizes: Sequence[int]) -> tuple:
+    """
+    여러 코드 배열(0 ≤ code < size, 결측은 -1)을 혼합 진법으로 묶어 구간 번호를 매긴다.
+    반환: (segment, keys)
+      segment: 행별 구간 번호 (결측 코드가 하나라도 있으면 -1)
+      keys: 구간별 원래 코드 (len(code_arrays) × 구간 수)
+    """
+    n = len(code_arrays[0]) if len(code_arrays) else 0
+    key = np.zeros(n, dtype=np.int64)
+    valid = np.ones(n, dtype=bool)
+    for codes, size in zip(code_arrays, sizes):
+        codes = np.asarray(codes, dtype=np.int64)
+        valid &= codes >= 0
+        key = key * size + codes
+    segment = np.full(n, -1, dtype=np.int64)
+    n_keys = int(np.prod(sizes, dtype=np.float64)) if len(sizes) else 1
+    if n_keys <= max(_DENSE_LIMIT, 4 * n):
+        # 키 공간이 작으면 정렬 없이 등장한 키에 순서대로 번호를 매긴다
+        seen = np.bincount(key[valid], minlength=n_keys) > 0
+        uniq = np.flatnonzero(seen)
+        lookup = np.cumsum(seen) - 1
+        segment[valid] = lookup[key[valid]]
+    else:
+        uniq, inverse = np.unique(key[valid], return_inverse=True)
+        segment[valid] = inverse.ravel()
+
+    keys = np.empty((len(code_arrays), len(uniq)), dtype=np.int64)
+    rest = uniq
+    for i in range(len(code_arrays) - 1, -1, -1):
+        keys[i] = rest % sizes[i]
+        rest = rest // sizes[i]
+    return segment, keys
+
+
+def value_ranks(values: np.ndarray) -> tuple:
+    """값 → (정렬된 고유 값 표, 행별 순위). NaN의 순위는 -1"""
+    values = np.asarray(values, dtype=np.float64)
+    ok = ~np.isnan(values)
+    table, inverse = np.unique(values[ok], return_inverse=True)
+    ranks = np.full(len(values), -1, dtype=np.int64)
+    ranks[ok] = inverse.ravel()
+    return table, ranks
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """numpy.quantile(linear)과 같은 보간식 (t ≥ 0.5이면 b 쪽에서 계산해 반올림 오차를 맞춘다)"""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def describe_groups(
+    segment: np.ndarray,
+    values: np.ndarray,
+    n_segments: int,
+    qs: Iterable[float] = QUARTILES,
+    ranks: Optional[tuple] = None,
+) -> dict:
+    """
+    구간별 count / sum / mean / std(ddof=1) / min / max / 분위수 계산
+
+    segment : 행별 구간 번호 (음수는 제외)
+    values  : 행별 값 (NaN은 제외)
+    ranks   : value_ranks(values) 결과 (같은 값으로 여러 번 호출할 때 넘기면 재계산하지 않음)
+    반환: 이름 → 길이 n_segments 배열 ('quantiles'는 n_segments × len(qs)).
+          값이 없는 구간은 count 0, 나머지 NaN. 값이 1개인 구간의 std는 NaN.
+    """
+    qs = np.asarray(list(qs), dtype=np.float64)
+    segment = np.asarray(segment, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    ok = (segment >= 0) & ~np.isnan(values)
+    seg = segment[ok]
+    count = np.bincount(seg, minlength=n_segments)
+    # 합은 정렬 전 원래 행 순서대로 더한다
+    total = np.bincount(seg, weights=values[ok], minlength=n_segments)
+
+    x = None  # 분위수가 필요 없으면 정렬하지 않는다
+    if len(qs):
+        if ranks is None and n_segments > np.iinfo(np.uint16).max:
+            ranks = value_ranks(values)
+        if ranks is not None:
+            # 순위 표가 있으면 "구간 × 값 개수 + 순위" 정수 키 하나만 정렬하면 된다
+            table, rank = ranks
+            key = np.sort(seg * len(table) + rank[ok])
+            x = table[key % len(table)] if len(table) else np.empty(0)
+        else:
+            # 값으로 한 번 정렬한 뒤 구간 코드로 안정 정렬 (16비트 이하 정수는 기수 정렬이라 선형 시간)
+            x = values[ok]
+            order = np.argsort(x)
+            x, seg_by_value = x[order], seg[order].astype(np.uint16)
+            x = x[np.argsort(seg_by_value, kind="stable")]
+
+    out = {
+        "count": count,
+        "sum": np.zeros(n_segments),
+        "mean": np.full(n_segments, np.nan),
+        "std": np.full(n_segments, np.nan),
+        "min": np.full(n_segments, np.nan),
+        "max": np.full(n_segments, np.nan),
+        "quantiles": np.full((n_segments, len(qs)), np.nan),
+    }
+    present = np.flatnonzero(count)
+    if len(present) == 0:
+        return out
+    n = count[present]
+    sums = total[present]
+    mean = sums / n
+    out["sum"][present] = sums
+    out["mean"][present] = mean
+
+    if x is None:
+        # 정렬 없이 구간별 최솟값/최댓값과 편차 제곱합을 구한다
+        v = values[ok]
+        lo_val = np.full(n_segments, np.inf)
+        hi_val = np.full(n_segments, -np.inf)
+        np.minimum.at(lo_val, seg, v)
+        np.maximum.at(hi_val, seg, v)
+        dev = v - out["mean"][seg]
+        ss = np.bincount(seg, weights=dev * dev, minlength=n_segments)[present]
+        out["min"][present] = lo_val[present]
+        out["max"][present] = hi_val[present]
+    else:
+        starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+        # 편차 제곱합은 평균을 뺀 뒤 더해 (두 번 읽기) 큰 값에서도 정밀도를 지킨다
+        dev = x - np.repeat(mean, n)
+        ss = np.add.reduceat(dev * dev, starts)
+        out["min"][present] = x[starts]
+        out["max"][present] = x[starts + n - 1]
+
+        pos = qs[None, :] * (n[:, None] - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        base = starts[:, None]
+        out["quantiles"][present] = _lerp(x[base + lo], x[base + hi], pos - lo)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["std"][present] = np.where(n > 1, np.sqrt(ss / (n - 1)), np.nan)
+    return out
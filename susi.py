@@ -0,0 +1,319 @@
+# susi.py
+# ---------------------------------------------------------------------
+# 명령행 일괄 보고서 생성 (GUI 없이)
+#   python -m susi batch 입력.xlsx [입력2.xlsx | 폴더 ...] --per univ
+#   python -m susi batch 입력.xlsx --spec jobs.csv      (또는 jobs.yaml, PyYAML 필요)
+#
+#   - 데이터는 한 번만 읽고, 통계 큐브도 한 번만 만들어 모든 작업이 같이 조회한다
+#     (--exact면 큐브 없이 작업마다 원본 행으로 정확히 계산)
+#   - 작업은 프로세스 풀에서 병렬로 만들고, 작업자마다 데이터/큐브를 한 번만 넘겨받는다
+#   - 대학별 섹션 조각은 조각 캐시를 같이 써서, 데이터가 일부만 바뀌면 바뀐 대학만 다시 렌더링한다
+#   - 출력 폴더의 batch_manifest.json에 작업별 지문(데이터 키 + 필터 + 보고서 버전)을 남겨
+#     지문이 같고 파일이 있으면 건너뛴다 (중간에 멈춰도 끝난 작업은 다시 만들지 않음)
+#   - --layout assets면 plotly.js/report.css/report.js를 출력 폴더의 assets/에 한 번만 쓰고 모든 보고서가 공유한다
+#     (sharded면 여기에 더해 보고서마다 대학 섹션을 {보고서}_shards/의 대학별 조각 파일로 나눈다)
+#   - 끝나면 작업별 상태/시간/크기 요약을 출력한다
+#
+# 작업 명세 (CSV / YAML 공통 키): region, univ, apptype, subtype, dept, output
+#   - CSV는 한 행이 작업 하나, 값이 여러 개면 ';'로 구분 (빈 칸 = 필터 없음)
+#   - YAML은 작업 dict의 리스트 (값은 문자열 또는 리스트)
+#   - output이 없으면 필터 값으로 파일명을 만든다
+# ---------------------------------------------------------------------
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from data_cache import get_default_cache
+from data_processor import expand_input_paths, read_inputs
+from fragment_cache import get_default_fragment_cache
+from html_generator import REPORT_LAYOUTS, REPORT_VERSION, plot_selected_depts, report_asset_files, report_shard_dir
+from report_assets import write_assets
+from stats_cube import get_or_build_cube
+from utils import sanitize, write_atomic
+
+FILTER_KEYS = ("region", "univ", "apptype", "subtype", "dept")
+PER_COLUMNS = {"univ": "univ", "dept": "dept", "subtype": "subtype", "apptype": "apptype", "region": "region"}
+MANIFEST_NAME = "batch_manifest.json"
+
+# 작업 프로세스 전역 (풀 초기화 때 한 번만 채운다)
+_WORKER_DF: Optional[pd.DataFrame] = None
+_WORKER_CUBE = None
+_WORKER_FRAGMENTS = None
+
+
+# ───────────────────────── 작업 목록 ──────────────────────────
+def _normalize_job(raw: dict) -> dict:
+    """명세 한 줄 → {필터 키: 값 리스트, 'output': 파일명}"""
+    job = {}
+    for key in FILTER_KEYS:
+        value = raw.get(key)
+        if value is None or value == "":
+            continue
+        values = value if isinstance(value, (list, tuple)) else str(value).split(";")
+        values = [str(v).strip() for v in values if str(v).strip()]
+        if values:
+            job[key] = values
+    name = str(raw.get("output") or "").strip()
+    if not name:
+        name = "_".join("+".join(job[k]) for k in FILTER_KEYS if k in job) or "전체"
+    if not name.lower().endswith(".html"):
+        name += ".html"
+    job["output"] = sanitize(name)
+    return job
+
+
+def jobs_per(df: pd.DataFrame, column: str) -> list[dict]:
+    """column 값마다 보고서 하나 (예: 대학별, 모집단위별)"""
+    values = sorted(df[column].dropna().unique())
+    return [_normalize_job({column: [value], "output": str(value)}) for value in values]
+
+
+def load_spec(path: Path) -> list[dict]:
+    """CSV/YAML 작업 명세 읽기"""
+    path = Path(path)
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("YAML 명세를 읽으려면 PyYAML이 필요합니다 (pip install pyyaml)") from e
+        with open(path, encoding="utf-8") as f:
+            rows = yaml.safe_load(f) or []
+        if isinstance(rows, dict):
+            rows = rows.get("jobs", [])
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+    jobs = [_normalize_job(row) for row in rows]
+    outputs = [job["output"] for job in jobs]
+    duplicates = sorted({o for o in outputs if outputs.count(o) > 1})
+    if duplicates:
+        raise ValueError(f"같은 출력 파일을 쓰는 작업이 있습니다: {', '.join(duplicates)}")
+    return jobs
+
+
+# ───────────────────────── 매니페스트 ──────────────────────────
+def job_fingerprint(job: dict, dataset_key: str, exact: bool = False, layout: str = "inline") -> str:
+    """데이터 키 + 필터 + 보고서 버전 + 계산 방식 + 레이아웃 지문"""
+    filters = {k: job[k] for k in FILTER_KEYS if k in job}
+    raw = json.dumps([dataset_key, filters, REPORT_VERSION, exact, layout], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def load_manifest(out_dir: Path) -> dict:
+    path = Path(out_dir) / MANIFEST_NAME
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"경고: 매니페스트를 읽지 못해 모든 작업을 다시 만듭니다 ({e})")
+        return {}
+
+
+def save_manifest(out_dir: Path, manifest: dict) -> None:
+    text = json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True)
+    write_atomic(Path(out_dir) / MANIFEST_NAME, [text])
+
+
+# ───────────────────────── 작업 실행 ──────────────────────────
+def _init_worker(df: pd.DataFrame, stats_cube, fragment_cache=None) -> None:
+    global _WORKER_DF, _WORKER_CUBE, _WORKER_FRAGMENTS
+    _WORKER_DF, _WORKER_CUBE, _WORKER_FRAGMENTS = df, stats_cube, fragment_cache
+
+
+def _shard_files(path: Path) -> list:
+    """분할 보고서의 대학 조각 파일 이름 목록 (생성 직후에는 이번에 쓴 조각만 남아 있다)"""
+    shard_dir = report_shard_dir(path)
+    return sorted(f.name for f in shard_dir.glob("*.js")) if shard_dir.is_dir() else []
+
+
+def _outputs_exist(path: Path, entry: dict, layout: str) -> bool:
+    """매니페스트에 기록된 출력이 모두 있는지 (분할 보고서는 색인 페이지와 기록된 대학 조각 파일까지)"""
+    if not path.exists():
+        return False
+    if layout != "sharded":
+        return True
+    shards = entry.get("shards")
+    return shards is not None and all((report_shard_dir(path) / name).exists() for name in shards)
+
+
+def _run_job(job: dict, out_dir: Path, exact: bool, layout: str = "inline") -> dict:
+    """작업 하나 실행 → {'status', 'seconds', 'bytes', 'message'}"""
+    start = time.perf_counter()
+    try:
+        message = plot_selected_depts(
+            _WORKER_DF,
+            Path(out_dir),
+            selected_depts=job.get("dept"),
+            selected_univs=job.get("univ"),
+            selected_subtypes=job.get("subtype"),
+            selected_apptypes=job.get("apptype"),
+            selected_regions=job.get("region"),
+            output_file=job["output"],
+            stats_cube=_WORKER_CUBE,
+            exact_stats=exact,
+            max_workers=1,
+            fragment_cache=_WORKER_FRAGMENTS,
+            report_layout=layout,
+        )
+    except Exception as e:
+        message = f"보고서 생성 오류: {e}"
+    path = Path(out_dir) / job["output"]
+    ok = message.endswith("파일이 생성되었습니다.")
+    return {
+        "status": "생성" if ok else "실패",
+        "seconds": time.perf_counter() - start,
+        "bytes": path.stat().st_size if ok else 0,
+        "message": message,
+    }
+
+
+def run_batch(
+    df: pd.DataFrame,
+    jobs: list[dict],
+    out_dir: Path,
+    dataset_key: str,
+    stats_cube=None,
+    exact: bool = False,
+    force: bool = False,
+    max_workers: Optional[int] = None,
+    fragment_cache=None,
+    layout: str = "inline",
+) -> list[dict]:
+    """
+    작업 목록을 실행하고 작업별 결과(job, status, seconds, bytes, message)를 명세 순서대로 반환
+    지문이 매니페스트와 같고 출력 파일이 있으면 건너뛴다 (force=True면 모두 다시 생성)
+    (sharded는 기록된 대학 조각 파일도 모두 있어야 건너뛴다)
+    fragment_cache: 대학별 섹션 조각 캐시 (작업자 프로세스들이 같은 디렉터리를 공유)
+    layout: "inline"(보고서마다 단일 파일), "assets"(out_dir/assets/ 공유), "sharded"(assets + 대학별 조각 파일)
+    """
+    if layout not in REPORT_LAYOUTS:
+        raise ValueError(f"layout은 {REPORT_LAYOUTS} 중 하나여야 합니다: {layout!r}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if layout in ("assets", "sharded"):
+        # 건너뛰는 보고서도 참조하므로 작업 전에 한 번 써 둔다 (작업자들은 내용이 같으면 다시 쓰지 않음)
+        write_assets(out_dir, report_asset_files())
+    manifest = load_manifest(out_dir)
+    results = [None] * len(jobs)
+    todo = []
+    for i, job in enumerate(jobs):
+        fingerprint = job_fingerprint(job, dataset_key, exact, layout)
+        path = out_dir / job["output"]
+        entry = manifest.get(job["output"], {})
+        if not force and entry.get("fingerprint") == fingerprint and _outputs_exist(path, entry, layout):
+            results[i] = {"job": job, "status": "건너뜀", "seconds": 0.0, "bytes": path.stat().st_size, "message": ""}
+        else:
+            todo.append((i, fingerprint))
+
+    def finish(i: int, fingerprint: str, result: dict) -> None:
+        results[i] = {"job": jobs[i], **result}
+        if result["status"] == "생성":
+            manifest[jobs[i]["output"]] = {"fingerprint": fingerprint, "bytes": result["bytes"]}
+            if layout == "sharded":
+                manifest[jobs[i]["output"]]["shards"] = _shard_files(out_dir / jobs[i]["output"])
+            save_manifest(out_dir, manifest)  # 작업마다 저장해 중간에 멈춰도 이어서 할 수 있게
+
+    stats_cube = None if exact else stats_cube
+    workers = max_workers or min(len(todo), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(df, stats_cube, fragment_cache)
+        for i, fingerprint in todo:
+            finish(i, fingerprint, _run_job(jobs[i], out_dir, exact, layout))
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df, stats_cube, fragment_cache)) as ex:
+            futures = {ex.submit(_run_job, jobs[i], out_dir, exact, layout): (i, fp) for i, fp in todo}
+            for fut in as_completed(futures):
+                finish(*futures[fut], fut.result())
+    return results
+
+
+def format_summary(results: list[dict], elapsed: float) -> str:
+    """작업별 상태/시간/크기 표와 합계"""
+    lines = [f"{'상태':<4} {'시간(초)':>8} {'크기(KB)':>10}  출력"]
+    for r in results:
+        lines.append(f"{r['status']:<4} {r['seconds']:>8.2f} {r['bytes'] / 1024:>10.1f}  {r['job']['output']}")
+        if r["status"] == "실패":
+            lines.append(f"      └ {r['message']}")
+    counts = {s: sum(r["status"] == s for r in results) for s in ("생성", "건너뜀", "실패")}
+    total_bytes = sum(r["bytes"] for r in results)
+    lines.append(
+        f"합계: 작업 {len(results)}개 (생성 {counts['생성']}, 건너뜀 {counts['건너뜀']}, 실패 {counts['실패']}),"
+        f" {total_bytes / 1024 / 1024:.1f}MB, {elapsed:.1f}초"
+    )
+    return "\n".join(lines)
+
+
+# ───────────────────────── 명령행 ──────────────────────────
+def _batch(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    paths = expand_input_paths(args.inputs)
+    print(f"데이터 로드 중... ({len(paths)}개 파일)")
+    df = read_inputs(paths, use_cache=not args.no_cache)
+
+    if args.spec:
+        jobs = load_spec(args.spec)
+    else:
+        jobs = jobs_per(df, PER_COLUMNS[args.per])
+    if not jobs:
+        print("만들 보고서가 없습니다.")
+        return 0
+
+    # 데이터 키는 파일 내용 해시라 캐시를 쓰지 않아도 매니페스트 지문에 쓴다
+    cache = get_default_cache()
+    dataset_key = cache.dataset_key(paths)
+    stats_cube = None
+    if not args.exact:
+        print("통계 큐브 준비 중...")
+        stats_cube = get_or_build_cube(df, paths, cache if not args.no_cache else None)
+
+    print(f"보고서 {len(jobs)}개 생성 중...")
+    results = run_batch(
+        df, jobs, Path(args.out), dataset_key,
+        stats_cube=stats_cube, exact=args.exact, force=args.force, max_workers=args.workers,
+        fragment_cache=None if args.no_cache else get_default_fragment_cache(), layout=args.layout,
+    )
+    print(format_summary(results, time.perf_counter() - started))
+    return 1 if any(r["status"] == "실패" for r in results) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m susi", description="입시 결과 보고서 명령행 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="여러 보고서를 한 번에 생성")
+    batch.add_argument("inputs", nargs="+", help="입력 엑셀 파일 또는 폴더")
+    target = batch.add_mutually_exclusive_group()
+    target.add_argument("--per", choices=sorted(PER_COLUMNS), default="univ", help="값마다 보고서 하나 (기본: univ)")
+    target.add_argument("--spec", type=Path, help="작업 명세 파일 (.csv / .yaml)")
+    batch.add_argument("--out", default="output_htmls", help="출력 폴더 (기본: output_htmls)")
+    batch.add_argument("--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    batch.add_argument(
+        "--layout", choices=REPORT_LAYOUTS, default="inline",
+        help="inline: 보고서마다 단일 파일 (기본) / assets: plotly.js·CSS·JS를 출력 폴더의 assets/에 공유"
+             " / sharded: assets + 대학 섹션을 대학별 조각 파일로 나눠 연 대학만 불러옴",
+    )
+    batch.add_argument("--exact", action="store_true", help="통계 큐브 없이 원본 행으로 정확히 계산")
+    batch.add_argument("--force", action="store_true", help="최신 보고서도 모두 다시 생성")
+    batch.add_argument("--no-cache", action="store_true", help="데이터 캐시와 섹션 조각 캐시를 쓰지 않음")
+    batch.set_defaults(func=_batch)
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from data_cache import DataCache, get_default_cache
+
+# 1. 샘플 데이터 (정제 후 형식: 범주형 열 + float32 등급)
+data = {
+    'univ': ['대학A', '대학B', '대학A', '대학C'],
+    'dept': ['학과X', '학과Y', '학과Y', None],
+    'result': ['합격', '불합격', '충원합격', '합격'],
+    'conv_grade': [1.5, 2.25, np.nan, 3.1],
+}
+sample_df = pd.DataFrame(data)
+for col in ('univ', 'dept', 'result'):
+    sample_df[col] = sample_df[col].astype('category')
+sample_df['conv_grade'] = sample_df['conv_grade'].astype(np.float32)
+USECOLS = "A:C"
+
+failures = []
+
+
+def write_source(path: Path, text: str, mtime_ns: int = None) -> Path:
+    """캐시 키를 만들 원본 파일 (내용/수정시각을 바꿔 가며 사용)"""
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def entries(cache: DataCache) -> list:
+    return sorted(p.name for p in cache.cache_dir.glob(f"*{cache.suffix}"))
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    cache = DataCache(cache_dir=tmp / "cache")
+    source = write_source(tmp / "a.xlsx", "first", 1_000_000_000_000_000_000)
+
+    # 2. 저장 → 읽기: 값과 dtype(범주형, float32)이 그대로여야 한다
+    print("\n--- Round Trip Check ---")
+    if cache.load(source, USECOLS) is not None:
+        failures.append("Round Trip Check: empty cache should miss")
+    cache.store(source, USECOLS, sample_df)
+    loaded = cache.load(source, USECOLS)
+    if loaded is None:
+        failures.append("Round Trip Check: stored frame should load")
+    else:
+        try:
+            pd.testing.assert_frame_equal(loaded, sample_df)
+        except AssertionError as e:
+            failures.append(f"Round Trip Check: loaded frame differs: {e}")
+    if cache.load(source, "A:D") is not None:
+        failures.append("Round Trip Check: a different usecols spec should miss")
+
+    # 3. 내용 / 수정시각 / 캐시 버전이 바뀌면 적중하지 않는다
+    print("\n--- Invalidation Check ---")
+    write_source(source, "second", 1_000_000_000_000_000_000)
+    if cache.load(source, USECOLS) is not None:
+        failures.append("Invalidation Check: changed content should miss")
+    write_source(source, "first", 1_000_000_000_000_000_000)
+    if cache.load(source, USECOLS) is None:
+        failures.append("Invalidation Check: restored content and mtime should hit again")
+    write_source(source, "first", 1_100_000_000_000_000_000)
+    if cache.load(source, USECOLS) is not None:
+        failures.append("Invalidation Check: changed mtime should miss")
+    cache.store(source, USECOLS, sample_df)
+    original_version = data_cache.CACHE_VERSION
+    data_cache.CACHE_VERSION = original_version + 1
+    try:
+        if cache.load(source, USECOLS) is not None:
+            failures.append("Invalidation Check: a CACHE_VERSION bump should miss")
+    finally:
+        data_cache.CACHE_VERSION = original_version
+
+    # 4. 같은 원본의 새 항목을 저장하면 이전 항목은 지워진다 (다른 원본의 항목은 유지)
+    print("\n--- Invalidate Check ---")
+    other = write_source(tmp / "b.xlsx", "other")
+    cache.store(other, USECOLS, sample_df)
+    write_source(source, "third")
+    cache.store(source, USECOLS, sample_df)
+    if len(entries(cache)) != 2:
+        failures.append(f"Invalidate Check: expected one entry per source, found {entries(cache)}")
+    if cache.invalidate(source) != 1 or cache.load(other, USECOLS) is None:
+        failures.append("Invalidate Check: invalidate should drop only the entries of its source")
+
+    # 5. 용량 상한을 넘으면 가장 오래 사용되지 않은 항목부터 지운다
+    print("\n--- Evict Check ---")
+    cache.clear()
+    sources = [write_source(tmp / f"e{i}.xlsx", f"evict {i}") for i in range(3)]
+    paths = [cache.store(p, USECOLS, sample_df) for p in sources]
+    for i, entry in enumerate(paths):
+        os.utime(entry, (1_000 + i, 1_000 + i))  # e0이 가장 오래됨
+    cache.load(sources[0], USECOLS)  # 읽으면 가장 최근 사용으로 갱신
+    cache.max_bytes = sum(p.stat().st_size for p in paths) - 1
+    removed = cache.evict()
+    if removed != 1 or paths[1].exists() or not (paths[0].exists() and paths[2].exists()):
+        failures.append(f"Evict Check: expected only the least recently used entry removed, got {entries(cache)}")
+
+    # 6. SUSI_CACHE=0이면 기본 캐시는 비활성 (읽기/저장 모두 무시)
+    print("\n--- Disabled Cache Check ---")
+    saved_env, saved_default = os.environ.get("SUSI_CACHE"), data_cache._default_cache
+    os.environ["SUSI_CACHE"] = "0"
+    data_cache._default_cache = None
+    try:
+        disabled = get_default_cache()
+        disabled.cache_dir = tmp / "disabled"
+        if disabled.enabled or disabled.store(source, USECOLS, sample_df) is not None or disabled.load(source, USECOLS) is not None:
+            failures.append("Disabled Cache Check: SUSI_CACHE=0 should disable the default cache")
+        if disabled.cache_dir.exists():
+            failures.append("Disabled Cache Check: a disabled cache should not create its directory")
+    finally:
+        if saved_env is None:
+            os.environ.pop("SUSI_CACHE", None)
+        else:
+            os.environ["SUSI_CACHE"] = saved_env
+        data_cache._default_cache = saved_default
+
+# 7. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for the data cache.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
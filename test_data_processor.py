@@ -0,0 +1,160 @@
+import re
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from data_processor import (
+    COLUMNS,
+    USECOL_INDEXES,
+    _read_excel,
+    concat_datasets,
+    encode_dataset,
+    expand_input_paths,
+    infer_year,
+    read_inputs,
+    read_xlsx_streaming,
+)
+
+# 1. 샘플 워크북 행 (헤더 2행 뒤에 데이터: 결측/'-'/숫자 문자열 등급, 공백이 붙은 결과, 짧은 행 포함)
+rows = [
+    ('서울', '대학A', '수시', '전형1', '학과X', ' 합격 ', 1.5, '2.5'),
+    (None, '대학A', '수시', '전형1', '학과X', '불합격', '-', 3.25),
+    ('경기', '대학B', '정시', '전형2', '학과Y', '충원합격', '4', None),
+    ('경기', '대학B', '정시', '전형2', '학과Y', None, 2.0, 2.0),        # 결과 없음 → 제외
+    ('강원', '대학C', '수시', '전형1', '학과Z', '합격', None, '-'),      # 등급 없음 → 제외
+    ('강원', '대학C', '수시', None, '학과Z', '불합격', 5.5, 5.0),       # 세부유형 없음 → 제외
+    ('서울', '대학C', '수시', '전형3', '학과Z', '합격\t', ' 1.75 ', 1.9),
+    ('서울', '대학A', '정시', '전형3', '학과X', 1, 6.0, 6.5),           # 숫자 결과는 문자열로
+    ('부산', '대학D', '수시', '전형1', '학과W', '충원합격', 7, '7.25'),
+    ('부산', '대학D', '수시', '전형1', '학과W', '합격', 8.0, 8.5),
+]
+SHORT_ROWS = 2  # 필요한 열까지 닿지 않는 짧은 행 (모두 제외)
+
+failures = []
+
+
+def write_workbook(path: Path, drop_dimension: bool = False) -> Path:
+    """rows를 USECOLS 위치에 넣은 워크북. drop_dimension이면 시트 크기 정보를 지워 행 수를 모르게 한다"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['제목'] * 34)
+    ws.append(['열 이름'] * 34)
+    for row in rows:
+        line = [None] * (USECOL_INDEXES[-1] + 1)
+        for index, value in zip(USECOL_INDEXES, row):
+            line[index] = value
+        ws.append(line)
+    for _ in range(SHORT_ROWS):
+        ws.append(['짧은 행'] * 7)
+    wb.save(path)
+    if drop_dimension:
+        with zipfile.ZipFile(path) as z:
+            parts = {name: z.read(name) for name in z.namelist()}
+        sheet = parts['xl/worksheets/sheet1.xml'].decode('utf-8')
+        parts['xl/worksheets/sheet1.xml'] = re.sub(r'<dimension ref="[^"]*"\s*/>', '', sheet).encode('utf-8')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+            for name, data in parts.items():
+                z.writestr(name, data)
+    return path
+
+
+# 2. 스트리밍 파서와 pandas read_excel 파서 비교 (청크 크기 < 행 수 → 청크마다 정리/배열 확장 경로 실행)
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    n_rows = len(rows) + SHORT_ROWS
+    for name, drop_dimension in (('known', False), ('unknown', True)):
+        print(f"\n--- Streaming Reader Check ({name} row count) ---")
+        path = write_workbook(tmp / f'{name}.xlsx', drop_dimension)
+        expected = _read_excel(path)
+        for chunk_size in (3, 4, 100):
+            calls = []
+            got = read_xlsx_streaming(path, progress=lambda done, total: calls.append((done, total)), chunk_size=chunk_size)
+            try:
+                pd.testing.assert_frame_equal(got, expected)
+            except AssertionError as e:
+                failures.append(f"Streaming Reader Check [{name}, chunk {chunk_size}]: frames differ: {e}")
+            total = None if drop_dimension else n_rows
+            expected_calls = [(done, total) for done in range(chunk_size, n_rows + 1, chunk_size)] + [(n_rows, n_rows)]
+            if calls != expected_calls:
+                failures.append(f"Streaming Reader Check [{name}, chunk {chunk_size}]: progress calls {calls} != {expected_calls}")
+        if list(expected['result']) != ['합격', '불합격', '충원합격', '합격', '1', '충원합격', '합격']:
+            failures.append(f"Streaming Reader Check [{name}]: unexpected results {list(expected['result'])}")
+        if not np.allclose(expected['all_subj_grade'].to_numpy(), [1.5, np.nan, 4, 1.75, 6, 7, 8], equal_nan=True):
+            failures.append(f"Streaming Reader Check [{name}]: unexpected grades {list(expected['all_subj_grade'])}")
+
+# 3. 여러 파일 합치기: 범주가 서로 다른(겹치거나 겹치지 않는) 프레임의 코드를 합집합 범주로 재매핑
+print("\n--- Concat Check ---")
+first = pd.DataFrame({
+    'univ': ['대학B', '대학A', None, '대학B'],
+    'dept': ['학과X', '학과Y', '학과Y', None],
+    'conv_grade': [1.5, 2.0, np.nan, 3.5],
+})
+second = pd.DataFrame({
+    'univ': ['대학C', '대학A', '대학D'],   # 대학A만 겹침, 대학C/D는 새 범주
+    'dept': ['학과Z', '학과W', '학과Z'],    # 겹치는 범주 없음
+    'conv_grade': [4.0, 5.25, 6.5],
+})
+third = pd.DataFrame({'univ': [None], 'dept': [None], 'conv_grade': [7.0]})  # 범주가 비어 있는 프레임
+raw_frames = [first, second, third]
+sources = [Path('입시결과_2024.xlsx'), Path('가_입시_2023.xlsx'), Path('기타.xlsx')]
+combined = concat_datasets([encode_dataset(f) for f in raw_frames], sources=sources)
+expected = pd.concat(raw_frames, ignore_index=True)
+for col in ('univ', 'dept'):
+    if not isinstance(combined[col].dtype, pd.CategoricalDtype):
+        failures.append(f"Concat Check: {col} should stay categorical, got {combined[col].dtype}")
+    elif list(combined[col].cat.categories) != sorted(expected[col].dropna().unique()):
+        failures.append(f"Concat Check: {col} categories should be the sorted union, got {list(combined[col].cat.categories)}")
+    if combined[col].astype(object).where(combined[col].notna(), None).tolist() != expected[col].astype(object).where(expected[col].notna(), None).tolist():
+        failures.append(f"Concat Check: decoded {col} values differ from pd.concat: {combined[col].tolist()}")
+if not np.allclose(combined['conv_grade'].to_numpy(np.float64), expected['conv_grade'].to_numpy(), equal_nan=True):
+    failures.append("Concat Check: grade values differ from pd.concat")
+file_of_row = [p.name for p, f in zip(sources, raw_frames) for _ in range(len(f))]
+if combined['source_file'].astype(object).tolist() != file_of_row:
+    failures.append(f"Concat Check: source_file tags differ: {combined['source_file'].tolist()}")
+if list(combined['source_file'].cat.categories) != sorted(p.name for p in sources):
+    failures.append(f"Concat Check: source_file categories should be sorted, got {list(combined['source_file'].cat.categories)}")
+if combined['year'].tolist() != [2024] * 4 + [2023] * 3 + [pd.NA] or str(combined['year'].dtype) != 'Int16':
+    failures.append(f"Concat Check: year tags differ: {combined['year'].tolist()} ({combined['year'].dtype})")
+if [infer_year(p) for p in ('2023.xlsx', '입시2024결과.xls', '120234.xlsx', '결과_1999.xlsx')] != [2023, 2024, None, None]:
+    failures.append("Concat Check: infer_year should read a standalone 20xx from the file name")
+
+# 4. 디렉터리 입력: 바로 아래의 엑셀 파일만 이름순으로 (엑셀 임시파일 ~$, 다른 확장자, 하위 폴더 제외)
+print("\n--- Input Paths Check ---")
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    (tmp / 'sub').mkdir()
+    for name in ('b_2024.xlsx', 'a_2023.xlsx', 'c.XLS', '~$a_2023.xlsx', 'notes.csv', 'sub/d.xlsx'):
+        (tmp / name).write_bytes(b'')
+    found = [p.name for p in expand_input_paths(tmp)]
+    if found != ['a_2023.xlsx', 'b_2024.xlsx', 'c.XLS']:
+        failures.append(f"Input Paths Check: unexpected directory expansion {found}")
+    mixed = [p.name for p in expand_input_paths([tmp / 'sub' / 'd.xlsx', str(tmp)])]
+    if mixed != ['d.xlsx', 'a_2023.xlsx', 'b_2024.xlsx', 'c.XLS']:
+        failures.append(f"Input Paths Check: files and directories should expand in order, got {mixed}")
+
+    # 실제 워크북 두 개를 디렉터리로 읽으면 파일별로 읽은 결과를 합친 것과 같아야 한다
+    books = tmp / 'books'
+    books.mkdir()
+    write_workbook(books / '입시_2024.xlsx')
+    write_workbook(books / '입시_2023.xlsx', drop_dimension=True)
+    df = read_inputs(books, use_cache=False, max_workers=1)
+    single = encode_dataset(_read_excel(books / '입시_2023.xlsx'))
+    if len(df) != 2 * len(single) or df['source_file'].astype(object).tolist() != ['입시_2023.xlsx'] * len(single) + ['입시_2024.xlsx'] * len(single):
+        failures.append(f"Input Paths Check: read_inputs should tag rows by file in name order, got {df['source_file'].tolist()}")
+    if df['year'].tolist() != [2023] * len(single) + [2024] * len(single):
+        failures.append(f"Input Paths Check: read_inputs year tags differ: {df['year'].tolist()}")
+    if df['univ'].astype(object).tolist() != single['univ'].astype(object).tolist() * 2:
+        failures.append("Input Paths Check: read_inputs univ values differ from reading each file")
+
+# 5. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for the input readers.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
@@ -0,0 +1,68 @@
+import pandas as pd
+import numpy as np
+from data_processor import encode_dataset
+from filter_index import FilterIndex
+
+# 1. 샘플 데이터 (지역 결측 1건 포함)
+data = {
+    'region': ['강원', '강원', '서울', '서울', None, '경기'],
+    'univ': ['대학A', '대학A', '대학B', '대학C', '대학B', '대학C'],
+    'apptype': ['수시', '수시', '정시', '수시', '정시', '정시'],
+    'subtype': ['전형1', '전형2', '전형2', '전형1', '전형2', '전형3'],
+    'dept': ['학과X', '학과Y', '학과Y', '학과X', '학과Z', '학과Z'],
+    'result': ['합격', '불합격', '합격', '충원합격', '불합격', '합격'],
+    'conv_grade': [1.5, 2.5, 3.1, 1.9, 4.0, 2.2],
+    'all_subj_grade': [1.6, 2.6, 3.0, 2.0, 4.1, 2.3],
+}
+sample_df = encode_dataset(pd.DataFrame(data))
+index = FilterIndex(sample_df)
+
+failures = []
+
+# 2. 단순 pandas 필터링과 후보 목록 비교
+def expected_candidates(selections):
+    out = {}
+    for col in index.columns:
+        mask = np.ones(len(sample_df), dtype=bool)
+        for other, values in selections.items():
+            if other != col and values:
+                mask &= sample_df[other].isin(values).to_numpy()
+        out[col] = set(sample_df[col][mask].dropna().unique()).union(selections.get(col) or [])
+    return out
+
+print("\n--- Candidate Check ---")
+cases = [
+    {},
+    {'region': ['강원']},
+    {'univ': ['대학B', '대학C'], 'apptype': ['정시']},
+    {'region': ['서울'], 'dept': ['학과Z']},
+    {'dept': ['학과X', '학과Y', '학과Z'], 'subtype': ['전형2']},
+    {'univ': ['없는대학']},
+]
+for sel in cases:
+    got = index.candidates(sel)
+    exp = expected_candidates(sel)
+    for col in index.columns:
+        if got[col] != exp[col]:
+            failures.append(f"Candidate Check {sel} [{col}]: expected {sorted(exp[col])}, got {sorted(got[col])}")
+    # 같은 선택을 다시 물어도 (캐시 경로) 결과가 같아야 한다
+    if index.candidates(sel) != got:
+        failures.append(f"Candidate Check {sel}: cached result differs")
+
+print("\n--- Row Id Check ---")
+if index.row_ids({}) is not None:
+    failures.append("Row Id Check: empty selection should return None")
+rows = index.row_ids({'univ': ['대학B'], 'apptype': ['정시']})
+if rows is None or rows.tolist() != [2, 4]:
+    failures.append(f"Row Id Check: expected [2, 4], got {rows}")
+if index.postings('dept', '학과Z').tolist() != [4, 5]:
+    failures.append(f"Row Id Check: postings('dept', '학과Z') = {index.postings('dept', '학과Z')}")
+
+# 3. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for filter index candidates and row ids.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
@@ -1,8 +1,17 @@
 import pandas as pd
 from pathlib import Path
-from html_generator import plot_selected_depts 
+from fragment_cache import FragmentCache
+from html_generator import create_plot_data_script, plot_selected_depts
+import html_generator
+import report_assets
+from report_assets import PLOTLY_CDN_URL, PLOTLY_JS_PATH, plotly_js
+import base64
 import json 
 import re 
+import shutil
+import subprocess
+import tempfile
+import numpy as np
 
 # 1. Create a sample Pandas DataFrame (New data as per subtask)
 data = {
@@ -50,99 +59,517 @@ if html_content == "HTML FILE NOT GENERATED":
 
 # 4. Verify the HTML content
 
-# Hovertemplate Check
-print("\n--- Hovertemplate Check ---")
-if not failures: 
-    script_tags = re.findall(r'<script>(.*?)</script>', html_content, re.DOTALL)
-    plot_data_script_matches = [
-        match for s in script_tags 
-        if (match := re.search(r'window\.plotsData\["(\d+)"\]\s*=\s*(\{.*?\});', s, re.DOTALL))
+def decode_array(value):
+    """encode_array의 base64 typed array({dtype, bdata})를 리스트로 (JSON 리스트는 그대로)"""
+    if not isinstance(value, dict):
+        return value
+    arr = np.frombuffer(base64.b64decode(value["bdata"]), dtype="<" + value["dtype"])
+    return np.round(arr.astype(np.float64), 6).tolist() if value["dtype"] == "f4" else arr.tolist()
+
+
+def load_report_payload(content):
+    """보고서에서 공유 데이터셋과 플롯별 행 번호를 꺼내 배열을 모두 푼 형태로 반환"""
+    dataset_match = re.search(r'window\.reportData\s*=\s*(\{.*?\});\s*</script>', content, re.DOTALL)
+    if not dataset_match:
+        return None, {}
+    dataset = json.loads(dataset_match.group(1))
+    for col in dataset["columns"].values():
+        col["codes"] = decode_array(col["codes"])
+    dataset["grades"] = {name: decode_array(v) for name, v in dataset["grades"].items()}
+    plots = {}
+    for match in re.finditer(r'<script type="application/json" id="plot-data-([\w-]+)">(.*?)</script>', content, re.DOTALL):
+        rows = json.loads(match.group(2))
+        plots[match.group(1)] = {
+            key: value if key == "mode" else [
+                {k: decode_array(v) for k, v in r.items()} if "count" in r else decode_array(r) for r in value
+            ]
+            for key, value in rows.items()
+        }
+    return dataset, plots
+
+
+# Shared Dataset Check: 필터링된 행은 window.reportData에 한 번만 싣고, 플롯은 행 번호로만 참조
+print("\n--- Shared Dataset Check ---")
+report_data = None
+plots_data = {}
+if not failures:
+    report_data, plots_data = load_report_payload(html_content)
+    if report_data is None:
+        failures.append("Shared Dataset Check: No 'window.reportData' block found.")
+    else:
+        if html_content.count("window.reportData =") != 1:
+            failures.append("Shared Dataset Check: reportData should be embedded exactly once.")
+        if "customdata: [[" in html_content:
+            failures.append("Shared Dataset Check: per-plot customdata arrays should no longer be embedded.")
+        if not plots_data:
+            failures.append("Shared Dataset Check: No 'plot-data-{id}' row-index islands found.")
+
+if report_data is not None:
+    # 공유 데이터셋은 대학별로 행을 모은(안정 정렬) 순서, 대학 플롯의 행 번호는 대학 시작 행(rowBase) 기준
+    dataset_df = sample_df.sort_values("univ", kind="stable").reset_index(drop=True)
+    if report_data.get("rowBase") != {"u1": 0, "u2": 4}:
+        failures.append(f"Shared Dataset Check: unexpected university row bases {report_data.get('rowBase')}")
+    columns = report_data["columns"]
+    n_rows = len(report_data["grades"]["conv"])
+    decoded = {
+        name: [col["labels"][code] for code in col["codes"]] for name, col in columns.items()
+    }
+    if n_rows != len(dataset_df) or decoded["univ"] != list(dataset_df["univ"]) or decoded["dept"] != list(dataset_df["dept"]):
+        failures.append(f"Shared Dataset Check: decoded columns do not match the filtered data: {decoded}")
+    if report_data["grades"]["all_subj"] != list(dataset_df["all_subj_grade"]):
+        failures.append(f"Shared Dataset Check: all_subj grades differ: {report_data['grades']['all_subj']}")
+    trace_names = [t["name"] for t in report_data["traces"]]
+    if trace_names != ["합격", "충원합격", "불합격"]:
+        failures.append(f"Shared Dataset Check: unexpected trace order {trace_names}")
+    for plot_id, rows in plots_data.items():
+        base = report_data.get("rowBase", {}).get(plot_id.split("-")[0], 0)
+        for key in ("conv", "allSubj"):
+            for result, result_rows in zip(trace_names, rows[key]):
+                wrong = [r for r in result_rows if dataset_df["result"].iloc[base + r] != result]
+                if wrong:
+                    failures.append(f"Shared Dataset Check (plot {plot_id}, {key}): rows {wrong} are not '{result}'.")
+    overall_rows = plots_data.get("overall", {}).get("allSubj", [])
+    if sorted(r for rows in overall_rows for r in rows) != list(range(len(sample_df))):
+        failures.append(f"Shared Dataset Check: overall plot should reference every row once: {overall_rows}")
+
+# Plot Id Check: 플롯 id는 대학별로 "u{대학 순번}-p{번호}", 전체 요약은 "overall"
+print("\n--- Plot Id Check ---")
+if report_data is not None:
+    expected_ids = ["u1-p1", "u1-p2", "u1-p3", "u2-p1", "u2-p2", "u2-p3", "overall"]
+    if list(plots_data) != expected_ids:
+        failures.append(f"Plot Id Check: Expected plot ids {expected_ids}, Got {list(plots_data)}.")
+    for plot_id in expected_ids:
+        if f'id="plot-{plot_id}"' not in html_content or f'id="all-subj-stats-{plot_id}"' not in html_content:
+            failures.append(f"Plot Id Check: containers for plot '{plot_id}' not found.")
+
+# Parallel Rendering Check: 작업 프로세스 수와 상관없이 같은 파일이 나와야 한다
+# 새로 렌더링할 대학이 PARALLEL_MIN_UNIVS개 이하이면 프로세스 풀을 띄우지 않는다
+print("\n--- Parallel Rendering Check ---")
+
+
+class _NoPool:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("process pool started")
+
+
+if report_data is not None:
+    parallel_filename = "test_report_parallel.html"
+    original_min, original_pool = html_generator.PARALLEL_MIN_UNIVS, html_generator.ProcessPoolExecutor
+    # 기본 기준(대학 2개 ≤ 기준): 풀 없이 / 0: 모두 풀에서 / 1: 첫 대학만 이 프로세스, 나머지는 풀에서
+    for min_univs, pool in ((original_min, _NoPool), (0, original_pool), (1, original_pool)):
+        html_generator.PARALLEL_MIN_UNIVS, html_generator.ProcessPoolExecutor = min_univs, pool
+        try:
+            plot_selected_depts(
+                sample_df,
+                output_dir,
+                selected_depts=['학과X', '학과Y'],
+                selected_univs=['대학A', '대학B'],
+                selected_subtypes=['전형1', '전형2'],
+                selected_apptypes=['수시', '정시'],
+                output_file=parallel_filename,
+                max_workers=2,
+            )
+        except AssertionError as e:
+            failures.append(f"Parallel Rendering Check: a small report should not start a process pool ({e}).")
+            continue
+        finally:
+            html_generator.PARALLEL_MIN_UNIVS, html_generator.ProcessPoolExecutor = original_min, original_pool
+        parallel_content = (output_dir / parallel_filename).read_text(encoding='utf-8')
+        (output_dir / parallel_filename).unlink()
+        if parallel_content != html_content:
+            failures.append(f"Parallel Rendering Check: max_workers=2 output (PARALLEL_MIN_UNIVS={min_univs}) differs from the default output.")
+
+# Fragment Cache Check: 두 번째 생성은 대학 조각을 모두 캐시에서 꺼내고, 결과 파일은 같아야 한다
+# 대학을 하나 빼면 남은 대학의 조각은 순번이 바뀌어도 재사용된다
+print("\n--- Fragment Cache Check ---")
+if report_data is not None:
+    cache_filename = "test_report_cached.html"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = FragmentCache(Path(cache_dir))
+        cached_contents = []
+        for univs in (['대학A', '대학B'], ['대학A', '대학B'], ['대학B']):
+            plot_selected_depts(
+                sample_df,
+                output_dir,
+                selected_depts=['학과X', '학과Y'],
+                selected_univs=univs,
+                selected_subtypes=['전형1', '전형2'],
+                selected_apptypes=['수시', '정시'],
+                output_file=cache_filename,
+                fragment_cache=cache,
+            )
+            cached_contents.append((output_dir / cache_filename).read_text(encoding='utf-8'))
+            (output_dir / cache_filename).unlink()
+        if (cache.hits, cache.misses) != (3, 2):
+            failures.append(f"Fragment Cache Check: Expected 3 hits / 2 misses, Got {cache.hits} / {cache.misses}.")
+        if cached_contents[0] != html_content or cached_contents[1] != html_content:
+            failures.append("Fragment Cache Check: cached output differs from the uncached output.")
+        if 'id="univ-1"' not in cached_contents[2] or 'id="plot-u1-p1"' not in cached_contents[2] or "{{univ_idx}}" in cached_contents[2]:
+            failures.append("Fragment Cache Check: a reused fragment was not renumbered for its new position.")
+        if len(list(Path(cache_dir).glob("*.html"))) != 2:
+            failures.append("Fragment Cache Check: expected one cached fragment per university.")
+        cache.max_bytes = 0
+        if cache.evict() != 2 or list(Path(cache_dir).glob("*.html")):
+            failures.append("Fragment Cache Check: LRU eviction should remove fragments over the size limit.")
+
+# Array Encoding Check: 기본(base64 typed array)과 JSON 호환 형식이 같은 데이터를 싣는지 확인
+print("\n--- Array Encoding Check ---")
+if report_data is not None:
+    if '"bdata"' not in html_content:
+        failures.append("Array Encoding Check: default report should embed base64 typed arrays.")
+    json_filename = "test_report_json.html"
+    plot_selected_depts(
+        sample_df,
+        output_dir,
+        selected_depts=['학과X', '학과Y'],
+        selected_univs=['대학A', '대학B'],
+        selected_subtypes=['전형1', '전형2'],
+        selected_apptypes=['수시', '정시'],
+        output_file=json_filename,
+        array_encoding="json",
+    )
+    json_content = (output_dir / json_filename).read_text(encoding='utf-8')
+    (output_dir / json_filename).unlink()
+    if '"bdata"' in json_content:
+        failures.append("Array Encoding Check: array_encoding='json' should not embed base64 arrays.")
+    if load_report_payload(json_content) != (report_data, plots_data):
+        failures.append("Array Encoding Check: JSON fallback payload differs from the binary payload.")
+    try:
+        plot_selected_depts(sample_df, output_dir, output_file=json_filename, array_encoding="text")
+        failures.append("Array Encoding Check: unknown array_encoding should raise ValueError.")
+    except ValueError:
+        pass
+
+# Table of Contents Check: 목차는 생성기가 미리 렌더링하고 대학 섹션은 처음부터 접혀 있다
+print("\n--- Table of Contents Check ---")
+if report_data is not None:
+    toc_match = re.search(r'<div id="toc-content">(.*?)</div>\n', html_content, re.DOTALL)
+    if not toc_match:
+        failures.append("Table of Contents Check: pre-rendered TOC not found.")
+    else:
+        targets = re.findall(r"scrollToElement\('([\w-]+)'\)", toc_match.group(1))
+        expected_targets = [
+            "univ-1", "apptype-summary-1", "summary-container-1", "dept-container-1-1",
+            "univ-2", "apptype-summary-2", "summary-container-2", "dept-container-2-1",
+            "overall-summary",
+        ]
+        if targets != expected_targets:
+            failures.append(f"Table of Contents Check: Expected targets {expected_targets}, Got {targets}")
+        missing = [t for t in targets if f'id="{t}"' not in html_content]
+        if missing:
+            failures.append(f"Table of Contents Check: TOC targets missing from the report: {missing}")
+    collapsed = re.findall(r'<div class="dept-container" id="univ-\d+" style="display: none;">', html_content)
+    if len(collapsed) != 2:
+        failures.append("Table of Contents Check: university sections should be rendered collapsed.")
+    if "tocHTML" in html_content or "querySelectorAll('.dept-container')" in html_content:
+        failures.append("Table of Contents Check: page script should not rebuild the TOC from the DOM.")
+
+# Lazy Plot Check: 산점도는 IntersectionObserver로 화면 근처에서만 만들고, 멀어지거나 상한을 넘으면 Plotly.purge로 해제
+print("\n--- Lazy Plot Check ---")
+if report_data is not None:
+    options_match = re.search(r'window\.reportOptions\s*=\s*(\{.*?\});', html_content)
+    if not options_match or json.loads(options_match.group(1)).get("maxLivePlots") != 40:
+        failures.append("Lazy Plot Check: reportOptions.maxLivePlots should default to 40.")
+    for snippet in ("new IntersectionObserver(", "Plotly.purge(plotDiv)", "enforceLivePlotCap()"):
+        if snippet not in html_content:
+            failures.append(f"Lazy Plot Check: page script is missing '{snippet}'.")
+    try:
+        plot_selected_depts(sample_df, output_dir, output_file="test_report_lazy.html", max_live_plots=0)
+        failures.append("Lazy Plot Check: max_live_plots=0 should raise ValueError.")
+    except ValueError:
+        pass
+
+# Scatter Mode Check: 점 수가 기준을 넘으면 scattergl, 더 많으면 0.1등급 구간 밀도(인원 + 주요 모집단위)
+print("\n--- Scatter Mode Check ---")
+if report_data is not None:
+    if any("mode" in rows for rows in plots_data.values()):
+        failures.append("Scatter Mode Check: small plots should stay plain SVG scatter plots.")
+    mode_filename = "test_report_modes.html"
+    plot_selected_depts(sample_df, output_dir, output_file=mode_filename, webgl_threshold=2, density_threshold=5)
+    mode_content = (output_dir / mode_filename).read_text(encoding='utf-8')
+    (output_dir / mode_filename).unlink()
+    _, mode_plots = load_report_payload(mode_content)
+    modes = {plot_id: rows.get("mode", "scatter") for plot_id, rows in mode_plots.items()}
+    expected_modes = {"u1-p1": "scattergl", "u1-p2": "scattergl", "u1-p3": "scattergl",
+                      "u2-p1": "scatter", "u2-p2": "scatter", "u2-p3": "scatter", "overall": "density"}
+    if modes != expected_modes:
+        failures.append(f"Scatter Mode Check: Expected {expected_modes}, Got {modes}")
+    density = mode_plots.get("overall", {}).get("allSubj", [])
+    expected_density = [
+        {"x": [1.45, 1.65], "count": [1, 1], "top": ["학과X 1명", "학과X 1명"]},   # 합격: 1.4, 1.6
+        {"x": [1.85, 2.05], "count": [1, 1], "top": ["학과X 1명", "학과X 1명"]},   # 충원합격: 1.8, 2.0
+        {"x": [2.65, 2.95], "count": [1, 1], "top": ["학과Y 1명", "학과Y 1명"]},   # 불합격: 2.6, 2.9
     ]
+    if density != expected_density:
+        failures.append(f"Scatter Mode Check: Expected density bins {expected_density}, Got {density}")
+    if "function buildDensityTraces" not in mode_content:
+        failures.append("Scatter Mode Check: page script is missing buildDensityTraces.")
 
-    if not plot_data_script_matches:
-        if not any('window.plotsData' in s for s in script_tags):
-            failures.append("Hovertemplate Check: No script tag found containing 'window.plotsData'.")
-        else:
-            if not (re.search(r"convTraces:\s*\[", html_content) or re.search(r"allSubjTraces:\s*\[", html_content)):
-                 print("Hovertemplate Check: Found 'window.plotsData' but no 'convTraces' or 'allSubjTraces', likely the main script block. Skipping detailed hovertemplate checks for this block.")
-            elif not any('window.plotsData["1"]' in s for s in script_tags): 
-                print("Hovertemplate Check: 'window.plotsData' found, and traces seem to exist, but specific plot ID format 'window.plotsData[\"id\"]' was not matched by regex. Will perform a general check.")
-                general_hovertemplate_errors = []
-                for i, s_content in enumerate(script_tags):
-                    if 'window.plotsData' not in s_content:
-                        continue
-
-                    conv_hovertemplates = re.findall(r"name:\s*'.*?',\s*marker:\s*\{.*?\},\s*hovertemplate:\s*'(환산등급:.*?extra>)'", s_content, re.DOTALL)
-                    for ht in conv_hovertemplates:
-                        if '모집단위' not in ht or '세부유형' not in ht:
-                            general_hovertemplate_errors.append(
-                                f"General Hovertemplate Check (convTraces, script index {i}): Missing expected fields in hovertemplate: '{ht}'.")
-
-                    all_subj_hovertemplates = re.findall(r"name:\s*'.*?',\s*marker:\s*\{.*?\},\s*hovertemplate:\s*'(전교과등급:.*?extra>)'", s_content, re.DOTALL)
-                    for ht in all_subj_hovertemplates:
-                        if '모집단위' not in ht or '세부유형' not in ht:
-                            general_hovertemplate_errors.append(
-                                f"General Hovertemplate Check (allSubjTraces, script index {i}): Missing expected fields in hovertemplate: '{ht}'.")
-                
-                if general_hovertemplate_errors:
-                    failures.extend(general_hovertemplate_errors)
-                else:
-                    print("General Hovertemplate Check: All hovertemplates contain required fields.")
-    else: 
-        for match_obj in plot_data_script_matches:
-            plot_id_str = match_obj.group(1)
-            plot_data_str = match_obj.group(2)
-            
-            try:
-                conv_traces_match = re.search(r"convTraces:\s*\[(.*?)\]", plot_data_str, re.DOTALL)
-                if conv_traces_match:
-                    conv_traces_block_str = conv_traces_match.group(1)
-                    individual_conv_traces = re.findall(r'(\{[\s\S]*?type\s*:\s*\'scatter\'[\s\S]*?\})(?=\s*,\s*\{|\s*\])', conv_traces_block_str, re.DOTALL)
-                    if not individual_conv_traces and conv_traces_block_str.strip() and conv_traces_block_str.strip() not in ["{}", "[]"]:
-                        if 'type:' in conv_traces_block_str: 
-                           individual_conv_traces = [t.strip() for t in conv_traces_block_str.split('}, {') if t.strip()]
-
-                    for trace_idx, trace_str in enumerate(individual_conv_traces):
-                        if not trace_str.startswith('{'): trace_str = '{' + trace_str
-                        if not trace_str.endswith('}'): trace_str = trace_str + '}'
-                        
-                        if "hoverinfo: 'skip'" in trace_str: 
-                            continue
-                        if not re.search(r'x:\s*\[\s*\]', trace_str): 
-                            hovertemplate_match = re.search(r"hovertemplate:\s*'(.*?)'", trace_str)
-                            if not hovertemplate_match:
-                                failures.append(f"Hovertemplate Check (convTraces, plot_id {plot_id_str}, trace {trace_idx+1}): No hovertemplate found. Trace: {trace_str[:150]}...")
-                            else:
-                                ht = hovertemplate_match.group(1)
-                                expected_ht = '환산등급: %{x}<br>모집단위: %{customdata[0]}<br>세부유형: %{customdata[1]}<extra></extra>'
-                                if ht != expected_ht:
-                                    failures.append(f"Hovertemplate Check (convTraces, plot_id {plot_id_str}, trace {trace_idx+1}): Incorrect. Expected '{expected_ht}', Got '{ht}'.")
-
-                all_subj_traces_match = re.search(r"allSubjTraces:\s*\[(.*?)\]", plot_data_str, re.DOTALL)
-                if all_subj_traces_match:
-                    all_subj_traces_block_str = all_subj_traces_match.group(1)
-                    individual_all_subj_traces = re.findall(r'(\{[\s\S]*?type\s*:\s*\'scatter\'[\s\S]*?\})(?=\s*,\s*\{|\s*\])', all_subj_traces_block_str, re.DOTALL)
-                    if not individual_all_subj_traces and all_subj_traces_block_str.strip() and all_subj_traces_block_str.strip() not in ["{}", "[]"]:
-                        if 'type:' in all_subj_traces_block_str:
-                            individual_all_subj_traces = [t.strip() for t in all_subj_traces_block_str.split('}, {') if t.strip()]
-
-                    for trace_idx, trace_str in enumerate(individual_all_subj_traces):
-                        if not trace_str.startswith('{'): trace_str = '{' + trace_str
-                        if not trace_str.endswith('}'): trace_str = trace_str + '}'
-
-                        if "hoverinfo: 'skip'" in trace_str:
-                            continue
-                        if not re.search(r'x:\s*\[\s*\]', trace_str):
-                            hovertemplate_match = re.search(r"hovertemplate:\s*'(.*?)'", trace_str)
-                            if not hovertemplate_match:
-                                failures.append(f"Hovertemplate Check (allSubjTraces, plot_id {plot_id_str}, trace {trace_idx+1}): No hovertemplate found. Trace: {trace_str[:150]}...")
-                            else:
-                                ht = hovertemplate_match.group(1)
-                                expected_ht = '전교과등급: %{x}<br>모집단위: %{customdata[0]}<br>세부유형: %{customdata[1]}<extra></extra>'
-                                if ht != expected_ht:
-                                    failures.append(f"Hovertemplate Check (allSubjTraces, plot_id {plot_id_str}, trace {trace_idx+1}): Incorrect. Expected '{expected_ht}', Got '{ht}'.")
-            except Exception as e:
-                failures.append(f"Hovertemplate Check: Error processing script content for plotData (plot_id {plot_id_str}): {e}. Content snippet: {plot_data_str[:200]}...")
+# Grade Toggle Check: 등급 전환은 화면 근처 플롯만 바로 갱신하고 나머지는 유휴 시간에 나눠 갱신 (깊은 복사 없음)
+print("\n--- Grade Toggle Check ---")
+if report_data is not None:
+    for snippet in ("requestIdleCallback", "stalePlots[plotId] = true", "refreshIfStale(entry.target.id)"):
+        if snippet not in html_content:
+            failures.append(f"Grade Toggle Check: page script is missing '{snippet}'.")
+    if "JSON.parse(JSON.stringify" in html_content:
+        failures.append("Grade Toggle Check: traces should not be deep-copied on update.")
+
+# Report Worker Check: 디코딩/trace 배열 계산은 인라인 Blob 작업자가 하고 결과 버퍼는 transfer로 돌려준다
+print("\n--- Report Worker Check ---")
+if report_data is not None:
+    worker_match = re.search(r'<script type="text/js-worker" id="report-worker-src">(.*?)</script>', html_content, re.DOTALL)
+    if not worker_match:
+        failures.append("Report Worker Check: worker source block not found.")
+    else:
+        for snippet in ("function decodeArray", "self.postMessage(reply.message, reply.transfer)", "var HANDLERS = {init: init, shard: shard, traces: traces, release: release, filter: filter};"):
+            if snippet not in worker_match.group(1):
+                failures.append(f"Report Worker Check: worker source is missing '{snippet}'.")
+        page_scripts = html_content.replace(worker_match.group(0), "")
+        if "new Worker(URL.createObjectURL(new Blob([source]" not in page_scripts:
+            failures.append("Report Worker Check: page does not start the worker from an inline Blob.")
+        if "atob(" in page_scripts:
+            failures.append("Report Worker Check: payloads should only be decoded inside the worker.")
+
+# Data Island Check: 플롯 데이터는 실행되지 않는 JSON 섬에 싣고, 플롯을 처음 요청할 때만 JSON.parse로 읽는다
+print("\n--- Data Island Check ---")
+if report_data is not None:
+    if "window.plotsData" in html_content:
+        failures.append("Data Island Check: plot data should no longer be assigned by executable scripts.")
+    if len(plots_data) != len(re.findall(r'class="plot-container" id="plot-', html_content)):
+        failures.append(f"Data Island Check: expected one island per plot, found {len(plots_data)}.")
+    for snippet in ("JSON.parse(island.textContent)", "if (!workerPlots[plotId])", "type: 'release'"):
+        if snippet not in html_content:
+            failures.append(f"Data Island Check: page script is missing '{snippet}'.")
+    tricky = create_plot_data_script("t", pd.DataFrame({
+        "result": ["합격"], "dept": ["</script><b>"], "conv_grade": [1.0], "all_subj_grade": [1.0],
+    }), add_stats=({}, {}), point_thresholds=(0, 0))[0]
+    island_match = re.search(r'<script type="application/json" id="plot-data-t">(.*?)</script>', tricky, re.DOTALL)
+    if not island_match or "</script><b>" not in json.loads(island_match.group(1))["conv"][0]["top"][0]:
+        failures.append("Data Island Check: '</script>' inside island data should be escaped as valid JSON.")
+
+# Worker Behaviour Check: 페이지의 작업자 소스(handleMessage)를 node로 실행해 init/traces/release/filter 결과를 원본 행과 비교
+# (데이터셋 디코딩이나 대학 섹션의 시작 행(rowBase)이 어긋나면 점의 등급/이름표/대학별 개수가 달라진다)
+print("\n--- Worker Behaviour Check ---")
+WORKER_RUNNER = r"""
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+global.atob = b => Buffer.from(b, 'base64').toString('binary');
+const handleMessage = new Function(input.source + '\n;return handleMessage;')();
+const call = msg => handleMessage(msg).message;
+const points = reply => reply.result.traces.map(t => ({x: Array.from(t.x), customdata: t.customdata}));
+const out = {init: call({type: 'init', dataset: input.dataset, options: {}}).result, plots: {}};
+Object.keys(input.plots).forEach(id => {
+    // 섬은 첫 요청에만 보낸다 (두 번째 등급은 작업자 캐시)
+    out.plots[id] = {conv: points(call({type: 'traces', plotId: id, gradeType: 'conv', plotData: input.plots[id]})),
+                     all_subj: points(call({type: 'traces', plotId: id, gradeType: 'all_subj'}))};
+});
+if (input.release) {
+    call({type: 'release', plotId: input.release});
+    out.afterRelease = call({type: 'traces', plotId: input.release, gradeType: 'conv'});
+}
+if (input.filter) {
+    out.filter = call({type: 'filter', state: input.filter, columns: Object.keys(input.filter)}).result;
+    out.filter.counts = Object.fromEntries(Object.entries(out.filter.counts).map(([k, v]) => [k, Array.from(v)]));
+    out.selPlot = {conv: points(call({type: 'traces', plotId: 'sel', gradeType: 'conv'}))};
+}
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def run_worker(page, plots=(), release=None, state=None):
+    """page의 작업자 소스와 데이터셋으로 WORKER_RUNNER를 실행해 결과 dict를 반환"""
+    islands = dict(re.findall(r'<script type="application/json" id="plot-data-([^"]+)">(.*?)</script>', page))
+    payload = {
+        "source": re.search(r'<script type="text/js-worker" id="report-worker-src">(.*?)</script>', page, re.DOTALL).group(1),
+        "dataset": json.loads(re.search(r"window\.reportData = (.*?);\n", page).group(1)),
+        "plots": {plot_id: json.loads(islands[plot_id]) for plot_id in plots},
+        "release": release,
+        "filter": state,
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".js", delete=False, encoding="utf-8") as script:
+        script.write(WORKER_RUNNER)
+    try:
+        proc = subprocess.run(["node", script.name], input=json.dumps(payload), capture_output=True, text=True, encoding="utf-8")
+    finally:
+        Path(script.name).unlink()
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "node failed")
+    return json.loads(proc.stdout)
+
+
+def point_rows(traces):
+    """trace 점 → (결과, 등급, 모집단위, 세부유형, 대학) 목록"""
+    names = ['합격', '충원합격', '불합격']
+    return sorted((names[i], round(x, 6), *customdata)
+                  for i, trace in enumerate(traces) for x, customdata in zip(trace["x"], trace["customdata"]))
+
+
+def expected_rows(df, grade_column):
+    df = df[df[grade_column].notna()]
+    return sorted(zip(df['result'], df[grade_column].round(6), df['dept'], df['subtype'], df['univ']))
+
+
+if shutil.which("node") is None:
+    print("node가 없어 작업자 동작 확인을 건너뜁니다.")
+else:
+    try:
+        plot_ids = re.findall(r'id="plot-data-([^"]+)"', html_content)
+        univ_names = dict(re.findall(r'id="univ-(\d+)"[^>]*>\s*<div class="dept-header">([^<]*)<', html_content))
+        result = run_worker(html_content, plot_ids, release=plot_ids[0])
+        if result["init"] != {"rows": len(sample_df)}:
+            failures.append(f"Worker Behaviour Check: init should decode {len(sample_df)} rows, got {result['init']}.")
+        for grade_type, grade_column in (("conv", "conv_grade"), ("all_subj", "all_subj_grade")):
+            if point_rows(result["plots"]["overall"][grade_type]) != expected_rows(sample_df, grade_column):
+                failures.append(f"Worker Behaviour Check: overall {grade_type} points differ from the source rows.")
+            # 대학 섹션의 플롯은 그 대학의 행만 가리키고, 대학의 플롯을 모두 합치면 대학의 행이 모두 나온다
+            for number, univ in univ_names.items():
+                univ_rows = expected_rows(sample_df[sample_df['univ'] == univ], grade_column)
+                covered = set()
+                for plot_id in (p for p in plot_ids if p.startswith(f"u{number}-")):
+                    rows = point_rows(result["plots"][plot_id][grade_type])
+                    if any(row not in univ_rows for row in rows):
+                        failures.append(f"Worker Behaviour Check: {plot_id} ({univ}) {grade_type} has points from other rows: {rows}.")
+                    covered.update(rows)
+                if covered != set(univ_rows):
+                    failures.append(f"Worker Behaviour Check: {univ} {grade_type} plots cover {len(covered & set(univ_rows))} of {len(set(univ_rows))} rows.")
+        if "error" not in result["afterRelease"]:
+            failures.append("Worker Behaviour Check: released plot data should be dropped from the worker cache.")
+
+        with tempfile.TemporaryDirectory() as worker_out:
+            plot_selected_depts(sample_df, Path(worker_out), output_file="i.html", report_mode="interactive")
+            interactive_page = (Path(worker_out) / "i.html").read_text(encoding="utf-8")
+        univ_labels = json.loads(re.search(r"window\.reportData = (.*?);\n", interactive_page).group(1))["columns"]["univ"]["labels"]
+        result = run_worker(interactive_page, state={"univ": [univ_labels.index('대학B')], "dept": []})
+        selected = sample_df[sample_df['univ'] == '대학B']
+        if result["filter"]["rows"] != len(selected):
+            failures.append(f"Worker Behaviour Check: filter should select {len(selected)} rows, got {result['filter']['rows']}.")
+        expected_counts = [int((sample_df['univ'] == u).sum()) for u in univ_labels]
+        if result["filter"]["counts"]["univ"] != expected_counts:
+            failures.append(f"Worker Behaviour Check: univ filter counts {result['filter']['counts']['univ']} != {expected_counts}.")
+        if [g.get("univ") for g in result["filter"]["groups"]] != [None, univ_labels.index('대학B')]:
+            failures.append(f"Worker Behaviour Check: unexpected filter groups {result['filter']['groups']}.")
+        if point_rows(result["selPlot"]["conv"]) != expected_rows(selected, "conv_grade"):
+            failures.append("Worker Behaviour Check: filtered selection plot points differ from the source rows.")
+    except Exception as e:
+        failures.append(f"Worker Behaviour Check: running the worker failed ({e}).")
+
+# Assets Layout Check: assets 레이아웃은 CSS/JS를 out_dir/assets/에 한 번만 쓰고 내용 해시가 붙은 상대 경로로 참조한다
+print("\n--- Assets Layout Check ---")
+with tempfile.TemporaryDirectory() as assets_out:
+    assets_out = Path(assets_out)
+    for name, mode in (("a.html", "static"), ("b.html", "interactive")):
+        plot_selected_depts(sample_df, assets_out, selected_univs=['대학A', '대학B'], output_file=name,
+                            report_mode=mode, report_layout="assets")
+    assets_dir = assets_out / "assets"
+    asset_names = {"report.css", "report.js", "report-interactive.js", PLOTLY_JS_PATH.name}
+    if not asset_names <= {f.name for f in assets_dir.glob("*")}:
+        failures.append(f"Assets Layout Check: missing asset files, found {sorted(f.name for f in assets_dir.glob('*'))}.")
+    else:
+        page = (assets_out / "a.html").read_text(encoding="utf-8")
+        interactive_page = (assets_out / "b.html").read_text(encoding="utf-8")
+        for snippet in ('<link rel="stylesheet" href="assets/report.css?v=', '<script src="assets/report.js?v='):
+            if snippet not in page:
+                failures.append(f"Assets Layout Check: report does not reference '{snippet}'.")
+        if f'<script src="assets/{PLOTLY_JS_PATH.name}?v=' not in page or PLOTLY_CDN_URL in page:
+            failures.append("Assets Layout Check: report should reference the pinned plotly.js copy, not the CDN.")
+        if '<script src="assets/report-interactive.js?v=' not in interactive_page:
+            failures.append("Assets Layout Check: interactive report does not reference report-interactive.js.")
+        if "<style>" in page or 'id="report-worker-src"' in page or "function initAdvancedVisualizations" in page:
+            failures.append("Assets Layout Check: shared CSS/JS should not be inlined in the report.")
+        if "window.reportWorkerSource = " not in (assets_dir / "report.js").read_text(encoding="utf-8"):
+            failures.append("Assets Layout Check: report.js does not provide the worker source.")
+        if len(page) >= len(html_content):
+            failures.append("Assets Layout Check: assets report should be smaller than the inline report.")
+        mtimes = {f.name: f.stat().st_mtime_ns for f in assets_dir.glob("*")}
+        plot_selected_depts(sample_df, assets_out, selected_univs=['대학A'], output_file="c.html", report_layout="assets")
+        if {f.name: f.stat().st_mtime_ns for f in assets_dir.glob("*")} != mtimes:
+            failures.append("Assets Layout Check: unchanged assets should not be rewritten.")
+    if "<style>" not in html_content:
+        failures.append("Assets Layout Check: default inline report should keep its stylesheet.")
+    if f'<script src="https://cdn.plot.ly/plotly-{report_assets.PLOTLY_JS_VERSION}.min.js">' not in html_content:
+        failures.append("Assets Layout Check: inline report should load the same pinned plotly.js version from the CDN.")
+    # 고정 버전 사본이 없으면 CDN으로 대신하지 않고 보고서 생성이 실패해야 한다
+    plotly_js.cache_clear()
+    original_path = report_assets.PLOTLY_JS_PATH
+    report_assets.PLOTLY_JS_PATH = assets_out / "missing" / original_path.name
+    try:
+        message = plot_selected_depts(sample_df, assets_out / "nojs", output_file="d.html", report_layout="assets")
+    finally:
+        report_assets.PLOTLY_JS_PATH = original_path
+        plotly_js.cache_clear()
+    if (assets_out / "nojs" / "d.html").exists() or "오류" not in message:
+        failures.append(f"Assets Layout Check: missing pinned plotly.js should fail the report, got {message!r}.")
+
+# Sharded Layout Check: 색인 페이지에는 목차/전체 요약과 대학 자리만, 대학 섹션은 대학별 조각 파일에 싣는다
+print("\n--- Sharded Layout Check ---")
+with tempfile.TemporaryDirectory() as shard_out:
+    shard_out = Path(shard_out)
+    plot_selected_depts(sample_df, shard_out, selected_univs=['대학A', '대학B'], output_file="index.html", report_layout="sharded")
+    index_page = (shard_out / "index.html").read_text(encoding="utf-8")
+    shard_files = sorted((shard_out / "index_shards").glob("univ-*.js"))
+    hrefs = re.findall(r'id="univ-(\d+)" data-shard="(index_shards/univ-\d+-\w+\.js)"', index_page)
+    if [idx for idx, _ in hrefs] != ["1", "2"] or sorted(f"index_shards/{f.name}" for f in shard_files) != sorted(h for _, h in hrefs):
+        failures.append(f"Sharded Layout Check: placeholders {hrefs} do not match shard files {[f.name for f in shard_files]}.")
+    elif 'id="plot-data-u' in index_page or 'toc-university' not in index_page:
+        failures.append("Sharded Layout Check: index page should hold the TOC but no university plot data.")
+    else:
+        shard_text = (shard_out / hrefs[0][1]).read_text(encoding="utf-8")
+        shard_match = re.match(r'registerReportShard\(\{univ: 1, data: (\{.*?\}), html: ', shard_text)
+        if not shard_match or "<script>" in shard_text or 'id=\\"plot-data-u1-p1\\"' not in shard_text:
+            failures.append("Sharded Layout Check: shard does not register its section HTML, plot data islands and dataset.")
+        elif json.loads(shard_match.group(1))["columns"]["univ"]["labels"] != ["대학A"]:
+            failures.append("Sharded Layout Check: shard dataset should only hold its university's rows.")
+        # 전체 요약은 점 수가 밀도 기준 이하이면 전체 행을 색인 데이터셋에 실어 점으로, 넘으면 빈 데이터셋 + 구간 밀도
+        index_data = json.loads(re.search(r'window\.reportData = (\{.*?\});\n', index_page).group(1))
+        if '"mode": "density"' in index_page.split('id="plot-data-overall">')[1][:200] or not index_data["columns"]["univ"]["codes"]["bdata"]:
+            failures.append("Sharded Layout Check: a small overall scatter should draw points from rows in the index dataset.")
+        plot_selected_depts(sample_df, shard_out, selected_univs=['대학A', '대학B'], output_file="dense.html",
+                            report_layout="sharded", density_threshold=2)
+        dense_page = (shard_out / "dense.html").read_text(encoding="utf-8")
+        dense_data = json.loads(re.search(r'window\.reportData = (\{.*?\});\n', dense_page).group(1))
+        if '"mode": "density"' not in dense_page.split('id="plot-data-overall">')[1][:200] or dense_data["columns"]["univ"]["codes"]["bdata"]:
+            failures.append("Sharded Layout Check: an overall scatter above density_threshold should use density bins and an empty index dataset.")
+    # 대학이 줄면 색인을 다시 쓴 뒤 쓰이지 않는 옛 조각을 지운다
+    plot_selected_depts(sample_df, shard_out, selected_univs=['대학A'], output_file="index.html", report_layout="sharded")
+    if len(list((shard_out / "index_shards").glob("univ-*.js"))) != 1:
+        failures.append("Sharded Layout Check: stale shards were not removed.")
+    try:
+        plot_selected_depts(sample_df, shard_out, output_file="x.html", report_mode="interactive", report_layout="sharded")
+        failures.append("Sharded Layout Check: interactive reports should reject the sharded layout.")
+    except ValueError:
+        pass
+
+# Histogram Check: 등급 히스토그램은 고정 16개 구간의 인원 수 막대로만 싣는다
+print("\n--- Histogram Check ---")
+if not failures:
+    hist_match = re.search(r'allSubjGradeHistograms:\s*\[(.*?)\],\s*univRateGroups', html_content, re.DOTALL)
+    if not hist_match:
+        failures.append("Histogram Check: No 'allSubjGradeHistograms' block found.")
+    else:
+        counts = [json.loads(c) for c in re.findall(r'\n\s*y:\s*(\[.*?\]),', hist_match.group(1))]
+        expected_counts = [
+            [1, 2, 1] + [0] * 13,      # 합격(충원포함): 1.4 / 1.6, 1.8 / 2.0
+            [0, 0, 0, 2] + [0] * 12,   # 불합격: 2.6, 2.9
+        ]
+        if counts != expected_counts:
+            failures.append(f"Histogram Check: Expected bin counts {expected_counts}, Got {counts}.")
+        if "type: 'histogram'" in html_content:
+            failures.append("Histogram Check: raw client-side histogram traces should no longer be embedded.")
+
+# Hovertemplate Check: 페이지 JS(buildTraces)가 만드는 hovertemplate에 모집단위/세부유형이 있는지 확인
+print("\n--- Hovertemplate Check ---")
+if not failures:
+    build_match = re.search(r'function buildTraces\(.*?\n    }\n', html_content, re.DOTALL)
+    if not build_match:
+        failures.append("Hovertemplate Check: No 'buildTraces' function found in the page script.")
+    else:
+        ht_match = re.search(r"hovertemplate = gradeLabel \+ '(.*?)'", build_match.group(0))
+        expected_ht = ': %{x}<br>대학: %{customdata[2]}<br>모집단위: %{customdata[0]}<br>세부유형: %{customdata[1]}<extra></extra>'
+        if not ht_match or ht_match.group(1) != expected_ht:
+            failures.append(f"Hovertemplate Check: Incorrect. Expected '{expected_ht}', Got '{ht_match and ht_match.group(1)}'.")
+        # hover 이름표는 작업자가 채운다 (페이지는 받은 customdata를 그대로 쓴다)
+        worker_customdata = "[dept.labels[dept.codes[r]], subtype.labels[subtype.codes[r]], univ.labels[univ.codes[r]]]"
+        if worker_customdata not in html_content or "trace.customdata = arrays.customdata;" not in build_match.group(0):
+            failures.append("Hovertemplate Check: customdata is not built as [dept, subtype, univ] in the worker.")
 
 # Legend Symbol Check
 print("\n--- Legend Symbol Check ---")
@@ -190,6 +617,45 @@ if not failures:
         if all_legends_found_correctly: # This will only be true if no failures were appended in the loop above
              print("Legend Symbol Check: All expected legend items found and correct within the legend wrapper.")
 
+# Interactive Mode Check: 데이터셋을 한 번 싣고 열마다 값별 행 번호 목록(postings)과 필터 패널을 함께 싣는다
+print("\n--- Interactive Mode Check ---")
+if report_data is not None:
+    interactive_filename = "test_report_interactive.html"
+    plot_selected_depts(sample_df, output_dir, output_file=interactive_filename, report_mode="interactive")
+    interactive_content = (output_dir / interactive_filename).read_text(encoding='utf-8')
+    (output_dir / interactive_filename).unlink()
+    dataset_match = re.search(r'window\.reportData\s*=\s*(\{.*?\});\s*</script>', interactive_content, re.DOTALL)
+    interactive_data = json.loads(dataset_match.group(1)) if dataset_match else {"columns": {}}
+    if sorted(interactive_data["columns"]) != ["apptype", "dept", "result", "subtype", "univ"]:
+        failures.append(f"Interactive Mode Check: unexpected dataset columns {sorted(interactive_data['columns'])}")
+    for name, col in interactive_data["columns"].items():
+        codes = decode_array(col["codes"])
+        rows, offsets = decode_array(col["postings"]["rows"]), decode_array(col["postings"]["offsets"])
+        postings = [rows[offsets[k]:offsets[k + 1]] for k in range(len(col["labels"]))]
+        expected_postings = [[r for r, c in enumerate(codes) if c == k] for k in range(len(col["labels"]))]
+        if postings != expected_postings:
+            failures.append(f"Interactive Mode Check ({name}): Expected postings {expected_postings}, Got {postings}")
+    for snippet in ('id="filter-univ"', 'id="filter-dept"', "onFilterChange('subtype')", 'id="interactive-univs"',
+                    "function applyFilters"):
+        if snippet not in interactive_content:
+            failures.append(f"Interactive Mode Check: report is missing '{snippet}'.")
+    if 'id="filter-region"' in interactive_content:
+        failures.append("Interactive Mode Check: columns missing from the data should not get a filter.")
+    if 'id="plot-data-' in interactive_content:
+        failures.append("Interactive Mode Check: plot rows should be computed in the browser.")
+    try:
+        plot_selected_depts(sample_df, output_dir, output_file=interactive_filename, report_mode="crossfilter")
+        failures.append("Interactive Mode Check: an unknown report_mode should raise ValueError.")
+    except ValueError:
+        pass
+
+# Atomic Write Check: 스트리밍 저장 후 임시 파일이 남지 않고 문서가 끝까지 쓰였는지 확인
+print("\n--- Atomic Write Check ---")
+if not failures:
+    if (output_dir / (output_filename + ".tmp")).exists():
+        failures.append("Atomic Write Check: temporary file was left behind after writing the report.")
+    if not html_content.rstrip().endswith("</html>"):
+        failures.append("Atomic Write Check: report does not end with </html>.")
 
 # 5. Report results
 print("\n--- Results ---")
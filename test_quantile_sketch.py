@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from quantile_sketch import GradeSketch, encode_runs, merge_runs, runs_quantiles
+
+# 1. 샘플 데이터: 소수 둘째 자리 등급과 눈금 밖의 연속 값
+rng = np.random.default_rng(7)
+grades = np.round(rng.uniform(1, 9, 3000), 2)
+continuous = rng.uniform(1, 9, 3000)
+groups = rng.integers(0, 12, 3000)
+
+failures = []
+
+
+def expected(values, by=None):
+    s = pd.Series(values)
+    if by is None:
+        return s.quantile([0.25, 0.5, 0.75]).to_numpy()
+    return s.groupby(by).quantile([0.25, 0.5, 0.75]).unstack().to_numpy()
+
+
+# 2. 단일 요약: 작은 표본은 정확, 큰 표본은 resolution/2 이내, 나눠 만든 뒤 합쳐도 같음
+print("\n--- Sketch Check ---")
+small = GradeSketch.from_values(continuous[:100])
+if not small.exact or not np.allclose(small.quantiles(), expected(continuous[:100])):
+    failures.append("Sketch Check: small sample should be exact")
+merged = GradeSketch(resolution=0.1)
+for i in range(0, 3000, 400):
+    merged.merge(GradeSketch.from_values(continuous[i:i + 400], resolution=0.1))
+if merged.count != 3000 or np.abs(merged.quantiles() - expected(continuous)).max() > 0.05:
+    failures.append(f"Sketch Check: merged quantiles off by more than resolution/2: {merged.quantiles()}")
+if not np.allclose(GradeSketch.from_values(grades).quantiles(), expected(grades)):
+    failures.append("Sketch Check: two-decimal grades should be lossless at 0.01")
+try:
+    GradeSketch(resolution=0.01).merge(GradeSketch(resolution=0.1))
+    failures.append("Sketch Check: merging different resolutions should raise ValueError")
+except ValueError:
+    pass
+
+# 3. 그룹별 요약과 상위 그룹 병합
+print("\n--- Grouped Runs Check ---")
+runs = encode_runs(groups, grades)
+if not np.allclose(runs_quantiles(*runs, 12), expected(grades, groups)):
+    failures.append("Grouped Runs Check: leaf quantiles differ from pandas")
+parents = np.arange(12) // 4
+if not np.allclose(runs_quantiles(*merge_runs(*runs, parents), 3), expected(grades, groups // 4)):
+    failures.append("Grouped Runs Check: merged quantiles differ from pandas")
+
+# 4. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for quantile sketches.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
@@ -0,0 +1,108 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import stats_cube
+from data_processor import GRADE_COLUMNS, compute_stats, encode_dataset
+from html_generator import compute_additional_stats  # 보고서가 쓰는 형식 (표본 1개면 std 'N/A')
+from html_generator import plot_selected_depts
+from stats_cube import StatsCube
+from stats_engine import DEFAULT_LEVELS, GroupStats, additional_from_entry, basic_from_entry
+
+# 1. 샘플 데이터 (등급 결측 1건, 결과 결측 1건 포함)
+data = {
+    'region': ['강원', '강원', '서울', '서울', '서울', '경기', '강원', '경기'],
+    'univ': ['대학A', '대학A', '대학B', '대학C', '대학B', '대학C', '대학A', '대학B'],
+    'apptype': ['수시', '수시', '정시', '수시', '정시', '정시', '수시', '수시'],
+    'subtype': ['전형1', '전형2', '전형2', '전형1', '전형2', '전형3', '전형1', '전형1'],
+    'dept': ['학과X', '학과Y', '학과Y', '학과X', '학과Z', '학과Z', '학과X', '학과Y'],
+    'result': ['합격', '불합격', '합격', '충원합격', '불합격', '합격', '충원합격', None],
+    'conv_grade': [1.5, 2.5, 3.1, 1.9, 4.0, np.nan, 2.25, 3.3],
+    'all_subj_grade': [1.6, 2.6, 3.0, 2.0, 4.1, 2.3, 2.35, 3.4],
+}
+sample_df = encode_dataset(pd.DataFrame(data))
+cube = StatsCube(sample_df)
+
+failures = []
+
+
+def same(got, exp):
+    """exp의 모든 항목이 got에 같은 값으로 있는지 (got의 추가 항목은 허용)"""
+    if isinstance(got, dict) or isinstance(exp, dict):
+        if not (isinstance(got, dict) and isinstance(exp, dict)) or bool(got) != bool(exp):
+            return False
+        return all(k in got and same(got[k], exp[k]) for k in exp)
+    if isinstance(got, str) or isinstance(exp, str):
+        return got == exp
+    return bool(np.isclose(got, exp) or (np.isnan(got) and np.isnan(exp)))
+
+
+# 2. 큐브 조회와 원본 행 계산 비교 (저장 후 다시 읽은 큐브도 같아야 한다)
+with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / "cube.npz"
+    cube.save(path)
+    loaded = StatsCube.load(path)
+
+print("\n--- Cube Query Check ---")
+cases = [
+    {},
+    {'region': ['강원']},
+    {'univ': ['대학B', '대학C'], 'apptype': ['정시']},
+    {'univ': ['대학A'], 'dept': ['학과X'], 'subtype': ['전형1']},
+    {'dept': ['학과Y']},
+    {'univ': ['없는대학']},
+]
+for sel in cases:
+    mask = np.ones(len(sample_df), dtype=bool)
+    for col, values in sel.items():
+        mask &= sample_df[col].isin(values).to_numpy()
+    subset = sample_df[mask]
+    for grade in ('conv_grade', 'all_subj_grade'):
+        for name, c in (('cube', cube), ('loaded', loaded)):
+            if not same(c.basic(sel, grade), compute_stats(subset, grade)):
+                failures.append(f"Cube Query Check {sel} [{grade}, {name}]: basic stats differ")
+            if not same(c.additional(sel, grade), compute_additional_stats(subset, grade)):
+                failures.append(f"Cube Query Check {sel} [{grade}, {name}]: additional stats differ")
+
+# 3. 수준별 표 (보고서가 한 번에 만드는 구간 항목)와 원본 행 집계 비교
+print("\n--- Cube Table Check ---")
+for sel in cases:
+    mask = np.ones(len(sample_df), dtype=bool)
+    for col, values in sel.items():
+        mask &= sample_df[col].isin(values).to_numpy()
+    expected = GroupStats(sample_df[mask])
+    for level, columns in DEFAULT_LEVELS.items():
+        table = cube.table(sel, columns)
+        exp_table = expected.table(level)
+        if columns and set(table) != set(exp_table):
+            failures.append(f"Cube Table Check {sel} [{level}]: keys {sorted(table)} != {sorted(exp_table)}")
+            continue
+        for key, entry in exp_table.items():
+            for grade in GRADE_COLUMNS:
+                for convert in (basic_from_entry, additional_from_entry):
+                    if not same(convert(table[key], grade), convert(entry, grade)):
+                        failures.append(f"Cube Table Check {sel} [{level}, {key}, {grade}]: {convert.__name__} differs")
+
+# 4. 보고서 하나가 큐브 요약을 합치는 횟수 (구간 수와 무관하게 수준 × 등급열 번이어야 한다)
+print("\n--- Cube Report Cost Check ---")
+merge_calls = []
+original_merge_runs = stats_cube.merge_runs
+stats_cube.merge_runs = lambda *args: merge_calls.append(1) or original_merge_runs(*args)
+try:
+    with tempfile.TemporaryDirectory() as tmp:
+        plot_selected_depts(sample_df, Path(tmp), output_file="cube.html", stats_cube=cube, max_workers=1)
+finally:
+    stats_cube.merge_runs = original_merge_runs
+limit = len(DEFAULT_LEVELS) * len(GRADE_COLUMNS)
+if not 0 < len(merge_calls) <= limit:
+    failures.append(f"Cube Report Cost Check: {len(merge_calls)} merge_runs calls (expected 1..{limit})")
+
+# 5. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for stats cube queries.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from stats_kernel import describe_groups, segment_ids, value_ranks
+
+# 1. 샘플 데이터: 그룹 2개 열(결측 코드 포함)과 NaN이 섞인 등급
+rng = np.random.default_rng(11)
+n = 2000
+univ = rng.integers(-1, 7, n)      # -1 = 결측
+result = rng.integers(0, 3, n)
+grades = np.where(rng.random(n) < 0.1, np.nan, np.round(rng.uniform(1, 9, n), 2))
+
+failures = []
+
+segment, keys = segment_ids([univ, result], [7, 3])
+frame = pd.DataFrame({"univ": univ, "result": result, "g": grades})
+frame = frame[frame["univ"] >= 0]
+grouped = frame.groupby(["univ", "result"])["g"]
+expected = pd.concat(
+    [grouped.agg(["count", "mean", "std", "min", "max"]), grouped.quantile([0.25, 0.5, 0.75]).unstack()],
+    axis=1,
+)
+
+# 2. 구간 번호/키 확인과 세 가지 정렬 경로(순위 표 / 기수 정렬 / 정렬 없음) 비교
+print("\n--- Segment Check ---")
+if (segment[univ < 0] != -1).any() or keys.shape != (2, len(expected)):
+    failures.append(f"Segment Check: unexpected segments {keys.shape}")
+
+print("\n--- Describe Check ---")
+for name, kwargs in (("radix", {}), ("ranks", {"ranks": value_ranks(grades)}), ("no-quantiles", {"qs": ()})):
+    d = describe_groups(segment, grades, keys.shape[1], **kwargs)
+    for i in range(keys.shape[1]):
+        row = expected.loc[(keys[0, i], keys[1, i])]
+        got = [d["count"][i], d["mean"][i], d["std"][i], d["min"][i], d["max"][i]]
+        if "qs" not in kwargs:
+            got += list(d["quantiles"][i])
+        if not np.allclose(got, row.to_numpy()[:len(got)], equal_nan=True):
+            failures.append(f"Describe Check [{name}] segment {keys[:, i]}: {got} != {row.tolist()}")
+            break
+
+# 3. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for the stats kernel.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
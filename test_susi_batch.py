@@ -0,0 +1,131 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from data_processor import encode_dataset
+from html_generator import report_shard_dir
+from stats_cube import StatsCube
+from susi import MANIFEST_NAME, build_parser, jobs_per, load_spec, run_batch
+
+# 1. 샘플 데이터
+data = {
+    'region': ['강원', '강원', '서울', '서울', '서울', '경기'],
+    'univ': ['대학A', '대학A', '대학B', '대학C', '대학B', '대학C'],
+    'apptype': ['수시', '수시', '정시', '수시', '정시', '정시'],
+    'subtype': ['전형1', '전형2', '전형2', '전형1', '전형2', '전형3'],
+    'dept': ['학과X', '학과Y', '학과Y', '학과X', '학과Z', '학과Z'],
+    'result': ['합격', '불합격', '합격', '충원합격', '불합격', '합격'],
+    'conv_grade': [1.5, 2.5, 3.1, 1.9, 4.0, np.nan],
+    'all_subj_grade': [1.6, 2.6, 3.0, 2.0, 4.1, 2.3],
+}
+sample_df = encode_dataset(pd.DataFrame(data))
+cube = StatsCube(sample_df)
+
+failures = []
+
+with tempfile.TemporaryDirectory() as tmp:
+    out_dir = Path(tmp) / "out"
+
+    # 2. 작업 목록: 대학별 / CSV 명세
+    print("\n--- Job Spec Check ---")
+    jobs = jobs_per(sample_df, "univ")
+    if [job["output"] for job in jobs] != ["대학A.html", "대학B.html", "대학C.html"] or jobs[0]["univ"] != ["대학A"]:
+        failures.append(f"Job Spec Check: unexpected per-univ jobs {jobs}")
+    spec = Path(tmp) / "jobs.csv"
+    spec.write_text("univ,dept,output\n대학A;대학B,학과Y,\n,학과X,학과X 전체\n", encoding="utf-8")
+    spec_jobs = load_spec(spec)
+    expected = [
+        {"univ": ["대학A", "대학B"], "dept": ["학과Y"], "output": "대학A+대학B_학과Y.html"},
+        {"dept": ["학과X"], "output": "학과X 전체.html"},
+    ]
+    if spec_jobs != expected:
+        failures.append(f"Job Spec Check: Expected {expected}, Got {spec_jobs}")
+    spec.write_text("univ,output\n대학A,같은이름\n대학B,같은이름\n", encoding="utf-8")
+    try:
+        load_spec(spec)
+        failures.append("Job Spec Check: duplicate outputs should raise ValueError.")
+    except ValueError:
+        pass
+    args = build_parser().parse_args(["batch", "a.xlsx", "--per", "dept", "--workers", "2"])
+    if (args.per, args.workers, args.spec) != ("dept", 2, None):
+        failures.append(f"Job Spec Check: unexpected parsed arguments {args}")
+
+    # 3. 일괄 생성 → 다시 실행하면 건너뜀 → 데이터 키가 바뀌면 다시 생성
+    print("\n--- Batch Run Check ---")
+    results = run_batch(sample_df, jobs, out_dir, "key-1", stats_cube=cube, max_workers=1)
+    if [r["status"] for r in results] != ["생성"] * 3:
+        failures.append(f"Batch Run Check: first run should build every report: {[r['message'] for r in results]}")
+    if any(r["bytes"] != (out_dir / r["job"]["output"]).stat().st_size for r in results):
+        failures.append("Batch Run Check: reported sizes differ from the files on disk.")
+    manifest = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    if sorted(manifest) != ["대학A.html", "대학B.html", "대학C.html"]:
+        failures.append(f"Batch Run Check: manifest entries {sorted(manifest)}")
+    serial = {r["job"]["output"]: (out_dir / r["job"]["output"]).read_bytes() for r in results}
+
+    results = run_batch(sample_df, jobs, out_dir, "key-1", stats_cube=cube, max_workers=1)
+    if [r["status"] for r in results] != ["건너뜀"] * 3:
+        failures.append(f"Batch Run Check: second run should skip up-to-date reports: {[r['status'] for r in results]}")
+    (out_dir / "대학B.html").unlink()
+    results = run_batch(sample_df, jobs, out_dir, "key-1", stats_cube=cube, max_workers=1)
+    if [r["status"] for r in results] != ["건너뜀", "생성", "건너뜀"]:
+        failures.append(f"Batch Run Check: only the missing report should be rebuilt: {[r['status'] for r in results]}")
+    results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1)
+    if [r["status"] for r in results] != ["생성"] * 3:
+        failures.append(f"Batch Run Check: a new dataset key should rebuild every report: {[r['status'] for r in results]}")
+
+    # 4. 프로세스 풀 실행도 같은 파일을 만든다
+    print("\n--- Parallel Batch Check ---")
+    results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, force=True, max_workers=2)
+    if [r["status"] for r in results] != ["생성"] * 3:
+        failures.append(f"Parallel Batch Check: forced run should rebuild every report: {[r['status'] for r in results]}")
+    parallel = {r["job"]["output"]: (out_dir / r["job"]["output"]).read_bytes() for r in results}
+    if parallel != serial:
+        failures.append("Parallel Batch Check: parallel outputs differ from serial outputs.")
+
+    # 5. assets 레이아웃: 공용 자산을 한 번 쓰고, 레이아웃이 바뀌면 다시 생성
+    print("\n--- Assets Layout Check ---")
+    args = build_parser().parse_args(["batch", "a.xlsx", "--layout", "assets"])
+    if args.layout != "assets":
+        failures.append(f"Assets Layout Check: unexpected parsed layout {args.layout}")
+    results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1, layout="assets")
+    if [r["status"] for r in results] != ["생성"] * 3:
+        failures.append(f"Assets Layout Check: a new layout should rebuild every report: {[r['status'] for r in results]}")
+    if not (out_dir / "assets" / "report.js").exists():
+        failures.append("Assets Layout Check: shared assets were not written.")
+    if any('src="assets/report.js?v=' not in (out_dir / r["job"]["output"]).read_text(encoding="utf-8") for r in results):
+        failures.append("Assets Layout Check: reports do not reference the shared report.js.")
+    results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1, layout="assets")
+    if [r["status"] for r in results] != ["건너뜀"] * 3:
+        failures.append(f"Assets Layout Check: second run should skip up-to-date reports: {[r['status'] for r in results]}")
+
+    # 6. sharded 레이아웃: 대학 조각 파일이 없어진 보고서는 지문이 같아도 다시 생성
+    print("\n--- Sharded Layout Check ---")
+    results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1, layout="sharded")
+    if [r["status"] for r in results] != ["생성"] * 3:
+        failures.append(f"Sharded Layout Check: a new layout should rebuild every report: {[r['status'] for r in results]}")
+    manifest = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    first = jobs[0]["output"]
+    shard_dir = report_shard_dir(out_dir / first)
+    if not manifest[first].get("shards") or sorted(f.name for f in shard_dir.glob("*.js")) != manifest[first]["shards"]:
+        failures.append(f"Sharded Layout Check: manifest should record the shard files, got {manifest[first].get('shards')}")
+    else:
+        (shard_dir / manifest[first]["shards"][0]).unlink()
+        results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1, layout="sharded")
+        if [r["status"] for r in results] != ["생성", "건너뜀", "건너뜀"]:
+            failures.append(f"Sharded Layout Check: only the report with a missing shard should be rebuilt: {[r['status'] for r in results]}")
+        shutil.rmtree(shard_dir)
+        results = run_batch(sample_df, jobs, out_dir, "key-2", stats_cube=cube, max_workers=1, layout="sharded")
+        if [r["status"] for r in results] != ["생성", "건너뜀", "건너뜀"]:
+            failures.append(f"Sharded Layout Check: a missing shard directory should rebuild the report: {[r['status'] for r in results]}")
+
+# 7. 결과 보고
+print("\n--- Results ---")
+if not failures:
+    print("All checks passed successfully for batch report generation.")
+else:
+    print("One or more checks failed:\n" + "\n".join(f"- {f}" for f in failures))
+
+print("\n--- Test Script Finished ---")
@@ -1,5 +1,45 @@
+import os
 import re
+from pathlib import Path
+from typing import Iterable
 
 def sanitize(text: str) -> str:
     """파일명에 사용할 수 없는 문자를 제거"""
     return re.sub(r'[\\/:"*?<>|]+', "_", text)
+
+def evict_lru(directory: Path, max_bytes: int, pattern: str = "*") -> int:
+    """디렉터리 용량이 max_bytes를 넘으면 수정시각이 오래된 파일부터 삭제. 삭제한 개수 반환"""
+    entries = []
+    for p in Path(directory).glob(pattern):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if p.is_file():
+            entries.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+def write_atomic(path: Path, fragments: Iterable[str], buffer_size: int = 1 << 20) -> Path:
+    """
+    문자열 조각을 차례로 임시 파일에 쓴 뒤 os.replace로 교체 (중간에 실패하면 기존 파일 유지).
+    조각은 버퍼드 파일 핸들로 바로 흘려 쓰므로 전체 내용을 메모리에 모으지 않는다.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", buffering=buffer_size) as f:
+            for fragment in fragments:
+                f.write(fragment)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path